@@ -5,7 +5,26 @@ to ease the writing of custom lambda expressions.
 
 Also the magic variables (x1, x2, ...) are exposed here, as well as
 the function `λ` to convert anything to a lambda expression and the
-function `comp` to compose lambdas.
+function `comp` to compose lambdas, and `compile_` to turn a lambda expression into
+a native (and much faster) Python function. The module `lambdax.rewriting`
+provides ways to simplify expressions, e.g. `fold` to evaluate their constant parts once
+and `simplify` to apply algebraic rewrite rules, `bind` gives values to some variables,
+`share` computes their common sub-expressions once (and `evaluate_many` the ones
+of several expressions applied on the same arguments), `memoize` caches
+the results of expensive expressions, `incremental` evaluates them again only where
+some variables changed, and `specialize` builds evaluators specialized
+for the types of their arguments. `evaluate_columns` evaluates them node by node
+on whole columns of values. `dumps` and `loads` serialize expressions,
+`parallel_map` and `thread_map` reduce them on many items in several processes
+or threads, and `acall` and `astream` reduce them with asyncio when they call
+coroutine functions.
+`pipeline` fuses map and filter stages into a single compiled loop, `profile`
+measures the time spent in each node of an expression, and `explain` estimates it
+without reducing it. The module `lambdax.sql`
+translates filters into SQL `WHERE` clauses, to filter the rows in SQLite instead.
+
+The submodules are only imported on the first access to one of their members,
+so `import lambdax` itself is almost free.
 
 The keyword operators have their lambda equivalent too:
 - a if x else b -> if_(x, a, b)  # lazily evaluated
@@ -18,9 +37,112 @@ The keyword operators have their lambda equivalent too:
 - del a[b]      -> delitem(a, b)
 """
 
-import setup
-from lambdax.lambda_calculus import *
-from lambdax.operators import *
-from lambdax.builtins_as_lambdas import *
+import operator
+import sys
+
+__version__ = '0.2.0'
+
+# like `typing.TYPE_CHECKING`, without importing `typing`, which costs more than the package
+TYPE_CHECKING = False
+
+# the submodules whose public members are exposed here, in the order in which they override
+# each other's; they're only imported on the first access to one of their members
+_SUBMODULES = (
+    'lambda_calculus', 'operators', 'builtins_as_lambdas', 'compiler', 'rewriting', 'sharing',
+    'caching', 'specialization', 'columnar', 'serialization', 'parallel', 'asynchronous',
+    'fusion', 'profiling',
+)
+# the other submodules that are loaded when accessed as attributes of the package
+_OTHER_SUBMODULES = ('tree', 'sql')
+
+_MEMBERS = dict.fromkeys(
+    ['x', 'X'] + ['%s%d' % (name, i) for name in 'xX' for i in range(1, 10)] +
+    ['λ', 'is_λ', 'comp', 'circle', 'chaining', 'and_', 'or_', 'if_', 'map_', 'starmap'],
+    'lambda_calculus')
+_MEMBERS.update({
+    'compile_': 'compiler',
+    'fold': 'rewriting', 'impure': 'rewriting', 'pure': 'rewriting', 'simplify': 'rewriting',
+    'rewrite_rule': 'rewriting', 'bind': 'rewriting',
+    'share': 'sharing', 'evaluate_many': 'sharing', 'map_many': 'sharing',
+    'memoize': 'caching', 'cache_info': 'caching', 'cache_clear': 'caching',
+    'incremental': 'caching',
+    'specialize': 'specialization', 'specialization_info': 'specialization',
+    'evaluate_columns': 'columnar',
+    'dumps': 'serialization', 'loads': 'serialization',
+    'parallel_map': 'parallel', 'thread_map': 'parallel',
+    'acall': 'asynchronous', 'astream': 'asynchronous',
+    'pipeline': 'fusion',
+    'profile': 'profiling', 'profile_stats': 'profiling', 'print_profile': 'profiling',
+    'explain': 'profiling',
+})
+
+if TYPE_CHECKING:
+    # only seen by the linters and IDEs, which can't resolve the lazy members
+    # pylint: disable=wildcard-import,unused-wildcard-import,cyclic-import
+    from lambdax.lambda_calculus import *
+    from lambdax.operators import *
+    from lambdax.builtins_as_lambdas import *
+    from lambdax.compiler import *
+    from lambdax.rewriting import *
+    from lambdax.sharing import *
+    from lambdax.caching import *
+    from lambdax.specialization import *
+    from lambdax.columnar import *
+    from lambdax.serialization import *
+    from lambdax.parallel import *
+    from lambdax.asynchronous import *
+    from lambdax.fusion import *
+    from lambdax.profiling import *
+    from lambdax import tree, sql
+
+
+def _import(submodule):
+    # imported like by an import statement to be reported by `-X importtime`,
+    # and because `importlib` itself is slower to import
+    name = '%s.%s' % (__name__, submodule)
+    __import__(name)
+    return sys.modules[name]
+
+
+def _submodule(name):
+    """ Name of the submodule exposing the member `name`, if any """
+    if name in _MEMBERS:
+        return _MEMBERS[name]
+    if name.endswith('_λ'):
+        return 'builtins_as_lambdas'
+    if not name.startswith('_') and name in vars(operator):
+        return 'operators'
+    return None
+
+
+def _public_members():
+    members = {}
+    for submodule in _SUBMODULES:
+        module = _import(submodule)
+        members.update((name, value) for name, value in vars(module).items()
+                       if not name.startswith('_') and not isinstance(value, type(operator)))
+    return members
+
+
+def __getattr__(name):
+    if name == '__all__':
+        members = _public_members()
+        globals().update(members)
+        value = list(members)
+    elif name in _SUBMODULES or name in _OTHER_SUBMODULES:
+        value = _import(name)
+    else:
+        submodule = _submodule(name)
+        if submodule is None:
+            raise AttributeError("module %r has no attribute %r" % (__name__, name))
+        module = _import(submodule)
+        try:
+            value = getattr(module, name)
+        except AttributeError:
+            raise AttributeError("module %r has no attribute %r" % (__name__, name)) from None
+    globals()[name] = value
+    return value
+
 
-__version__ = setup.VERSION
+def __dir__():
+    return sorted(set(globals()) | set(__getattr__('__all__')))
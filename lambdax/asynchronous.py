@@ -0,0 +1,298 @@
+""" β-reduce λ-abstractions wrapping coroutine functions, with asyncio.
+
+`await acall(expression, *args)` reduces the expression like `expression(*args)`, but:
+- the awaitable results of the operations (e.g. the calls of coroutine functions)
+  are awaited before being used,
+- the sibling operands of an operation are evaluated concurrently, e.g. both calls
+  of `λ(fetch_a)(x) + λ(fetch_b)(x)` are awaited at the same time,
+- `and_`, `or_` and `if_` are still lazy: only the operands that are needed are awaited.
+
+`astream(expression, source)` reduces the expression that way on each item of an
+(async) iterable, as an async iterator of the results. A composition (see `comp` and
+`chaining`) is run as a pipeline: each of the composed expressions is a stage reducing
+up to `concurrency` items at a time, and passing its results to the next stage through
+a bounded queue. The source is read only when there's room for more items.
+
+The sub-expressions that only apply functions of the modules `operator` and `builtins`
+(including the operators) are known to return no awaitable, so they are reduced as usual.
+"""
+
+import asyncio
+import builtins
+import inspect
+import operator
+
+from lambdax.lambda_calculus import (
+    _apply, _check_variables, _reversed_operations, _unpack,
+    _ConstantAbstraction, _IdentityAbstraction, _LambdaAbstraction,
+    and_ as _and, or_ as _or, if_ as _if, is_λ as _is_λ
+)
+from lambdax.rewriting import _add_all, _multiply_all
+from lambdax.tree import children as _children, walk as _walk
+
+
+def _synchronous_functions():
+    functions = set()
+    for module in (operator, builtins):
+        for name, obj in vars(module).items():
+            if not name.startswith('_') and callable(obj):
+                try:
+                    functions.add(obj)
+                except TypeError:  # unhashable
+                    pass
+    functions.discard(getattr(builtins, 'anext', None))
+    # the sums and products flattened by `simplify`
+    functions.update((_add_all, _multiply_all))
+    return functions
+
+
+# functions that never return an awaitable
+_SYNCHRONOUS = _synchronous_functions()
+
+
+def _is_synchronous(function):
+    try:
+        return _reversed_operations.get(function, function) in _SYNCHRONOUS
+    except TypeError:  # unhashable
+        return False
+
+
+class _Analysis:
+    """ Tell which nodes of an expression may return an awaitable, directly or
+    through one of their sub-expressions.
+    """
+
+    def __init__(self):
+        self._awaiting = {}
+
+    def __call__(self, node):
+        return self._awaiting[id(node)]
+
+    def analyse(self, expression):
+        # pylint: disable=protected-access
+        for node in _walk(expression):
+            if id(node) in self._awaiting:
+                continue
+            if isinstance(node, (_IdentityAbstraction, _ConstantAbstraction)):
+                awaiting = False
+            elif isinstance(node, (_and, _or, _if)):
+                awaiting = any(self(child) for child in _children(node))
+            elif isinstance(node, _LambdaAbstraction):
+                # the operation is analysed anyway, in case of composition
+                awaiting = self._operation_awaiting(node)
+                awaiting = awaiting or any(self(child) for child in _children(node))
+            else:
+                awaiting = True
+            self._awaiting[id(node)] = awaiting
+        return self
+
+    def _operation_awaiting(self, node):
+        # pylint: disable=protected-access
+        operation = node._λ_operation
+        if _is_λ(operation):
+            # composition
+            self.analyse(operation)
+            return self(operation)
+        if operation is _apply:
+            callee = node._λ_origin
+            return (not isinstance(callee, _ConstantAbstraction) or
+                    not _is_synchronous(callee._λ_constant))
+        return not _is_synchronous(operation)
+
+
+async def _resolved(value):
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+async def _evaluate(node, inputs, awaiting):
+    # pylint: disable=protected-access
+    if not awaiting(node):
+        return node._β(*inputs)
+    if isinstance(node, (_and, _or)):
+        left, right = node._λ_operands
+        value = await _evaluate(left, inputs, awaiting)
+        if bool(value) is isinstance(node, _or):
+            return value
+        return await _evaluate(right, inputs, awaiting)
+    if isinstance(node, _if):
+        cond, then, else_ = node._λ_operands
+        chosen = then if await _evaluate(cond, inputs, awaiting) else else_
+        return await _evaluate(chosen, inputs, awaiting)
+    if isinstance(node, _LambdaAbstraction):
+        return await _operation(node, inputs, awaiting)
+    return await _resolved(node._β(*inputs))
+
+
+async def _operation(node, inputs, awaiting):
+    # pylint: disable=protected-access
+    children = _children(node)
+    values = [None] * len(children)
+    concurrent = []
+    for position, child in enumerate(children):
+        if awaiting(child):
+            concurrent.append(position)
+        else:
+            values[position] = child._β(*inputs)
+    if len(concurrent) == 1:
+        position, = concurrent
+        values[position] = await _evaluate(children[position], inputs, awaiting)
+    elif concurrent:
+        results = await asyncio.gather(*(_evaluate(children[position], inputs, awaiting)
+                                         for position in concurrent))
+        for position, value in zip(concurrent, results):
+            values[position] = value
+
+    nb_args = len(node._λ_abstract_args)
+    origin, args = values[0], values[1:nb_args + 1]
+    kwargs = dict(zip(node._λ_abstract_kwargs, values[nb_args + 1:]))
+    operation = node._λ_operation
+    if _is_λ(operation) and not args and not kwargs:
+        # composition
+        return await _reduce(operation, (origin,), awaiting)
+    return await _resolved(operation(origin, *args, **kwargs))
+
+
+async def _reduce(expression, args, awaiting):
+    nb_vars = len(expression._λ_var_indices)  # pylint: disable=protected-access
+    if len(args) != nb_vars:
+        args = _unpack(args, nb_vars)
+    return await _evaluate(expression, tuple(args), awaiting)
+
+
+async def acall(expression, *args):
+    """ β-reduce `expression` with `args` like `expression(*args)`, awaiting the awaitable
+    results of its operations and evaluating concurrently the operands of each operation.
+    """
+    if not _is_λ(expression):
+        raise TypeError("Expected an abstraction, got a `%s` (%s)"
+                        % (type(expression).__name__, expression))
+    _check_variables(expression._λ_var_indices)  # pylint: disable=protected-access
+    return await _reduce(expression, args, _Analysis().analyse(expression))
+
+
+# marks the end of the items in the queues
+_END = object()
+
+
+class _Failure:
+    """ Exception raised while reading the source or reducing an item """
+    __slots__ = ('error',)
+
+    def __init__(self, error):
+        self.error = error
+
+
+def _stages(expression):
+    """ Split a composition into the expressions applied one after the other """
+    # pylint: disable=protected-access
+    stages = []
+    while (isinstance(expression, _LambdaAbstraction) and _is_λ(expression._λ_operation) and
+           not expression._λ_abstract_args and not expression._λ_abstract_kwargs):
+        stages.append(expression._λ_operation)
+        expression = expression._λ_origin
+    stages.append(expression)
+    return stages[::-1]
+
+
+async def _items(source):
+    if hasattr(source, '__aiter__'):
+        async for item in source:
+            yield item
+    else:
+        for item in source:
+            yield item
+
+
+async def _feed(source, window, queue, nb_ends, results):
+    items = _items(source).__aiter__()
+    index = 0
+    try:
+        while True:
+            await window.acquire()
+            try:
+                item = await items.__anext__()
+            except StopAsyncIteration:
+                break
+            await queue.put((index, item))
+            index += 1
+    except Exception as error:  # pylint: disable=broad-except
+        await results.put(_Failure(error))
+        return
+    for _ in range(nb_ends):
+        await queue.put(_END)
+
+
+async def _work(stage, awaiting, inputs, outputs, results):
+    while True:
+        entry = await inputs.get()
+        if entry is _END:
+            return
+        index, value = entry
+        try:
+            value = await _reduce(stage, (value,), awaiting)
+        except Exception as error:  # pylint: disable=broad-except
+            await results.put(_Failure(error))
+            return
+        await outputs.put((index, value))
+
+
+async def _run_stage(stage, inputs, outputs, concurrency, nb_ends, results):
+    awaiting = _Analysis().analyse(stage)
+    await asyncio.gather(*(_work(stage, awaiting, inputs, outputs, results)
+                           for _ in range(concurrency)))
+    for _ in range(nb_ends):
+        await outputs.put(_END)
+
+
+async def _stream(stages, source, concurrency, ordered):
+    # the items being reduced, queued or waiting for their turn to be yielded are bounded
+    window = asyncio.Semaphore(2 * concurrency * len(stages))
+    queues = [asyncio.Queue(concurrency) for _ in stages]
+    results = asyncio.Queue(concurrency)
+    tasks = [asyncio.ensure_future(_feed(source, window, queues[0], concurrency, results))]
+    for stage, inputs, outputs in zip(stages, queues, queues[1:] + [results]):
+        nb_ends = 1 if outputs is results else concurrency
+        tasks.append(asyncio.ensure_future(
+            _run_stage(stage, inputs, outputs, concurrency, nb_ends, results)))
+
+    pending, next_index = {}, 0
+    try:
+        while True:
+            entry = await results.get()
+            if entry is _END:
+                return
+            if isinstance(entry, _Failure):
+                raise entry.error
+            index, value = entry
+            if not ordered:
+                window.release()
+                yield value
+                continue
+            pending[index] = value
+            while next_index in pending:
+                value = pending.pop(next_index)
+                next_index += 1
+                window.release()
+                yield value
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def astream(expression, source, concurrency=1, ordered=True):
+    """ Return an async iterator of the results of `expression` reduced like with `acall`
+    on each item of `source`, an async iterable or an iterable, with up to `concurrency`
+    items reduced at a time by each stage of a composition. Each item is the argument
+    of the β-reduction, or its packed arguments if the expression holds several variables.
+    With `ordered=False`, the results are yielded as soon as they're computed.
+    """
+    if not _is_λ(expression):
+        raise TypeError("Expected an abstraction, got a `%s` (%s)"
+                        % (type(expression).__name__, expression))
+    _check_variables(expression._λ_var_indices)  # pylint: disable=protected-access
+    if concurrency < 1:
+        raise ValueError("`concurrency` must be at least 1, got %d" % concurrency)
+    return _stream(_stages(expression), source, concurrency, ordered)
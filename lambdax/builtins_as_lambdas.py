@@ -5,6 +5,7 @@ working as expected both inside and outside λ-abstractions.
 """
 
 import builtins
+import sys
 
 from lambdax.lambda_calculus import λ as _λ
 
@@ -12,6 +13,9 @@ from lambdax.lambda_calculus import λ as _λ
 # pylint: disable=redefined-builtin
 
 abs_λ = _λ(abs)
+if sys.version_info >= (3, 10):
+    aiter_λ = _λ(aiter)
+    anext_λ = _λ(anext)
 all_λ = _λ(all)
 any_λ = _λ(any)
 ascii_λ = _λ(ascii)
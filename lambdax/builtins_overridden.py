@@ -5,19 +5,50 @@ See module `lambdax.builtins_as_lambdas`.
 """
 
 import builtins
+import sys
 from functools import wraps as _wraps
-from itertools import chain as _chain
 
-from lambdax.lambda_calculus import is_λ as _is_λ, λ as _λ
+from lambdax.lambda_calculus import _AddDunderMethods, λ as _λ
 
 
 def _convert(f):
+    as_λ = _λ(f)
+    # checking the class of the type is much faster than `isinstance(a, abstraction_type)`,
+    # which goes through `__instancecheck__` because of the metaclass
+    abstraction = _AddDunderMethods
+    # the built-in functions, since this module overrides them
+    length, is_instance, kind = builtins.len, builtins.isinstance, builtins.type
+
     @_wraps(f)
     def fun(*args, **kwargs):
         """ Replace the built-in function `f` """
-        as_λ = builtins.any(_is_λ(a) for a in _chain(args, kwargs.values()))
-        to_call = _λ(f) if as_λ else f
-        return to_call(*args, **kwargs)
+        # the usual calls (with up to 3 positional arguments) are dispatched
+        # without iterating over the arguments
+        if not kwargs:
+            nb_args = length(args)
+            if nb_args == 1:
+                a, = args
+                return as_λ(a) if is_instance(kind(a), abstraction) else f(a)
+            if nb_args == 2:
+                a, b = args
+                if is_instance(kind(a), abstraction) or is_instance(kind(b), abstraction):
+                    return as_λ(a, b)
+                return f(a, b)
+            if nb_args == 3:
+                a, b, c = args
+                if (is_instance(kind(a), abstraction) or is_instance(kind(b), abstraction) or
+                        is_instance(kind(c), abstraction)):
+                    return as_λ(a, b, c)
+                return f(a, b, c)
+            if not nb_args:
+                return f()
+        for a in args:
+            if is_instance(kind(a), abstraction):
+                return as_λ(*args, **kwargs)
+        for a in kwargs.values():
+            if is_instance(kind(a), abstraction):
+                return as_λ(*args, **kwargs)
+        return f(*args, **kwargs)
 
     return fun
 
@@ -25,6 +56,9 @@ def _convert(f):
 # pylint: disable=redefined-builtin
 
 abs = _convert(abs)
+if sys.version_info >= (3, 10):
+    aiter = _convert(aiter)
+    anext = _convert(anext)
 all = _convert(all)
 any = _convert(any)
 ascii = _convert(ascii)
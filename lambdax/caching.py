@@ -0,0 +1,275 @@
+""" Memoize the β-reductions of λ-abstractions.
+
+`memoize(expression)` returns an equivalent abstraction caching the results of its
+β-reductions, keyed by the values of its variables, with a bounded LRU eviction like
+`functools.lru_cache`. It's still an abstraction, that can be composed and combined
+with any other one.
+
+The unhashable arguments can't be keys of the cache. Depending on `unhashable`:
+- 'bypass': the expression is just reduced, without cache,
+- 'id': the arguments are identified by their `id()`, and the cached result is discarded
+  when they are garbage-collected. It requires them to be weakly referenceable
+  (which excludes e.g. lists and dicts), otherwise the cache is bypassed.
+The cache can be used by several threads at once; like with `functools.lru_cache`,
+the expression may be reduced by several of them for the same key.
+
+`incremental(expression)` returns a stateful evaluator keeping the value of each
+sub-expression for the current values of the variables: when some of them are updated,
+only the sub-expressions depending on them are computed again. Since the other ones
+are never computed again, the functions with side effects are called only when the
+values of their variables change. A value is changed when it's replaced with another
+object: after mutating it in place, its dependents must be invalidated (see `invalidate`).
+"""
+
+from collections import OrderedDict as _OrderedDict, namedtuple as _namedtuple
+import threading
+import weakref
+
+from lambdax.lambda_calculus import (
+    _check_variables, _set_attribute,
+    _ConstantAbstraction, _IdentityAbstraction, _LambdaAbstractionBase, is_λ as _is_λ
+)
+from lambdax.rewriting import _variable_index
+from lambdax.sharing import _evaluators, _walk_all, _Structures
+
+_CacheInfo = _namedtuple('CacheInfo', ('hits', 'misses', 'evictions', 'bypasses',
+                                        'maxsize', 'currsize'))
+
+_UNHASHABLE_POLICIES = ('bypass', 'id')
+
+_MISSING = object()
+
+
+class _IdKey:
+    """ Part of a key identifying an unhashable argument by its `id()` """
+    __slots__ = ('id',)
+
+    def __init__(self, obj):
+        self.id = id(obj)
+
+    def __eq__(self, other):
+        return isinstance(other, _IdKey) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class _Stats:
+    __slots__ = ('hits', 'misses', 'evictions', 'bypasses')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.hits = self.misses = self.evictions = self.bypasses = 0
+
+
+class _MemoizedAbstraction(_LambdaAbstractionBase):
+    def __init__(self, expression, maxsize, typed, unhashable):
+        # pylint: disable=protected-access
+        _set_attribute(self, '_λ_expression', expression)
+        _set_attribute(self, '_λ_indices', tuple(sorted(expression._λ_var_indices)))
+        _set_attribute(self, '_λ_maxsize', maxsize)
+        _set_attribute(self, '_λ_typed', typed)
+        _set_attribute(self, '_λ_by_id', unhashable == 'id')
+        _set_attribute(self, '_λ_cache', _OrderedDict())
+        _set_attribute(self, '_λ_stats', _Stats())
+        # reentrant, since a result can be discarded by the garbage collector at any time
+        _set_attribute(self, '_λ_lock', threading.RLock())
+        super().__init__(expression._λ_var_indices)
+
+    def _λ_key(self, input_data):
+        values = tuple(input_data[i] for i in self._λ_indices)
+        if self._λ_typed:
+            values += tuple(type(v) for v in values)
+        return values
+
+    def _λ_unhashable_key(self, input_data):
+        """ Return the key where the unhashable values are replaced with their id, and these
+        values; or None if the cache must be bypassed.
+        """
+        if not self._λ_by_id:
+            return None, ()
+        key, by_id = [], []
+        for value in self._λ_key(input_data):
+            try:
+                hash(value)
+            except TypeError:
+                try:
+                    weakref.ref(value)
+                except TypeError:
+                    return None, ()
+                by_id.append(value)
+                value = _IdKey(value)
+            key.append(value)
+        return tuple(key), by_id
+
+    def _β(self, *input_data):
+        # pylint: disable=protected-access
+        cache, stats = self._λ_cache, self._λ_stats
+        key, by_id = self._λ_key(input_data), ()
+        try:
+            hash(key)
+        except TypeError:
+            key, by_id = self._λ_unhashable_key(input_data)
+            if key is None:
+                with self._λ_lock:
+                    stats.bypasses += 1
+                return self._λ_expression._β(*input_data)
+
+        with self._λ_lock:
+            result = cache.get(key, _MISSING)
+            if result is not _MISSING:
+                stats.hits += 1
+                cache.move_to_end(key)
+                return result
+            stats.misses += 1
+
+        # reduced without the lock, so that the other threads aren't blocked meanwhile
+        result = self._λ_expression._β(*input_data)
+        with self._λ_lock:
+            cache[key] = result
+            cache.move_to_end(key)
+            if self._λ_maxsize is not None and len(cache) > self._λ_maxsize:
+                cache.popitem(last=False)
+                stats.evictions += 1
+        for value in by_id:
+            weakref.finalize(value, self._λ_discard, key)
+        return result
+
+    def _λ_discard(self, key):
+        with self._λ_lock:
+            self._λ_cache.pop(key, None)
+
+    def __reduce__(self):
+        # the cache is not pickled
+        return memoize, (self._λ_expression, self._λ_maxsize, self._λ_typed,
+                         'id' if self._λ_by_id else 'bypass')
+
+
+def _memoized(expression):
+    if not isinstance(expression, _MemoizedAbstraction):
+        raise TypeError("Expected a memoized abstraction, got a `%s` (%s)"
+                        % (type(expression).__name__, expression))
+    return expression
+
+
+def memoize(expression, maxsize=128, typed=False, unhashable='bypass'):
+    """ Return an abstraction equivalent to `expression`, that caches the results
+    of its β-reductions with the last `maxsize` values of its variables (no limit if None).
+    With `typed`, values of different types (e.g. 1 and 1.0) are cached separately.
+    `unhashable` tells how to handle unhashable values: 'bypass' or 'id'.
+    """
+    if not _is_λ(expression):
+        raise TypeError("Expected an abstraction, got a `%s` (%s)"
+                        % (type(expression).__name__, expression))
+    if unhashable not in _UNHASHABLE_POLICIES:
+        raise ValueError("`unhashable` must be one of %s, got %r"
+                         % (', '.join(_UNHASHABLE_POLICIES), unhashable))
+    if maxsize is not None and maxsize < 0:
+        raise ValueError("`maxsize` must be positive or None, got %d" % maxsize)
+    return _MemoizedAbstraction(expression, maxsize, typed, unhashable)
+
+
+def cache_info(memoized):
+    """ Return the statistics of the cache of a memoized abstraction """
+    # pylint: disable=protected-access
+    memoized = _memoized(memoized)
+    with memoized._λ_lock:
+        stats = memoized._λ_stats
+        return _CacheInfo(stats.hits, stats.misses, stats.evictions, stats.bypasses,
+                          memoized._λ_maxsize, len(memoized._λ_cache))
+
+
+def cache_clear(memoized):
+    """ Empty the cache of a memoized abstraction and reset its statistics """
+    # pylint: disable=protected-access
+    memoized = _memoized(memoized)
+    with memoized._λ_lock:
+        memoized._λ_cache.clear()
+        memoized._λ_stats.reset()
+
+
+class _IncrementalEvaluator:
+    """ Evaluator of an expression keeping the values of its sub-expressions,
+    see `incremental`; unlike the expressions, it's not meant to be shared by threads
+    """
+
+    def __init__(self, expression):
+        # pylint: disable=protected-access
+        root = _Structures().merge(expression)
+        nodes = [node for node in _walk_all((root,))
+                 if not isinstance(node, (_ConstantAbstraction, _IdentityAbstraction))]
+        self._evaluate, = _evaluators((root,), {id(node) for node in nodes})
+        self._variable_indices = expression._λ_var_indices
+        # index of a variable -> ids of the nodes whose value depends on it
+        self._dependents = {index: [] for index in self._variable_indices}
+        for node in nodes:
+            for index in node._λ_var_indices:
+                self._dependents[index].append(id(node))
+        self._inputs = [_MISSING] * len(self._variable_indices)
+        self._values = {}  # id(node) -> value for the current inputs
+
+    def _variable(self, name):
+        """ Index of the variable of the expression named `name` """
+        index = _variable_index(name)
+        if index is None:
+            raise TypeError("`%s` is not the name of a variable" % name)
+        if index not in self._variable_indices:
+            raise TypeError("x%d is not a variable of the expression" % (index + 1))
+        return index
+
+    def update(self, *args, **variables):
+        """ Give new values to some variables, in order from x1 or by name (e.g. `x3=5`),
+        and return the value of the expression, computing again only the sub-expressions
+        depending on the variables whose value changed. The values are compared by
+        identity: the same object, even mutated in place, is not a change.
+        """
+        values = dict(enumerate(args))
+        for name, value in variables.items():
+            index = self._variable(name)
+            if index in values:
+                raise TypeError("x%d is given several values" % (index + 1))
+            values[index] = value
+        inputs, cache = self._inputs, self._values
+        for index, value in values.items():
+            if index not in self._variable_indices:
+                raise TypeError("x%d is not a variable of the expression" % (index + 1))
+            if inputs[index] is not value:
+                inputs[index] = value
+                for node_id in self._dependents[index]:
+                    cache.pop(node_id, None)
+        return self.value
+
+    def invalidate(self, *names):
+        """ Compute again the sub-expressions depending on the variables named `names`
+        (e.g. 'x2'), or on any variable if none is given, when the value is next needed:
+        e.g. once the current value of one of them has been mutated in place.
+        """
+        indices = [self._variable(name) for name in names] or self._variable_indices
+        for index in indices:
+            for node_id in self._dependents[index]:
+                self._values.pop(node_id, None)
+
+    @property
+    def value(self):
+        """ Value of the expression for the current values of the variables """
+        missing = [i for i, value in enumerate(self._inputs) if value is _MISSING]
+        if missing:
+            raise TypeError("No value given yet to %s"
+                            % ', '.join('x%d' % (i + 1) for i in missing))
+        return self._evaluate(self._inputs, self._values)
+
+
+def incremental(expression):
+    """ Return an evaluator of `expression`, whose `update` method gives new values to some
+    variables and returns the value of the expression, only computing again the
+    sub-expressions depending on them: the other ones keep their value.
+    A variable given the same object as before keeps its dependents' values, unless
+    they're invalidated with the `invalidate` method.
+    """
+    if not _is_λ(expression):
+        raise TypeError("Expected an abstraction, got a `%s` (%s)"
+                        % (type(expression).__name__, expression))
+    _check_variables(expression._λ_var_indices)  # pylint: disable=protected-access
+    return _IncrementalEvaluator(expression)
@@ -0,0 +1,138 @@
+""" Evaluate λ-abstractions on whole columns of values, without NumPy.
+
+`evaluate_columns(expression, column1, column2, ...)` gives the results of the
+expression on each row of the columns (any sequences of the same length, e.g. lists,
+`array.array` or memoryviews), like `list(starmap(expression, zip(column1, column2...)))`.
+But instead of walking the tree of the expression once per row, each node is evaluated
+once on the whole columns, by mapping its operation on the columns of its operands:
+the interpreter spends its time in `map` rather than in the β-reductions of the nodes,
+which pays off for wide and shallow expressions on many rows.
+
+`and_`, `or_` and `if_` evaluate their lazy operands only on the rows that need them,
+like the β-reductions would. The results are the same as row by row, but the functions
+are called node by node: when the expression has side effects, they come in another
+order, and when several rows would fail, the error raised may come from another row.
+"""
+
+import array
+import itertools
+
+from lambdax.lambda_calculus import (
+    _apply, _arity_error, _reducer,
+    _ConstantAbstraction, _IdentityAbstraction, _LambdaAbstraction,
+    and_ as _and, or_ as _or, if_ as _if, is_λ as _is_λ
+)
+from lambdax.tree import children as _children
+
+
+def _strict_children(node):
+    """ The children of `node` evaluated on every row """
+    # pylint: disable=protected-access
+    if isinstance(node, (_and, _or, _if)):
+        return node._λ_operands[:1]
+    return _children(node)
+
+
+def _named_call(function, nb_positional, names):
+    """ Call `function` with its last arguments as the named arguments `names` """
+    def call(*values):
+        return function(*values[:nb_positional], **dict(zip(names, values[nb_positional:])))
+
+    return call
+
+
+class _Columns:
+    def __init__(self, columns, size):
+        self._columns = columns
+        self._size = size
+
+    def _values(self, node, values):
+        """ Values of an evaluated node on every row, as an iterable """
+        # pylint: disable=protected-access
+        if isinstance(node, _ConstantAbstraction):
+            return itertools.repeat(node._λ_constant, self._size)
+        return values[id(node)]
+
+    def evaluate(self, root):
+        """ Return the list of the values of `root` on every row """
+        values = {}
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if id(node) in values:
+                continue
+            if isinstance(node, _ConstantAbstraction):
+                values[id(node)] = None
+            elif not expanded:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(_strict_children(node)))
+            else:
+                values[id(node)] = self._node(node, [self._values(child, values)
+                                                     for child in _strict_children(node)])
+        return list(self._values(root, values))
+
+    def _subset(self, rows, node):
+        """ Evaluate `node` only on the given rows """
+        if not rows:
+            return []
+        columns = [[column[row] for row in rows] for column in self._columns]
+        return _Columns(columns, len(rows)).evaluate(node)
+
+    def _node(self, node, children_values):
+        # pylint: disable=protected-access
+        if isinstance(node, _IdentityAbstraction):
+            return self._columns[next(iter(node._λ_var_indices))]
+        if isinstance(node, (_and, _or)):
+            left = list(children_values[0])
+            selected = isinstance(node, _and)
+            rows = [row for row, value in enumerate(left) if bool(value) is selected]
+            for row, value in zip(rows, self._subset(rows, node._λ_operands[1])):
+                left[row] = value
+            return left
+        if isinstance(node, _if):
+            _, then, else_ = node._λ_operands
+            truths = [bool(value) for value in children_values[0]]
+            result = [None] * self._size
+            for branch, selected in ((then, True), (else_, False)):
+                rows = [row for row, truth in enumerate(truths) if truth is selected]
+                for row, value in zip(rows, self._subset(rows, branch)):
+                    result[row] = value
+            return result
+        if isinstance(node, _LambdaAbstraction):
+            return self._operation(node, children_values)
+        # unknown kind of abstraction, just reduce it row by row
+        return list(map(node._β, *self._columns))
+
+    def _operation(self, node, children_values):
+        # pylint: disable=protected-access
+        origin, operands = children_values[0], children_values[1:]
+        operation = node._λ_operation
+        names = tuple(node._λ_abstract_kwargs)
+        if names:
+            nb_positional = len(children_values) - len(names)
+            return list(map(_named_call(operation, nb_positional, names), *children_values))
+        if operation is _apply and isinstance(node._λ_origin, _ConstantAbstraction):
+            return list(map(node._λ_origin._λ_constant, *operands))
+        if _is_λ(operation) and not operands and len(operation._λ_var_indices) == 1:
+            # composition with an abstraction that can be evaluated on a column too
+            origin = list(origin)
+            return _Columns([origin], len(origin)).evaluate(operation)
+        return list(map(operation, origin, *operands))
+
+
+def evaluate_columns(expression, *columns, typecode=None):
+    """ Return the list of the results of `expression` on each row of the columns, one per
+    variable, or an `array.array` of `typecode` if given. Each node is evaluated on
+    whole columns, which is faster than `map` on enough rows for shallow expressions.
+    """
+    _reducer(expression)
+    nb_vars = len(expression._λ_var_indices)  # pylint: disable=protected-access
+    if len(columns) != nb_vars:
+        raise _arity_error(nb_vars, len(columns))
+    columns = [column if isinstance(column, list) else list(column) for column in columns]
+    size = len(columns[0])
+    if any(len(column) != size for column in columns):
+        raise ValueError("The columns must have the same length, got %s"
+                         % ', '.join(str(len(column)) for column in columns))
+    results = _Columns(columns, size).evaluate(expression)
+    return results if typecode is None else array.array(typecode, results)
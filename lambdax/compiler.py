@@ -0,0 +1,291 @@
+""" Compile λ-abstractions to native Python functions.
+
+Reducing an expression walks its whole tree on each call, which makes it about
+20 times slower than a usual `lambda`. Here the tree is walked only once, to generate
+the source of an equivalent function where:
+- the operators are written with their native syntax (`a + b`, `a[b]`, `a.b`, `-a`...),
+- the lazy `and_`, `or_` and `if_` become the keywords `and`, `or` and `if ... else`,
+- the constants (and the functions that can't be written natively) are bound as
+  closure variables.
+
+The compiled function takes exactly one positional argument per variable of the
+expression; use `itertools.starmap` to apply it on packed arguments.
+Optionally, the sub-expressions that don't depend on any variable are evaluated once
+at compilation (see `lambdax.rewriting.fold`).
+"""
+
+import itertools
+import keyword
+import linecache
+import operator
+import unicodedata
+
+from lambdax.lambda_calculus import (
+    _apply, _check_variables, _reversed_operations,
+    _ConstantAbstraction, _IdentityAbstraction, _LambdaAbstraction,
+    and_ as _and, or_ as _or, if_ as _if, is_λ as _is_λ
+)
+from lambdax.rewriting import _NARY_OPERATORS, fold as _fold
+
+_BINARY_OPERATORS = {
+    operator.add: '+',
+    operator.sub: '-',
+    operator.mul: '*',
+    operator.matmul: '@',
+    operator.truediv: '/',
+    operator.floordiv: '//',
+    operator.mod: '%',
+    operator.pow: '**',
+    operator.lshift: '<<',
+    operator.rshift: '>>',
+    operator.and_: '&',
+    operator.or_: '|',
+    operator.xor: '^',
+    operator.lt: '<',
+    operator.le: '<=',
+    operator.eq: '==',
+    operator.ne: '!=',
+    operator.ge: '>=',
+    operator.gt: '>',
+    operator.is_: 'is',
+    operator.is_not: 'is not',
+}
+
+_UNARY_OPERATORS = {
+    operator.neg: '-',
+    operator.pos: '+',
+    operator.invert: '~',
+    operator.inv: '~',
+    operator.not_: 'not ',
+}
+
+# beyond this level of nested parentheses, a sub-expression is computed in its own statement
+# (when it doesn't change the order of evaluation) to stay far from the limits of the parser
+_MAX_NESTING = 50
+
+_compiled_count = itertools.count()
+
+
+def _lookup(table, key):
+    """ Like `table.get(key)`, but also for unhashable keys (e.g. abstractions) """
+    try:
+        return table.get(key)
+    except TypeError:
+        return None
+
+
+def _is_attribute_name(name):
+    """ Tell if `getattr(obj, name)` can be written `obj.name` """
+    return (isinstance(name, str) and name.isidentifier() and not keyword.iskeyword(name) and
+            unicodedata.normalize('NFKC', name) == name)
+
+
+class _Compiler:
+    def __init__(self, parameters):
+        self._parameters = tuple(parameters)
+        self._closure = {}  # id(value) -> (name, value)
+        self._statements = []
+
+    def _bind(self, value):
+        """ Get the name of the closure variable holding `value` """
+        name, _ = self._closure.setdefault(id(value), ('_c%d' % len(self._closure), value))
+        return name
+
+    def compile(self, expression):
+        """ Return a function equivalent to the β-reduction of `expression` """
+        body = self._generate(expression)
+        return self.function('λ_compiled', self._parameters,
+                             self._statements + ['return %s' % body])
+
+    def source(self, expression, parameters):
+        """ Generate the source of `expression` with its variables named `parameters`,
+        sharing the closure with the expressions generated before.
+        Return the statements to run beforehand, and the source of the expression.
+        """
+        self._parameters = tuple(parameters)
+        nb_statements = len(self._statements)
+        body = self._generate(expression)
+        return self._statements[nb_statements:], body
+
+    def function(self, name, parameters, lines):
+        """ Return the function named `name` taking `parameters`, whose body is the
+        given lines of source, that can refer to the closure.
+        """
+        lines = (['def _λ_factory(%s):' % ', '.join(n for n, _ in self._closure.values()),
+                  '    def %s(%s):' % (name, ', '.join(parameters))] +
+                 ['        %s' % line for line in lines] +
+                 ['    return %s' % name])
+        source = '\n'.join(lines) + '\n'
+
+        # register the source to get meaningful tracebacks from the compiled function
+        filename = '<λ-compiled-%d>' % next(_compiled_count)
+        linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+        namespace = {}
+        exec(compile(source, filename, 'exec'), namespace)  # pylint: disable=exec-used
+        return namespace['_λ_factory'](*(value for _, value in self._closure.values()))
+
+    def _generate(self, root):
+        """ Generate the source of the expression `root`.
+        The generators created by `_node` yield the children they need the source of,
+        so that the (potentially very deep) tree is walked without recursion.
+        """
+        stack = [(self._node(root, True, True), root, True, True)]
+        result = None
+        while stack:
+            generator, _, first, strict = stack[-1]
+            try:
+                child = generator.send(result)
+            except StopIteration as stop:
+                stack.pop()
+                result = self._limit_nesting(first, strict, *stop.value)
+            else:
+                stack.append((self._node(*child),) + child)
+                result = None
+        return result[0]
+
+    def _limit_nesting(self, first, strict, source, nesting):
+        if nesting <= _MAX_NESTING:
+            return source, nesting
+        if first and strict:
+            # nothing is evaluated before this node, and it's always evaluated:
+            # computing it beforehand doesn't change anything
+            name = '_t%d' % len(self._statements)
+            self._statements.append('%s = %s' % (name, source))
+            return name, 0
+        return self._fallback(source), 0
+
+    def _fallback(self, source):
+        """ Generate a call to a function computing the source of a node on its own.
+        The node isn't first, so neither are its sub-expressions: no statement was added
+        for them, and its source is just one level deeper than the limit.
+        """
+        function = self.function('λ_compiled', self._parameters, ['return %s' % source])
+        return '%s(%s)' % (self._bind(function), ', '.join(self._parameters))
+
+    def _node(self, node, first, strict):
+        """ Generate the source of `node`, `first` telling if nothing is evaluated before it
+        in the current statement and `strict` if it's not in a lazily evaluated operand.
+        Return the source and its level of nested parentheses.
+        """
+        # pylint: disable=protected-access
+        if isinstance(node, _IdentityAbstraction):
+            return self._parameters[next(iter(node._λ_var_indices))], 0
+        if isinstance(node, _ConstantAbstraction):
+            return self._bind(node._λ_constant), 0
+
+        if isinstance(node, (_and, _or)):
+            left, right = node._λ_operands
+            left_source, left_nesting = yield left, first, strict
+            right_source, right_nesting = yield right, False, False
+            return ('(%s %s %s)' % (left_source, 'and' if isinstance(node, _and) else 'or',
+                                    right_source),
+                    max(left_nesting, right_nesting) + 1)
+        if isinstance(node, _if):
+            cond, then, else_ = node._λ_operands
+            cond_source, cond_nesting = yield cond, first, strict
+            then_source, then_nesting = yield then, False, False
+            else_source, else_nesting = yield else_, False, False
+            return ('(%s if %s else %s)' % (then_source, cond_source, else_source),
+                    max(cond_nesting, then_nesting, else_nesting) + 1)
+
+        if not isinstance(node, _LambdaAbstraction):
+            # unknown kind of abstraction, just reduce it as usual
+            return '%s._β(%s)' % (self._bind(node), ', '.join(self._parameters)), 0
+
+        origin, nesting = yield node._λ_origin, first, strict
+        args = []
+        for arg in node._λ_abstract_args:
+            source, arg_nesting = yield arg, False, strict
+            args.append(source)
+            nesting = max(nesting, arg_nesting)
+        kwargs = {}
+        for name, arg in node._λ_abstract_kwargs.items():
+            kwargs[name], arg_nesting = yield arg, False, strict
+            nesting = max(nesting, arg_nesting)
+        return self._operation(node, origin, args, kwargs), nesting + 1
+
+    def _operation(self, node, origin, args, kwargs):
+        """ Generate the source applying the operation of `node` on its operands' sources """
+        # pylint: disable=protected-access
+        operation = node._λ_operation
+        if kwargs:
+            return self._call(operation, origin, args, kwargs)
+
+        if operation is _apply:
+            callee = node._λ_origin
+            if isinstance(callee, _ConstantAbstraction):
+                native = self._native(callee._λ_constant, args[0] if args else None,
+                                      node._λ_abstract_args[1:], args[1:])
+                if native:
+                    return native
+            return self._call(None, origin, args, kwargs)
+
+        if _is_λ(operation):
+            if len(operation._λ_var_indices) == 1:
+                # composition with an abstraction that can be compiled too
+                return '%s(%s)' % (self._bind(compile_(operation)), origin)
+            return self._call(operation, origin, args, kwargs)
+
+        reversed_operation = _lookup(_reversed_operations, operation)
+        if reversed_operation is not None and len(args) == 1 and isinstance(
+                node._λ_abstract_args[0], (_ConstantAbstraction, _IdentityAbstraction)):
+            # the order of evaluation can be swapped since the operand has no side effect
+            symbol = _lookup(_BINARY_OPERATORS, reversed_operation)
+            if symbol:
+                return '(%s %s %s)' % (args[0], symbol, origin)
+
+        return (self._native(operation, origin, node._λ_abstract_args, args) or
+                self._call(operation, origin, args, kwargs))
+
+    def _native(self, operation, first_source, arg_nodes, arg_sources):
+        """ Generate the native syntax of `operation(first, *args)` if there is one """
+        # pylint: disable=protected-access
+        if first_source is None:
+            return None
+        if not arg_sources:
+            symbol = _lookup(_UNARY_OPERATORS, operation)
+            return '(%s%s)' % (symbol, first_source) if symbol else None
+        symbol = _lookup(_NARY_OPERATORS, operation)
+        if symbol:
+            return '(%s)' % (' %s ' % symbol).join([first_source] + list(arg_sources))
+        if len(arg_sources) != 1:
+            return None
+        symbol = _lookup(_BINARY_OPERATORS, operation)
+        if symbol:
+            return '(%s %s %s)' % (first_source, symbol, arg_sources[0])
+        if operation is operator.getitem:
+            return '%s[%s]' % (first_source, arg_sources[0])
+        if (operation is getattr and isinstance(arg_nodes[0], _ConstantAbstraction) and
+                _is_attribute_name(arg_nodes[0]._λ_constant)):
+            return '%s.%s' % (first_source, arg_nodes[0]._λ_constant)
+        return None
+
+    def _call(self, function, first, args, kwargs):
+        """ Generate the call `function(first, *args, **kwargs)`; when `function` is None,
+        `first` is the callee.
+        """
+        if function is None:
+            callee, positional = first, list(args)
+        else:
+            callee, positional = self._bind(function), [first] + list(args)
+        named = [
+            '%s=%s' % (name, source) if _is_attribute_name(name) else
+            '**{%r: %s}' % (name, source)
+            for name, source in kwargs.items()
+        ]
+        return '%s(%s)' % (callee, ', '.join(positional + named))
+
+
+def compile_(expression, fold=False):
+    """ Compile a λ-abstraction to an equivalent native function, that takes as many
+    positional arguments as there are variables in the expression.
+    With `fold`, the sub-expressions not depending on any variable are evaluated beforehand.
+    """
+    if not _is_λ(expression):
+        raise TypeError("Expected an abstraction, got a `%s` (%s)"
+                        % (type(expression).__name__, expression))
+    variable_indices = expression._λ_var_indices  # pylint: disable=protected-access
+    _check_variables(variable_indices)
+    if fold:
+        expression = _fold(expression)
+    return _Compiler('x%d' % (i + 1) for i in range(len(variable_indices))).compile(expression)
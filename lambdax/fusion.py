@@ -0,0 +1,89 @@
+""" Apply a sequence of λ-abstractions on the rows of an iterable in one fused loop.
+
+`pipeline(rows).map(e1).filter(p).map(e2)` is like
+`map(e2, filter(p, map(e1, rows)))`, but the expressions of all the stages are compiled
+(see `lambdax.compiler`) into the body of a single generator:
+
+    for row in rows:
+        row = <source of e1>
+        if not <source of p>:
+            continue
+        row = <source of e2>
+        yield row
+
+There is no intermediate iterator nor any call of the expressions per row.
+A stage whose expression holds several variables unpacks the row like a `for` loop would.
+The pipeline is lazy, and its terminal operations (`to_list`, `first`, `count`) consume
+only the rows they need.
+"""
+
+from lambdax.compiler import _Compiler
+from lambdax.lambda_calculus import _reducer
+
+_MAP, _FILTER = 'map', 'filter'
+_ROW = '_row'
+
+
+class _Pipeline:
+    """ Stages to apply on the rows of an iterable, compiled together when iterated """
+
+    def __init__(self, rows, stages=()):
+        self._rows = rows
+        self._stages = stages
+        self._function = None
+
+    def _with(self, kind, expression):
+        _reducer(expression)
+        return _Pipeline(self._rows, self._stages + ((kind, expression),))
+
+    def map(self, expression):
+        """ Replace each row with the result of `expression` on it """
+        return self._with(_MAP, expression)
+
+    def filter(self, predicate):
+        """ Keep only the rows on which the expression `predicate` is true """
+        return self._with(_FILTER, predicate)
+
+    def _compile(self):
+        # pylint: disable=protected-access
+        compiler = _Compiler(())
+        lines = ['for %s in rows:' % _ROW]
+        for position, (kind, expression) in enumerate(self._stages):
+            nb_vars = len(expression._λ_var_indices)
+            if nb_vars == 1:
+                parameters = (_ROW,)
+            else:
+                parameters = tuple('_s%d_%d' % (position, i + 1) for i in range(nb_vars))
+                lines.append('    %s, = %s' % (', '.join(parameters), _ROW))
+            statements, source = compiler.source(expression, parameters)
+            lines.extend('    %s' % statement for statement in statements)
+            if kind == _MAP:
+                lines.append('    %s = %s' % (_ROW, source))
+            else:
+                lines.extend(['    if not %s:' % source, '        continue'])
+        lines.append('    yield %s' % _ROW)
+        return compiler.function('λ_pipeline', ('rows',), lines)
+
+    def __iter__(self):
+        if self._function is None:
+            self._function = self._compile()
+        return self._function(self._rows)
+
+    def to_list(self):
+        """ Return the list of the resulting rows """
+        return list(self)
+
+    def first(self, default=None):
+        """ Return the first resulting row, or `default` if there is none """
+        return next(iter(self), default)
+
+    def count(self):
+        """ Return the number of resulting rows """
+        return sum(1 for _ in self)
+
+
+def pipeline(rows):
+    """ Start a pipeline of stages applied on each row of the iterable `rows`, each stage
+    being added by calling `map` or `filter` on the pipeline with an expression.
+    """
+    return _Pipeline(rows)
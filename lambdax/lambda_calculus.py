@@ -6,24 +6,69 @@ Importing this module has no side-effect.
 """
 
 import abc
+import functools
 import itertools
 import numbers
 import operator
+import types
 
 _operators = vars(operator)
 
+# `operator.call` exists since Python 3.11: it must not replace the entry point
+# `_LambdaAbstractionBase.__call__` in the namespace of every subclass
+_NOT_OVERLOADED = {'__call__'}
+
 
 def _apply(fun, *args, **kwargs):
     return fun(*args, **kwargs)
 
 
+# reversed operations (e.g. the one behind __radd__) -> their original operation (e.g. add),
+# to let the tools inspecting an expression recognize them
+_reversed_operations = {}
+
+
+@functools.lru_cache(maxsize=None)
 def _reverse(fun):
     def _reversed_fun(a, b):
         return fun(b, a)
 
+    _reversed_operations[_reversed_fun] = fun
     return _reversed_fun
 
 
+# the nodes are built without going through `_LambdaAbstractionBase.__setattr__`,
+# which forbids any change afterwards
+_set_attribute = object.__setattr__
+
+# named arguments of the operations that have none, shared by all of them
+_NO_KWARGS = types.MappingProxyType({})
+
+# the sets of variable indices are immutable and shared by all the nodes holding
+# the same variables, so a node costs no set of its own
+_NO_VARIABLES = frozenset()
+_variable_sets = {_NO_VARIABLES: _NO_VARIABLES}
+
+
+def _variables(indices):
+    """ Return the shared frozenset of the variable indices `indices` """
+    indices = frozenset(indices)
+    return _variable_sets.setdefault(indices, indices)
+
+
+# the sets of variables that can be β-reduced: x1, x2, ..., xN (up to x9)
+_REDUCIBLE_VARIABLES = frozenset(frozenset(range(nb_vars)) for nb_vars in range(10))
+
+
+def _union(variables, nodes):
+    """ Return the shared frozenset of `variables` and the variables of `nodes` """
+    for node in nodes:
+        other = node._λ_var_indices  # pylint: disable=protected-access
+        if other is not variables and other and not other <= variables:
+            variables = _variables(variables | other)
+    return variables
+
+
 def _generate_magic_method(operation):
     def magic(self, *args, **kwargs):
         """ Convert an operator function to a "dunder"-method bound
@@ -34,39 +79,46 @@ def _generate_magic_method(operation):
     return magic
 
 
+@functools.lru_cache(maxsize=None)
+def _dunder_methods():
+    """ Magic methods of the abstractions, computed once and shared by all their classes """
+    # add operators declared in `operator` standard module (e.g. __add__, __mul__, ...)
+    from_operator = {
+        method_name: o
+        for method_name, o in (
+            ('__%s__' % op_name.rstrip('_'), o)
+            for op_name, o in _operators.items()
+            if not op_name.startswith('_')
+        ) if method_name in _operators and method_name not in _NOT_OVERLOADED
+    }
+    # add reverse operators defined on numbers (e.g. __radd__, etc.)
+    reverse_from_numbers = (
+        (method_name, _reverse(from_operator[base_method_name]))
+        for method_name, base_method_name in (
+            (method_name, method_name.replace('r', '', 1))
+            for method_name in dir(numbers.Integral)
+            if method_name.startswith('__r')
+        ) if base_method_name in from_operator
+    )
+    return {
+        method_name: _generate_magic_method(o)
+        for method_name, o in itertools.chain(from_operator.items(), reverse_from_numbers)
+    }
+
+
 class _AddDunderMethods(type):
     @classmethod
     def __prepare__(mcs, _name, _bases):
-        # add operators declared in `operator` standard module (e.g. __add__, __mul__, ...)
-        from_operator = {
-            method_name: o
-            for method_name, o in (
-                ('__%s__' % op_name.rstrip('_'), o)
-                for op_name, o in _operators.items()
-                if not op_name.startswith('_')
-            ) if method_name in _operators
-        }
-        # add reverse operators defined on numbers (e.g. __radd__, etc.)
-        reverse_from_numbers = (
-            (method_name, _reverse(from_operator[base_method_name]))
-            for method_name, base_method_name in (
-                (method_name, method_name.replace('r', '', 1))
-                for method_name in dir(numbers.Integral)
-                if method_name.startswith('__r')
-            ) if base_method_name in from_operator
-        )
-        return {
-            method_name: _generate_magic_method(o)
-            for method_name, o in itertools.chain(from_operator.items(), reverse_from_numbers)
-        }
+        return dict(_dunder_methods())
 
 
 class _LambdaAbstractionBase(metaclass=_AddDunderMethods):
-    _β_reducing = None
+    # the nodes are never mutated once built, so they can be shared between threads
+    __slots__ = ('_λ_var_indices', '__weakref__')
 
     def __init__(self, variable_indices):
-        """ :type variable_indices: set """
-        self._λ_var_indices = variable_indices
+        """ :type variable_indices: frozenset """
+        _set_attribute(self, '_λ_var_indices', _variables(variable_indices))
 
     @abc.abstractmethod
     def _β(self, *input_data):
@@ -76,45 +128,25 @@ class _LambdaAbstractionBase(metaclass=_AddDunderMethods):
         """ Entry point to reduce an entire expression, not a part of an expression.
         Can also be used to make an actual call as part of the expression.
         """
+        # the decision only depends on the call: the node itself is never mutated,
+        # so it can be reduced by several threads at once
         nb_args = len(args)
-        nb_vars = len(self._λ_var_indices)
-        if not self._β_reducing:
-            if (kwargs or bool(nb_args) ^ bool(nb_vars) or
-                    any(is_λ(v) for v in itertools.chain(args, kwargs.values()))):
-                # It's explicitly not a β-reduction, so this is part of the declaration
+        variable_indices = self._λ_var_indices
+        nb_vars = len(variable_indices)
+        if kwargs or bool(nb_args) ^ bool(nb_vars):
+            # It's explicitly not a β-reduction, so this is part of the declaration
+            return _LambdaAbstraction(self, _apply, args, kwargs)
+        for arg in args:
+            if isinstance(arg, _LambdaAbstractionBase):
                 return _LambdaAbstraction(self, _apply, args, kwargs)
 
-            unused_var = next((v for v in range(nb_vars) if v not in self._λ_var_indices), None)
-            if unused_var is not None:
-                # Unsupported/weird choice of variables
-                raise TypeError("Missing x%d in the expression of the λ-abstraction"
-                                % (unused_var + 1))
-
-            # Also, make all following calls to the λ-abstraction be β-reductions too, if possible.
-            # The incentive is to speed up vectorized operations or anytime a lambda is applied
-            # on many elements: it's defined once and applied many times.
-            if self._β_reducing is None:
-                self._β_reducing = True
-
-        if kwargs:
-            raise TypeError("**kwargs provided, whereas the λ-abstraction is being β-reduced:"
-                            " you must provide positional arguments only to apply it.")
+        if variable_indices not in _REDUCIBLE_VARIABLES:
+            _check_variables(variable_indices)
 
         if nb_args != nb_vars:
-            try:
-                # if we have exactly one argument provided for more variables,
-                # we consider it as an iterable of packed arguments
-                args, = args
-                nb_args = len(args)
-                assert nb_args == nb_vars
-            except Exception:
-                # To avoid mistakes, if the number of provided variables is wrong here
-                # to be a β-reduction, we still consider it's a missed attempt to β-reduce
-                # rather than a part of the declaration.
-                raise TypeError("The λ-abstraction holds %d variables, but %d arguments were "
-                                "given. If the intent was not to β-reduce the expression, you "
-                                "must name or surround with %s() at least one variable."
-                                % (nb_vars, nb_args, λ.__name__))
+            # if we have exactly one argument provided for more variables,
+            # we consider it as an iterable of packed arguments
+            args = _unpack(args, nb_vars)
 
         # Exactly all arguments are provided, let's β-reduce.
         return self._β(*args)
@@ -128,26 +160,39 @@ class _LambdaAbstractionBase(metaclass=_AddDunderMethods):
 
     __getattr__ = _generate_magic_method(getattr)
 
+    def __reduce__(self):
+        """ Pickle the abstraction with the format of `lambdax.serialization`: its
+        operations can be closures and `__getattr__` makes it look like it has
+        any attribute, which confuses the default protocol.
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from lambdax.serialization import dumps, loads
+        return loads, (dumps(self),)
+
     def __setattr__(self, name, value):
-        if name[:3] not in ('_λ_', '_β_'):
-            raise AttributeError("You cannot set an attribute on a λ-abstraction,"
-                                 " the expression is purely functional.")
-        super().__setattr__(name, value)
+        raise AttributeError("You cannot set an attribute on a λ-abstraction,"
+                             " the expression is purely functional.")
 
 
 class _LambdaAbstraction(_LambdaAbstractionBase):
+    __slots__ = ('_λ_origin', '_λ_operation', '_λ_abstract_args', '_λ_abstract_kwargs')
+
     def __init__(self, origin, operation, args, kwargs):
+        # pylint: disable=protected-access,super-init-not-called
         if not is_λ(origin):
             raise ValueError("Expected an abstraction, got a `%s` (%s)"
                              % (type(origin).__name__, origin))
-        self._λ_origin = origin
-        self._λ_operation = operation
-        self._λ_abstract_args = [λ(a) for a in args]
-        self._λ_abstract_kwargs = {k: λ(v) for k, v in kwargs.items()}
-        variables = self._λ_origin._λ_var_indices.copy()  # pylint: disable=protected-access
-        for a in itertools.chain(self._λ_abstract_args, self._λ_abstract_kwargs.values()):
-            variables |= a._λ_var_indices  # pylint: disable=protected-access
-        super().__init__(variables)
+        args = tuple([λ(a) for a in args]) if args else ()
+        kwargs = {k: λ(v) for k, v in kwargs.items()} if kwargs else _NO_KWARGS
+        variables = _union(origin._λ_var_indices, args)
+        if kwargs:
+            variables = _union(variables, kwargs.values())
+        # the attributes are set directly: this is the hot path of the construction
+        _set_attribute(self, '_λ_origin', origin)
+        _set_attribute(self, '_λ_operation', operation)
+        _set_attribute(self, '_λ_abstract_args', args)
+        _set_attribute(self, '_λ_abstract_kwargs', kwargs)
+        _set_attribute(self, '_λ_var_indices', variables)
 
     def _β(self, *input_data):
         return self._λ_operation(
@@ -159,21 +204,22 @@ class _LambdaAbstraction(_LambdaAbstractionBase):
 
 
 class _IdentityAbstraction(_LambdaAbstractionBase):
-    # this class cannot be optimized on β-reduction, because it would mutate
-    # instances (x, x1, x2, etc.) shared by all expressions
-    _β_reducing = False
+    __slots__ = ()
 
     def __init__(self, idx):
-        super().__init__({idx})
+        super().__init__((idx,))
 
     def _β(self, *input_data):
         return input_data[next(iter(self._λ_var_indices))]
 
 
 class _ConstantAbstraction(_LambdaAbstractionBase):
+    __slots__ = ('_λ_constant',)
+
     def __init__(self, constant):
-        self._λ_constant = constant
-        super().__init__(set())
+        # pylint: disable=super-init-not-called
+        _set_attribute(self, '_λ_constant', constant)
+        _set_attribute(self, '_λ_var_indices', _NO_VARIABLES)
 
     def __call__(self, *args, **kwargs):
         return _LambdaAbstraction(self, _apply, args, kwargs)
@@ -188,6 +234,38 @@ x2, x3, x4, x5, x6, x7, x8, x9 = _other_vars
 X2, X3, X4, X5, X6, X7, X8, X9 = _other_vars
 
 
+def _check_variables(variable_indices):
+    """ Ensure the variables of an expression are exactly x1, x2, ..., xN """
+    unused_var = next((v for v in range(len(variable_indices)) if v not in variable_indices), None)
+    if unused_var is not None:
+        # Unsupported/weird choice of variables
+        raise TypeError("Missing x%d in the expression of the λ-abstraction" % (unused_var + 1))
+
+
+def _unpack(args, nb_vars):
+    """ Return the packed arguments given as the only argument of a β-reduction """
+    nb_args = len(args)
+    if nb_args == 1:
+        try:
+            nb_args = len(args[0])
+        except TypeError:
+            pass
+        else:
+            if nb_args == nb_vars:
+                return args[0]
+    # To avoid mistakes, if the number of provided variables is wrong here
+    # to be a β-reduction, we still consider it's a missed attempt to β-reduce
+    # rather than a part of the declaration.
+    raise _arity_error(nb_vars, nb_args)
+
+
+def _arity_error(nb_vars, nb_args):
+    return TypeError("The λ-abstraction holds %d variables, but %d arguments were "
+                     "given. If the intent was not to β-reduce the expression, you "
+                     "must name or surround with %s() at least one variable."
+                     % (nb_vars, nb_args, λ.__name__))
+
+
 def λ(lambda_abstraction):
     """ Force the expression to be an abstraction
     :rtype: _LambdaAbstractionBase
@@ -222,18 +300,64 @@ def chaining(f, g):
     return comp(g, f)
 
 
+def _reducer(expression):
+    """ Check once that `expression` can be β-reduced with positional arguments,
+    and return the function actually reducing it.
+    """
+    if not is_λ(expression):
+        raise TypeError("Expected an abstraction, got a `%s` (%s)"
+                        % (type(expression).__name__, expression))
+    _check_variables(expression._λ_var_indices)  # pylint: disable=protected-access
+    if not expression._λ_var_indices:  # pylint: disable=protected-access
+        raise TypeError("The λ-abstraction holds no variable, it can't be applied on items")
+    return expression._β  # pylint: disable=protected-access
+
+
+def _checked_packs(iterable, nb_vars):
+    for args in iterable:
+        if len(args) != nb_vars:
+            raise _arity_error(nb_vars, len(args))
+        yield args
+
+
+def map_(expression, iterable):
+    """ Like `map(expression, iterable)`, each item being the only argument of the
+    β-reduction, or its packed arguments if the expression holds several variables.
+    The checks done by each call to an expression are done only once here.
+    """
+    reduce = _reducer(expression)
+    nb_vars = len(expression._λ_var_indices)  # pylint: disable=protected-access
+    if nb_vars == 1:
+        return map(reduce, iterable)
+    return itertools.starmap(reduce, _checked_packs(iterable, nb_vars))
+
+
+def starmap(expression, iterable):
+    """ Like `itertools.starmap(expression, iterable)`, each item holding
+    the arguments of a β-reduction.
+    The checks done by each call to an expression are done only once here.
+    """
+    reduce = _reducer(expression)
+    nb_vars = len(expression._λ_var_indices)  # pylint: disable=protected-access
+    return itertools.starmap(reduce, _checked_packs(iterable, nb_vars))
+
+
 # Below, the implementation of the lazy operators `and_`, `or_` and `if_` as functions.
 # If the provided parameters are lambda expressions themselves, they will be
 # evaluated lazily, to mimic the original operators' behavior.
 
 class _Op(_LambdaAbstractionBase):  # pylint: disable=abstract-method
+    __slots__ = ('_λ_operands',)
+
     def __init__(self, *operands):
-        self._λ_operands = [λ(op) for op in operands]
-        super().__init__(set.union(*(op._λ_var_indices for op in self._λ_operands)))  # pylint: disable=protected-access
+        operands = tuple([λ(op) for op in operands])
+        _set_attribute(self, '_λ_operands', operands)
+        super().__init__(_union(_NO_VARIABLES, operands))
 
 
 class and_(_Op):
     """ Logical `and` (like the keyword) as a lazy abstraction. """
+    __slots__ = ()
 
     def _β(self, *input_data):
         left, right = self._λ_operands
@@ -242,6 +366,7 @@ class and_(_Op):
 
 class or_(_Op):
     """ Logical `or` (like the keyword) as a lazy abstraction. """
+    __slots__ = ()
 
     def _β(self, *input_data):
         left, right = self._λ_operands
@@ -250,6 +375,7 @@ class or_(_Op):
 
 class if_(_Op):
     """ Ternary operator if_(c, t, e): the functional version of: t if c else e """
+    __slots__ = ()
 
     def _β(self, *input_data):
         cond, then, else_ = self._λ_operands
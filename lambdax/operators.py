@@ -31,6 +31,8 @@ not_ = _λ(op.not_)
 truth = _λ(op.truth)
 
 # mathematical and bitwise operations
+if sys.version_info >= (3, 11):
+    call = _λ(op.call)
 add = _λ(op.add)
 floordiv = _λ(op.floordiv)
 index = _λ(op.index)
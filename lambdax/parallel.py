@@ -0,0 +1,109 @@
+""" Reduce λ-abstractions on many items in parallel, in several processes or threads.
+
+`parallel_map(expression, iterable)` is like `map_(expression, iterable)` but uses all
+the cores: the expression is sent once to each worker process when it starts (see
+`lambdax.serialization`), then the items are sent by chunks. Only a few chunks per worker
+are read ahead of the consumption of the results, so the input can be a stream.
+
+The λ-wrapped functions of the expression must be importable by the workers,
+e.g. not lambdas nor functions defined locally.
+
+`thread_map(expression, iterable)` does the same in several threads of the current
+process, sharing the expression itself, since the nodes are never mutated by their
+β-reductions. It scales when the λ-wrapped functions release the GIL (e.g. `hashlib`,
+`zlib` or I/O), or on the free-threaded builds of CPython.
+"""
+
+import collections
+from concurrent.futures import (
+    FIRST_COMPLETED as _FIRST_COMPLETED, ProcessPoolExecutor as _ProcessPoolExecutor,
+    ThreadPoolExecutor as _ThreadPoolExecutor, wait as _wait
+)
+import functools
+import itertools
+import os
+
+from lambdax.lambda_calculus import _reducer, map_ as _map
+from lambdax.serialization import dumps as _dumps, loads as _loads
+
+# number of chunks sent to each worker ahead of the consumption of the results
+_CHUNKS_AHEAD = 2
+
+# the expression reduced by the current worker process, set once when it starts
+_expression = None
+
+
+def _initialize(data):
+    global _expression  # pylint: disable=global-statement
+    _expression = _loads(data)
+
+
+def _reduce_chunk(chunk, expression=None):
+    return list(_map(_expression if expression is None else expression, chunk))
+
+
+def _chunks(iterable, chunksize):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _results(executor, reduce_chunk, iterable, workers, chunksize, ordered):
+    """ Yield the results of `reduce_chunk` on the chunks of `iterable`, computed
+    by the `workers` of the executor built by `executor`
+    """
+    chunks = _chunks(iterable, chunksize)
+    executor = executor(workers)
+    pending = collections.deque() if ordered else set()
+    submit = pending.append if ordered else pending.add
+    try:
+        for chunk in itertools.islice(chunks, workers * _CHUNKS_AHEAD):
+            submit(executor.submit(reduce_chunk, chunk))
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done, pending = _wait(pending, return_when=_FIRST_COMPLETED)
+                submit = pending.add
+            for future in done:
+                # keep the workers busy while the results are consumed
+                for chunk in itertools.islice(chunks, 1):
+                    submit(executor.submit(reduce_chunk, chunk))
+                yield from future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown()
+
+
+def _check_arguments(expression, workers, chunksize):
+    _reducer(expression)
+    if workers is not None and workers < 1:
+        raise ValueError("`workers` must be at least 1, got %d" % workers)
+    if chunksize < 1:
+        raise ValueError("`chunksize` must be at least 1, got %d" % chunksize)
+
+
+def parallel_map(expression, iterable, workers=None, chunksize=1024, ordered=True):
+    """ Like `map_(expression, iterable)`, but the β-reductions are computed by `workers`
+    processes (as many as CPUs by default), each one receiving the items by chunks
+    of `chunksize`. With `ordered=False`, the results of each chunk are yielded as soon
+    as it's reduced, in any order.
+    """
+    _check_arguments(expression, workers, chunksize)
+    executor = functools.partial(_ProcessPoolExecutor, initializer=_initialize,
+                                 initargs=(_dumps(expression),))
+    return _results(executor, _reduce_chunk, iterable, workers or os.cpu_count() or 1,
+                    chunksize, ordered)
+
+
+def thread_map(expression, iterable, workers=None, chunksize=64, ordered=True):
+    """ Like `parallel_map(expression, iterable)`, but the β-reductions are computed by
+    `workers` threads (as many as CPUs by default) sharing the expression.
+    """
+    _check_arguments(expression, workers, chunksize)
+    return _results(_ThreadPoolExecutor, functools.partial(_reduce_chunk, expression=expression),
+                    iterable, workers or os.cpu_count() or 1, chunksize, ordered)
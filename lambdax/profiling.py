@@ -0,0 +1,370 @@
+""" Profile the β-reductions of λ-abstractions node by node.
+
+`profile(expression)` returns an equivalent abstraction, whose nodes are instrumented
+to record how many times they're reduced, how long it takes (with and without their
+sub-expressions) and how many times it fails. The expression itself is left untouched,
+so only the profiled copy pays for the instrumentation:
+
+    profiled = profile(expression)
+    for row in rows:
+        profiled(row)
+    print_profile(profiled)
+
+The report renders each node in a source-like form, e.g. `(x.real + λ(f)(x, exp=x))`.
+The abstractions used as the operation of a composition are profiled as a whole.
+The statistics are only meaningful if the profiled copy is reduced by one thread at a time.
+
+`explain(expression)` rather describes an expression without reducing it: its size,
+its depth, its λ-wrapped calls, the variables of each node, the sub-expressions that
+don't depend on any variable or that are repeated, and the estimated time of a
+β-reduction, from the time taken by each kind of node measured once by a micro-benchmark.
+It's computed without recursion, so that the expressions too deep to be reduced
+(which hit the recursion limit) can be detected.
+"""
+
+from collections import Counter as _Counter, namedtuple as _namedtuple
+import functools
+import operator
+import sys
+from time import perf_counter as _perf_counter
+import timeit
+
+from lambdax.compiler import _BINARY_OPERATORS, _UNARY_OPERATORS, _is_attribute_name, _lookup
+from lambdax.lambda_calculus import (
+    _apply, _reversed_operations, _set_attribute, _LambdaAbstractionBase,
+    _ConstantAbstraction, _IdentityAbstraction, _LambdaAbstraction,
+    and_ as _and, or_ as _or, if_ as _if, is_λ as _is_λ
+)
+from lambdax.rewriting import _NARY_OPERATORS
+from lambdax.sharing import _Structures
+from lambdax.tree import children as _children, transform as _transform, walk as _walk
+
+_NodeStats = _namedtuple('NodeStats',
+                         ('source', 'depth', 'calls', 'errors', 'cumulative', 'own'))
+
+_Plan = _namedtuple('Plan', ('nodes', 'distinct_nodes', 'depth', 'too_deep', 'calls',
+                             'variables', 'constant_subtrees', 'duplicates', 'cost'))
+
+_SORT_KEYS = {
+    'tree': None,
+    'calls': lambda stats: stats.calls,
+    'errors': lambda stats: stats.errors,
+    'cumulative': lambda stats: stats.cumulative,
+    'own': lambda stats: stats.own,
+}
+
+# maximum length of the source of a node in the report
+_WIDTH = 80
+
+
+def _shorten(source, width):
+    return source if len(source) <= width else source[:width - 3] + '...'
+
+
+def _constant_source(value, width):
+    name = getattr(value, '__name__', None)
+    if callable(value) and isinstance(name, str):
+        return 'λ(%s)' % name
+    return _shorten(repr(value), width)
+
+
+def _operation_source(node, origin, args, kwargs, width):
+    # pylint: disable=protected-access
+    operation = node._λ_operation
+    arg_nodes = node._λ_abstract_args
+    named = ['%s=%s' % item for item in kwargs.items()]
+    if operation is _apply:
+        return '%s(%s)' % (origin, ', '.join(args + named))
+    if _is_λ(operation):
+        return 'comp(%s, %s)' % (_render(operation, width), origin)
+    symbol = _lookup(_NARY_OPERATORS, operation)
+    if symbol and not kwargs:
+        return '(%s)' % (' %s ' % symbol).join([origin] + args)
+    if not kwargs and len(args) == 1:
+        symbol = _lookup(_BINARY_OPERATORS, operation)
+        if symbol:
+            return '(%s %s %s)' % (origin, symbol, args[0])
+        symbol = _lookup(_BINARY_OPERATORS, _lookup(_reversed_operations, operation))
+        if symbol:
+            return '(%s %s %s)' % (args[0], symbol, origin)
+        name = arg_nodes[0]
+        if isinstance(name, _ProbeAbstraction):
+            name = name._λ_node
+        if (operation is getattr and isinstance(name, _ConstantAbstraction) and
+                _is_attribute_name(name._λ_constant)):
+            return '%s.%s' % (origin, name._λ_constant)
+    if not kwargs and not args:
+        symbol = _lookup(_UNARY_OPERATORS, operation)
+        if symbol:
+            return '(%s%s)' % (symbol, origin)
+    if operation is operator.getitem and not kwargs and len(args) == 1:
+        return '%s[%s]' % (origin, args[0])
+    name = getattr(operation, '__name__', None) or repr(operation)
+    return '%s(%s)' % (name, ', '.join([origin] + args + named))
+
+
+def _node_source(node, children_sources, width):
+    """ Return a source-like representation of `node`, given the ones of its children """
+    # pylint: disable=protected-access
+    if isinstance(node, _IdentityAbstraction):
+        source = 'x%d' % (next(iter(node._λ_var_indices)) + 1)
+    elif isinstance(node, _ConstantAbstraction):
+        source = _constant_source(node._λ_constant, width)
+    elif isinstance(node, (_and, _or, _if)):
+        source = '%s(%s)' % (type(node).__name__, ', '.join(children_sources))
+    elif isinstance(node, _LambdaAbstraction):
+        nb_args = len(node._λ_abstract_args)
+        source = _operation_source(
+            node, children_sources[0], children_sources[1:nb_args + 1],
+            dict(zip(node._λ_abstract_kwargs, children_sources[nb_args + 1:])), width)
+    elif isinstance(node, _ProbeAbstraction):
+        source = node._λ_source
+    else:
+        source = '<%s>' % type(node).__name__.lstrip('_')
+    return _shorten(source, width)
+
+
+def _render(root, width=_WIDTH):
+    """ Return a source-like representation of the expression `root`,
+    each sub-expression being shortened to `width` characters.
+    """
+    sources = {}
+    for node in _walk(root):
+        sources[id(node)] = _node_source(
+            node, [sources[id(child)] for child in _children(node)], width)
+    return sources[id(root)]
+
+
+class _Stats:
+    __slots__ = ('calls', 'errors', 'cumulative', 'own')
+
+    def __init__(self):
+        self.calls = self.errors = 0
+        self.cumulative = self.own = 0.
+
+
+class _Clock:
+    """ Time spent in the sub-expressions of the node being reduced """
+    __slots__ = ('children',)
+
+    def __init__(self):
+        self.children = 0.
+
+
+class _ProbeAbstraction(_LambdaAbstractionBase):
+    """ Node recording the statistics of the reductions of the node it wraps """
+
+    def __init__(self, node, clock):
+        _set_attribute(self, '_λ_node', node)
+        _set_attribute(self, '_λ_clock', clock)
+        _set_attribute(self, '_λ_source', _node_source(
+            node, [child._λ_source for child in _children(node)], _WIDTH))
+        _set_attribute(self, '_λ_stats', _Stats())
+        super().__init__(node._λ_var_indices)  # pylint: disable=protected-access
+
+    def _β(self, *input_data):
+        stats, clock = self._λ_stats, self._λ_clock
+        stats.calls += 1
+        outer_children = clock.children
+        clock.children = 0.
+        start = _perf_counter()
+        try:
+            return self._λ_node._β(*input_data)  # pylint: disable=protected-access
+        except BaseException:
+            stats.errors += 1
+            raise
+        finally:
+            elapsed = _perf_counter() - start
+            stats.cumulative += elapsed
+            stats.own += elapsed - clock.children
+            clock.children = outer_children + elapsed
+
+
+def _probes(profiled):
+    """ Iterate over the distinct probes of a profiled expression in preorder,
+    with their depth.
+    """
+    # pylint: disable=protected-access
+    if not isinstance(profiled, _ProbeAbstraction):
+        raise TypeError("Expected a profiled abstraction, got a `%s` (%s)"
+                        % (type(profiled).__name__, profiled))
+    seen = set()
+    stack = [(profiled, 0)]
+    while stack:
+        probe, depth = stack.pop()
+        if id(probe) in seen:
+            continue
+        seen.add(id(probe))
+        yield probe, depth
+        stack.extend((child, depth + 1) for child in reversed(_children(probe._λ_node)))
+
+
+def profile(expression):
+    """ Return an abstraction equivalent to `expression`, recording statistics on the
+    reductions of each of its nodes; see `profile_stats` and `print_profile`.
+    """
+    if not _is_λ(expression):
+        raise TypeError("Expected an abstraction, got a `%s` (%s)"
+                        % (type(expression).__name__, expression))
+    clock = _Clock()
+    return _transform(expression, lambda node: _ProbeAbstraction(node, clock))
+
+
+def profile_stats(profiled, sort='tree'):
+    """ Return the statistics of each node of a profiled expression, as `NodeStats`
+    tuples (times in seconds). They're in the order of the tree by default, or sorted
+    in decreasing order of 'calls', 'errors', 'cumulative' or 'own' (time).
+    """
+    # pylint: disable=protected-access
+    if sort not in _SORT_KEYS:
+        raise ValueError("`sort` must be one of %s, got %r" % (', '.join(_SORT_KEYS), sort))
+    stats = [_NodeStats(probe._λ_source, depth, probe._λ_stats.calls, probe._λ_stats.errors,
+                       probe._λ_stats.cumulative, probe._λ_stats.own)
+             for probe, depth in _probes(profiled)]
+    if _SORT_KEYS[sort]:
+        stats.sort(key=_SORT_KEYS[sort], reverse=True)
+    return stats
+
+
+def print_profile(profiled, sort='tree', limit=None, file=None):
+    """ Print the report of the statistics of a profiled expression (see `profile_stats`),
+    only for the first `limit` nodes if given.
+    """
+    stats = profile_stats(profiled, sort)[:limit]
+    file = file or sys.stdout
+    total = max((s.cumulative for s in stats), default=0.) or 1.
+    print('%8s %7s %12s %12s %6s  %s' % ('calls', 'errors', 'cumul. (ms)', 'own (ms)', 'own %',
+                                         'node'), file=file)
+    for node in stats:
+        indent = '  ' * node.depth if sort == 'tree' else ''
+        print('%8d %7d %12.3f %12.3f %5.1f%%  %s%s'
+              % (node.calls, node.errors, node.cumulative * 1e3, node.own * 1e3,
+                 100 * node.own / total, indent, node.source), file=file)
+
+
+# stack frames kept free for the caller of a β-reduction
+_STACK_MARGIN = 50
+
+
+def _time(statement, **variables):
+    """ Time taken by `statement`, in seconds """
+    number = 2000
+    return min(timeit.repeat(statement, number=number, repeat=3, globals=variables)) / number
+
+
+@functools.lru_cache(maxsize=None)
+def _unit_costs():
+    """ Time taken by the β-reduction of each kind of node (excluding its children),
+    and by the entry point of a β-reduction, measured once
+    """
+    # pylint: disable=import-outside-toplevel,cyclic-import
+    from lambdax.lambda_calculus import x
+    variable = _time('e._β(1)', e=x)
+    constant = _time('e._β(1)', e=_ConstantAbstraction(1))
+    costs = {
+        'variable': variable,
+        'constant': constant,
+        'operation': _time('e._β(1)', e=x + 1) - variable - constant,
+        'call': _time('e._β(1)', e=_ConstantAbstraction(abs)(x)) - variable - constant,
+        'lazy': _time('e._β(1)', e=_and(x, x)) - 2 * variable,
+        'entry': _time('e(1)', e=x) - variable,
+    }
+    return {kind: max(cost, 0.) for kind, cost in costs.items()}
+
+
+def _kind(node):
+    # pylint: disable=protected-access
+    if isinstance(node, _IdentityAbstraction):
+        return 'variable'
+    if isinstance(node, _ConstantAbstraction):
+        return 'constant'
+    if isinstance(node, (_and, _or, _if)):
+        return 'lazy'
+    if isinstance(node, _LambdaAbstraction) and node._λ_operation is _apply:
+        return 'call'
+    return 'operation'
+
+
+def _frames(node):
+    """ Number of stack frames taken by the β-reduction of `node` to reduce each of its
+    children (the positional and named arguments are reduced in comprehensions)
+    """
+    # pylint: disable=protected-access
+    if isinstance(node, _LambdaAbstraction):
+        return (1,) + (2,) * (len(node._λ_abstract_args) + len(node._λ_abstract_kwargs))
+    return (1,) * len(_children(node))
+
+
+def _occurrences(root):
+    """ Number of occurrences of each distinct node in the tree of `root`, by id,
+    with the distinct nodes in postorder
+    """
+    nodes = list(_walk(root))
+    occurrences = _Counter({id(root): 1})
+    for node in reversed(nodes):
+        for child in _children(node):
+            occurrences[id(child)] += occurrences[id(node)]
+    return occurrences, nodes
+
+
+def explain(expression, width=_WIDTH):
+    """ Return the `Plan` of `expression`, describing the cost of its β-reductions:
+    - `nodes`: its number of nodes, each sub-expression being counted as many times
+      as it appears, and `distinct_nodes` its number of distinct objects,
+    - `depth`: the length of its longest branch, and `too_deep` telling if its
+      β-reduction would exceed the recursion limit (see `sys.getrecursionlimit`),
+    - `calls`: the number of calls of λ-wrapped functions, e.g. `λ(f)(x)`,
+    - `variables`: the source of each distinct node with the names of its variables,
+    - `constant_subtrees`: the sources of the largest sub-expressions without variables
+      (see `lambdax.rewriting.fold`),
+    - `duplicates`: the sources of the sub-expressions appearing several times
+      (see `lambdax.sharing.share`), with their number of occurrences,
+    - `cost`: the estimated time of a β-reduction in seconds, excluding the time spent in
+      the operations themselves, and counting all the operands of `and_`, `or_` and `if_`.
+    The sources are shortened to `width` characters.
+    """
+    # pylint: disable=protected-access
+    if not _is_λ(expression):
+        raise TypeError("Expected an abstraction, got a `%s` (%s)"
+                        % (type(expression).__name__, expression))
+    occurrences, nodes = _occurrences(expression)
+    unit_costs = _unit_costs()
+    sources, depths, frames = {}, {}, {}
+    for node in nodes:
+        children = _children(node)
+        sources[id(node)] = _node_source(node, [sources[id(child)] for child in children],
+                                         width)
+        depths[id(node)] = 1 + max((depths[id(child)] for child in children), default=0)
+        frames[id(node)] = 1 + max((extra + frames[id(child)]
+                                    for extra, child in zip(_frames(node), children)), default=0)
+
+    def source(node):
+        return sources[id(node)]
+
+    constant_subtrees = {}
+    for node in nodes:
+        if node._λ_var_indices and node is not expression:
+            continue
+        for subtree in (_children(node) if node._λ_var_indices else (node,)):
+            if not subtree._λ_var_indices and _children(subtree):
+                constant_subtrees[id(subtree)] = subtree
+
+    merged = _Structures().merge(expression)
+    merged_occurrences, merged_nodes = _occurrences(merged)
+    duplicates = [(node, merged_occurrences[id(node)]) for node in reversed(merged_nodes)
+                  if _children(node) and merged_occurrences[id(node)] > 1]
+
+    return _Plan(
+        nodes=sum(occurrences.values()),
+        distinct_nodes=len(nodes),
+        depth=depths[id(expression)],
+        too_deep=frames[id(expression)] + _STACK_MARGIN > sys.getrecursionlimit(),
+        calls=sum(occurrences[id(node)] for node in nodes if _kind(node) == 'call'),
+        variables=tuple((source(node), tuple('x%d' % (i + 1)
+                                             for i in sorted(node._λ_var_indices)))
+                        for node in nodes),
+        constant_subtrees=tuple(map(source, constant_subtrees.values())),
+        duplicates=tuple((_render(node, width), count) for node, count in duplicates),
+        cost=unit_costs['entry'] + sum(unit_costs[_kind(node)] * occurrences[id(node)]
+                                       for node in nodes),
+    )
@@ -0,0 +1,492 @@
+""" Rewrite λ-abstractions into equivalent ones that are cheaper to reduce.
+
+- `fold` evaluates once the sub-expressions that don't depend on any variable,
+  instead of evaluating them again on each β-reduction. Only the functions known to be
+  pure (the operators, the functions of `math` and a few built-in functions such as
+  `len` or `round`) or declared with `pure` are called at that time, and only their
+  immutable results (numbers, strings, bytes, and tuples or frozensets of them) are kept.
+- `simplify` applies rewrite rules on each node, e.g. `x * 1 -> x`, `-(-x) -> x`,
+  `(a + b) + c -> a + b + c` as a single n-ary node, or the pruning
+  of `if_`, `and_` and `or_` with a constant condition. The rules only valid for
+  numbers are applied only when the values are declared to be numbers.
+  More rules can be registered with `rewrite_rule`.
+- `bind` gives values to some variables, and evaluates once the sub-expressions
+  that depend only on them, leaving an expression of the other variables.
+"""
+
+import builtins
+import math
+import operator
+import types
+
+from lambdax.lambda_calculus import (
+    _apply, _other_vars, _reversed_operations, x1 as _x1,
+    _ConstantAbstraction, _IdentityAbstraction, _LambdaAbstraction, _Op,
+    and_ as _and, or_ as _or, if_ as _if, is_λ as _is_λ
+)
+from lambdax.tree import (
+    children as _children, rebuild as _rebuild, transform as _transform, walk as _walk
+)
+
+# functions with side effects, that must be called at each β-reduction, or returning
+# stateful objects (e.g. iterators) that can't be shared by all β-reductions
+_impure = {
+    builtins.print, builtins.input, builtins.open, builtins.exit, builtins.quit,
+    builtins.next, builtins.iter, builtins.setattr, builtins.delattr, builtins.vars,
+    builtins.id, builtins.enumerate, builtins.filter, builtins.map, builtins.reversed,
+    builtins.zip, builtins.memoryview,
+    operator.setitem, operator.delitem,
+    operator.iadd, operator.iand, operator.iconcat, operator.ifloordiv, operator.ilshift,
+    operator.imatmul, operator.imod, operator.imul, operator.ior, operator.ipow,
+    operator.irshift, operator.isub, operator.itruediv, operator.ixor,
+}
+
+# functions without side effects, returning equal immutable values for equal arguments:
+# their calls on constants can be computed beforehand by `fold` and `bind`
+_pure = {
+    operator.add, operator.sub, operator.mul, operator.matmul, operator.truediv,
+    operator.floordiv, operator.mod, operator.pow, operator.neg, operator.pos, operator.abs,
+    operator.invert, operator.inv, operator.lshift, operator.rshift, operator.and_,
+    operator.or_, operator.xor, operator.not_, operator.truth, operator.lt, operator.le,
+    operator.eq, operator.ne, operator.ge, operator.gt, operator.is_, operator.is_not,
+    operator.contains, operator.getitem, operator.concat, operator.index,
+    operator.countOf, operator.indexOf,
+    builtins.abs, builtins.all, builtins.any, builtins.ascii, builtins.bin, builtins.bool,
+    builtins.bytes, builtins.chr, builtins.complex, builtins.divmod, builtins.float,
+    builtins.format, builtins.frozenset, builtins.getattr, builtins.hash, builtins.hex,
+    builtins.int, builtins.isinstance, builtins.issubclass, builtins.len, builtins.max,
+    builtins.min, builtins.oct, builtins.ord, builtins.pow, builtins.range, builtins.repr,
+    builtins.round, builtins.sorted, builtins.str, builtins.sum, builtins.tuple,
+}
+_pure.update(function for name, function in vars(math).items()
+             if not name.startswith('_') and callable(function))
+
+# values of these exact types can't be mutated
+_IMMUTABLE_VALUE_TYPES = (bool, int, float, complex, str, bytes, range, type(None))
+
+# instances of these types can't be mutated by their methods
+_IMMUTABLE_TYPES = (int, float, complex, str, bytes, tuple, frozenset, range, type(None))
+
+
+def impure(function):
+    """ Declare that the sub-expressions calling `function` must not be evaluated
+    beforehand, e.g. because it has side effects.
+    Return `function`, so it can be used as a decorator.
+    """
+    _impure.add(function)
+    return function
+
+
+def pure(function):
+    """ Declare that `function` has no side effects and returns equal values for equal
+    arguments, so that its calls not depending on any variable can be computed beforehand
+    by `fold` and `bind`. Return `function`, so it can be used as a decorator.
+    """
+    _pure.add(function)
+    return function
+
+
+def _is_pure(function):
+    if _is_λ(function):
+        # composition with an abstraction
+        return all(_is_pure_node(node) for node in _walk(function))
+    if isinstance(function, types.MethodType) or (
+            isinstance(function, types.BuiltinMethodType) and
+            not isinstance(function.__self__, (types.ModuleType, type))):
+        # a method may mutate the object it's bound to
+        if not isinstance(function.__self__, _IMMUTABLE_TYPES):
+            return False
+    try:
+        return _reversed_operations.get(function, function) not in _impure
+    except TypeError:
+        # unhashable callable, it's up to the user
+        return True
+
+
+def _is_pure_node(node):
+    # pylint: disable=protected-access
+    if not isinstance(node, _LambdaAbstraction):
+        return True
+    operation = node._λ_operation
+    if operation is _apply:
+        # a callee computed at each β-reduction (e.g. a method `x.pop`) may have effects
+        callee = node._λ_origin
+        return isinstance(callee, _ConstantAbstraction) and _is_pure(callee._λ_constant)
+    return _is_pure(operation)
+
+
+def _is_foldable(function):
+    if _is_λ(function):
+        # composition with an abstraction
+        return all(_is_foldable_node(node) for node in _walk(function))
+    try:
+        return _reversed_operations.get(function, function) in _pure
+    except TypeError:  # unhashable
+        return False
+
+
+def _is_foldable_node(node):
+    """ Tell if `node` can be computed beforehand when its operands are constants """
+    # pylint: disable=protected-access
+    if not isinstance(node, _LambdaAbstraction):
+        return True
+    operation = node._λ_operation
+    if operation is _apply:
+        callee = node._λ_origin
+        return isinstance(callee, _ConstantAbstraction) and _is_foldable(callee._λ_constant)
+    return _is_foldable(operation)
+
+
+def _is_immutable(value):
+    if type(value) in (tuple, frozenset):
+        return all(_is_immutable(item) for item in value)
+    return type(value) in _IMMUTABLE_VALUE_TYPES
+
+
+def _fold_node(node):
+    # pylint: disable=protected-access
+    if (node._λ_var_indices or not isinstance(node, (_LambdaAbstraction, _Op)) or
+            not all(isinstance(child, _ConstantAbstraction)
+                    for child in _children(node)) or
+            not _is_foldable_node(node)):
+        return node
+    try:
+        value = node._β()
+    except Exception:  # pylint: disable=broad-except
+        # let it fail at each β-reduction, as usual
+        return node
+    if not _is_immutable(value):
+        # a mutable value would be shared by all β-reductions, whereas it's new each time
+        return node
+    return _ConstantAbstraction(value)
+
+
+def fold(expression):
+    """ Return an equivalent expression where the sub-expressions not depending
+    on any variable are replaced with their value.
+    The expression itself is never reduced to a constant, since calling a constant
+    doesn't reduce it but builds a new expression.
+    """
+    if not _is_λ(expression):
+        raise TypeError("Expected an abstraction, got a `%s` (%s)"
+                        % (type(expression).__name__, expression))
+    return _rebuild(expression, (_transform(child, _fold_node) for child in _children(expression)))
+
+
+def _add_all(first, *others):
+    """ `first + others[0] + others[1] + ...`, computed from left to right """
+    for other in others:
+        first = first + other
+    return first
+
+
+def _multiply_all(first, *others):
+    """ `first * others[0] * others[1] * ...`, computed from left to right """
+    for other in others:
+        first = first * other
+    return first
+
+
+_pure.update((_add_all, _multiply_all))
+
+# the n-ary operations replacing the chains of the associative binary operations
+_NARY_OPERATIONS = {operator.add: _add_all, operator.mul: _multiply_all}
+_NARY_OPERATORS = {_add_all: '+', _multiply_all: '*'}
+
+# the right operands without effect, also on the left for the commutative operations
+_NEUTRAL_ELEMENTS = {operator.add: 0, operator.sub: 0, operator.mul: 1, operator.pow: 1}
+
+# the registered rules of `simplify`, as (rule, is only valid for numbers)
+_rules = []
+
+# maximum number of rules successively applied on a node
+_MAX_REWRITES = 100
+
+
+def rewrite_rule(function=None, numeric=False):
+    """ Register `function` as a rule of `simplify`: it takes a node whose sub-expressions
+    are already simplified, and returns an equivalent node, or None when it doesn't apply.
+    With `numeric`, it's applied only when the values are assumed to be numbers.
+    Return `function`, so it can be used as a decorator, with or without arguments.
+    """
+    if function is None:
+        return lambda rule: rewrite_rule(rule, numeric)
+    _rules.append((function, numeric))
+    return function
+
+
+def _get(table, key):
+    """ `table.get(key)` by identity, since the operations can be abstractions """
+    try:
+        return table.get(key)
+    except TypeError:
+        return None
+
+
+def _binary(node):
+    """ Return the binary operation of `node` with its operands in the order in which
+    they're written, e.g. `(add, c, x)` for `c + x`, or None.
+    """
+    # pylint: disable=protected-access
+    if (not isinstance(node, _LambdaAbstraction) or node._λ_abstract_kwargs or
+            len(node._λ_abstract_args) != 1 or node._λ_operation is _apply):
+        return None
+    operation, origin, (arg,) = node._λ_operation, node._λ_origin, node._λ_abstract_args
+    original = _get(_reversed_operations, operation)
+    if original is not None:
+        return original, arg, origin
+    return operation, origin, arg
+
+
+def _unary(node):
+    """ Return the function applied on the only operand of `node`, either as an operator
+    (e.g. `-x`) or as a call of a constant (e.g. `not_(x)`), with this operand, or None.
+    """
+    # pylint: disable=protected-access
+    if not isinstance(node, _LambdaAbstraction) or node._λ_abstract_kwargs:
+        return None
+    args = node._λ_abstract_args
+    if node._λ_operation is _apply:
+        if len(args) == 1 and isinstance(node._λ_origin, _ConstantAbstraction):
+            return node._λ_origin._λ_constant, args[0]
+        return None
+    if args:
+        return None
+    return node._λ_operation, node._λ_origin
+
+
+def _is_constant(node, value):
+    # the type is checked too, e.g. `1.0` would turn integers into floats
+    # pylint: disable=protected-access
+    return (isinstance(node, _ConstantAbstraction) and
+            type(node._λ_constant) is type(value) and node._λ_constant == value)
+
+
+def _truth(node):
+    """ Truth value of a constant node, or None """
+    if not isinstance(node, _ConstantAbstraction):
+        return None
+    try:
+        return bool(node._λ_constant)  # pylint: disable=protected-access
+    except Exception:  # pylint: disable=broad-except
+        # let it fail at each β-reduction, as usual
+        return None
+
+
+@rewrite_rule(numeric=True)
+def _eliminate_identities(node):
+    """ x + 0, 0 + x, x - 0, x * 1, 1 * x, x ** 1, +x -> x """
+    binary = _binary(node)
+    if binary:
+        operation, left, right = binary
+        neutral = _get(_NEUTRAL_ELEMENTS, operation)
+        if neutral is not None:
+            if _is_constant(right, neutral):
+                return left
+            if operation is not operator.sub and operation is not operator.pow and (
+                    _is_constant(left, neutral)):
+                return right
+        return None
+    unary = _unary(node)
+    if unary and unary[0] is operator.pos:
+        return unary[1]
+    return None
+
+
+@rewrite_rule
+def _eliminate_double_not(node):
+    """ not_(not_(x)) -> truth(x) """
+    unary = _unary(node)
+    if unary and unary[0] is operator.not_:
+        inner = _unary(unary[1])
+        if inner and inner[0] is operator.not_:
+            return _LambdaAbstraction(_ConstantAbstraction(operator.truth), _apply,
+                                      (inner[1],), {})
+    return None
+
+
+@rewrite_rule(numeric=True)
+def _eliminate_double_negation(node):
+    """ -(-x) -> x """
+    unary = _unary(node)
+    if unary and unary[0] is operator.neg:
+        inner = _unary(unary[1])
+        if inner and inner[0] is operator.neg:
+            return inner[1]
+    return None
+
+
+def _reduce_square(node):
+    """ x ** 2 -> x * x, for a variable x (evaluating twice anything else may cost more).
+    It's not registered: it's only exact for integers, since `x ** 2` raises an
+    `OverflowError` for a large float whereas `x * x` is `inf`.
+    """
+    binary = _binary(node)
+    if binary:
+        operation, left, right = binary
+        if (operation is operator.pow and isinstance(left, _IdentityAbstraction) and
+                _is_constant(right, 2)):
+            return _LambdaAbstraction(left, operator.mul, (left,), {})
+    return None
+
+
+@rewrite_rule
+def _flatten(node):
+    """ (a + b) + c -> a + b + c as a single node, the same for `*`: the operations are still
+    computed from left to right, so it's valid for any type.
+    """
+    # pylint: disable=protected-access
+    binary = _binary(node)
+    if not binary:
+        return None
+    operation, left, right = binary
+    nary = _get(_NARY_OPERATIONS, operation)
+    if nary is None or left is not node._λ_origin:
+        return None
+    if isinstance(left, _LambdaAbstraction) and left._λ_operation is nary:
+        return _LambdaAbstraction(left._λ_origin, nary, left._λ_abstract_args + (right,), {})
+    inner = _binary(left)
+    # `c + x` is computed with `x` before `c`, the order can be swapped if `c` has no effect
+    if inner and inner[0] is operation and (
+            inner[1] is left._λ_origin or
+            isinstance(inner[1], (_ConstantAbstraction, _IdentityAbstraction))):
+        return _LambdaAbstraction(inner[1], nary, (inner[2], right), {})
+    return None
+
+
+@rewrite_rule
+def _prune_constant_condition(node):
+    """ if_(True, a, b) -> a, and_(0, a) -> 0, or_(0, a) -> a, etc. """
+    # pylint: disable=protected-access
+    if isinstance(node, _if):
+        condition, then, else_ = node._λ_operands
+        truth = _truth(condition)
+        if truth is not None:
+            return then if truth else else_
+    elif isinstance(node, (_and, _or)):
+        left, right = node._λ_operands
+        truth = _truth(left)
+        if truth is not None:
+            return left if truth is isinstance(node, _or) else right
+    return None
+
+
+def _rewriter(rules):
+    def rewrite(node):
+        for _ in range(_MAX_REWRITES):
+            for rule in rules:
+                new_node = rule(node)
+                if new_node is not None and new_node is not node:
+                    node = new_node
+                    break
+            else:
+                break
+        return node
+
+    return rewrite
+
+
+def _keeping_variables(rule):
+    def rewrite(node):
+        new_node = rule(node)
+        # pylint: disable=protected-access
+        if new_node is not None and new_node._λ_var_indices != node._λ_var_indices:
+            return None
+        return new_node
+
+    return rewrite
+
+
+def _simplify(expression, rules):
+    """ Apply the rules on each node of `expression`, except that it must stay
+    an abstraction which is reduced by a call, like with `fold`
+    """
+    rewrite = _rewriter(rules)
+    simplified = _transform(expression, rewrite)
+    if isinstance(simplified, _ConstantAbstraction) and simplified is not expression:
+        return _rebuild(expression, (_transform(child, rewrite)
+                                     for child in _children(expression)))
+    return simplified
+
+
+def simplify(expression, rules=None, numeric=False):
+    """ Return an equivalent expression, where the rewrite rules are applied on each node
+    from the leaves to the root. `rules` replaces the registered ones (see `rewrite_rule`),
+    which are applied by default, but only those valid for any type unless `numeric` is true:
+    then the values are assumed to be numbers, and the results may only differ in their
+    type or the sign of a zero, e.g. `x * 1` gives `True` instead of `1` for `x = True`.
+    The variables of the expression are kept, even when a branch holding the only
+    occurrence of one of them could be pruned.
+    """
+    # pylint: disable=protected-access
+    if not _is_λ(expression):
+        raise TypeError("Expected an abstraction, got a `%s` (%s)"
+                        % (type(expression).__name__, expression))
+    if rules is None:
+        rules = [rule for rule, numeric_only in _rules if numeric or not numeric_only]
+    simplified = _simplify(expression, rules)
+    if simplified._λ_var_indices != expression._λ_var_indices:
+        # the expression would take fewer arguments: keep the variables of each node
+        simplified = _simplify(expression, [_keeping_variables(rule) for rule in rules])
+    return simplified
+
+
+_VARIABLES = (_x1,) + tuple(_other_vars)
+
+
+def _variable_index(name):
+    """ Index of the variable named like `x2` or `X2`, or None """
+    if name[:1] in ('x', 'X') and name[1:].isdigit() and 1 <= int(name[1:]) <= len(_VARIABLES):
+        return int(name[1:]) - 1
+    return None
+
+
+def _same(value):
+    return value
+
+
+def bind(expression, *args, renumber=True, **variables):
+    """ Return the expression where some variables are replaced with values, given
+    in order from x1 (like `functools.partial`) or by name (e.g. `x2=5`).
+    The sub-expressions depending only on them are evaluated once here (like with `fold`).
+    The remaining variables are renumbered from x1 in the same order, unless `renumber`
+    is false: the result is then only usable to build other expressions, since its
+    variables have gaps.
+    """
+    # pylint: disable=protected-access
+    if not _is_λ(expression):
+        raise TypeError("Expected an abstraction, got a `%s` (%s)"
+                        % (type(expression).__name__, expression))
+    values = dict(enumerate(args))
+    for name, value in variables.items():
+        index = _variable_index(name)
+        if index is None:
+            raise TypeError("`%s` is not the name of a variable" % name)
+        if index in values:
+            raise TypeError("x%d is given several values" % (index + 1))
+        values[index] = value
+    for index, value in values.items():
+        if index not in expression._λ_var_indices:
+            raise TypeError("x%d is not a variable of the expression" % (index + 1))
+        if _is_λ(value):
+            raise TypeError("x%d can't be bound to an abstraction, compose them instead"
+                            % (index + 1))
+
+    remaining = sorted(expression._λ_var_indices.difference(values))
+    renumbered = {index: _VARIABLES[position if renumber else index]
+                  for position, index in enumerate(remaining)}
+
+    def bind_node(node):
+        if isinstance(node, _IdentityAbstraction):
+            index = next(iter(node._λ_var_indices))
+            if index in values:
+                return _ConstantAbstraction(values[index])
+            return renumbered[index]
+        return _fold_node(node)
+
+    if isinstance(expression, _IdentityAbstraction):
+        bound = bind_node(expression)
+        # a constant isn't reduced by a call
+        return bound if bound._λ_var_indices else _LambdaAbstraction(bound, _same, (), {})
+    # like `fold`, the expression itself must stay reduced by a call
+    return _rebuild(expression, (_transform(child, bind_node) for child in _children(expression)))
@@ -0,0 +1,238 @@
+""" Serialize λ-abstractions into a compact and versioned binary format.
+
+`dumps(expression)` returns bytes, that `loads(data)` turns back into an equivalent
+expression. Each distinct node of the tree is stored once, as a flat record
+referencing its sub-expressions by their position in the list of records:
+- the functions of the modules `operator` and `builtins` are stored as their name,
+- the reversed operations (e.g. the one behind `__radd__`) as the name of the original one,
+- anything else (constants, λ-wrapped functions, ...) is pickled, so the functions
+  are stored as their qualified name and must be importable where the data is loaded.
+
+The nodes are restored without calling their constructors, and the variables are
+the usual ones (x1, x2, ...). The expressions can also be pickled, thanks to this format.
+
+Caution: like `pickle`, loading data can execute arbitrary code. Only load trusted data.
+"""
+
+import builtins
+import itertools
+import operator
+import pickle
+
+from lambdax.lambda_calculus import (
+    _apply, _reverse, _reversed_operations, _other_vars, _set_attribute, _union,
+    _NO_KWARGS, _NO_VARIABLES, _LambdaAbstractionBase,
+    _ConstantAbstraction, _IdentityAbstraction, _LambdaAbstraction,
+    x1 as _x1, and_ as _and, or_ as _or, if_ as _if, is_λ as _is_λ
+)
+
+_MAGIC = b'\xce\xbbx'  # 'λx' encoded in UTF-8
+_VERSION = 1
+
+# kinds of records
+_VARIABLE, _CONSTANT, _NAMED_CONSTANT, _OPERATION, _AND, _OR, _IF, _OBJECT = range(8)
+_OPERATORS_KINDS = {_and: _AND, _or: _OR, _if: _IF}
+_KINDS_OPERATORS = {kind: op for op, kind in _OPERATORS_KINDS.items()}
+
+# kinds of operations
+_NAMED, _REVERSED, _APPLY, _NODE, _PICKLED = range(5)
+
+_MODULES = (operator, builtins)
+
+
+def _names():
+    names = {}
+    for module_index, module in enumerate(_MODULES):
+        for name, obj in vars(module).items():
+            if not name.startswith('_') and callable(obj):
+                try:
+                    names.setdefault(obj, (module_index, name))
+                except TypeError:  # unhashable
+                    pass
+    return names
+
+
+_FUNCTION_NAMES = _names()
+
+_VARIABLES = (_x1,) + tuple(_other_vars)
+
+
+def _lookup_name(function):
+    try:
+        return _FUNCTION_NAMES.get(function)
+    except TypeError:  # unhashable
+        return None
+
+
+def _dependencies(node):
+    """ Nodes to be stored before `node`: its children and the abstraction
+    used as its operation in case of composition.
+    """
+    # pylint: disable=protected-access
+    if type(node) is _LambdaAbstraction:
+        dependencies = ((node._λ_origin,) + tuple(node._λ_abstract_args) +
+                        tuple(node._λ_abstract_kwargs.values()))
+        if _is_λ(node._λ_operation):
+            dependencies += (node._λ_operation,)
+        return dependencies
+    if type(node) in _OPERATORS_KINDS:
+        return tuple(node._λ_operands)
+    return ()
+
+
+def _postorder(root):
+    """ Return the distinct nodes of the expression, each one after its dependencies,
+    and the table of their positions by id.
+    """
+    nodes, positions = [], {}
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in positions:
+            continue
+        if expanded:
+            positions[id(node)] = len(nodes)
+            nodes.append(node)
+        else:
+            stack.append((node, True))
+            stack.extend((dependency, False) for dependency in reversed(_dependencies(node)))
+    return nodes, positions
+
+
+class _Encoder:
+    def __init__(self, positions):
+        self._positions = positions
+        self._operations = {}
+
+    def _operation(self, operation):
+        """ Encode an operation, the records of the same operation sharing their encoding
+        so `pickle` stores it only once.
+        """
+        try:
+            return self._operations[id(operation)]
+        except KeyError:
+            pass
+        if operation is _apply:
+            encoded = _APPLY,
+        elif _is_λ(operation):
+            encoded = _NODE, self._positions[id(operation)]
+        elif _lookup_name(operation) is not None:
+            encoded = (_NAMED,) + _lookup_name(operation)
+        elif _lookup_name(_reversed_operations.get(operation)) is not None:
+            encoded = (_REVERSED,) + _lookup_name(_reversed_operations[operation])
+        else:
+            encoded = _PICKLED, operation
+        # the operation is kept alive by the node using it, so its id is not reused
+        self._operations[id(operation)] = encoded
+        return encoded
+
+    def record(self, node):
+        """ Return the record of `node`, whose dependencies are already recorded """
+        # pylint: disable=protected-access
+        if isinstance(node, _IdentityAbstraction):
+            return _VARIABLE, next(iter(node._λ_var_indices))
+        if type(node) is _ConstantAbstraction:
+            name = _lookup_name(node._λ_constant)
+            if name is not None:
+                return (_NAMED_CONSTANT,) + name
+            return _CONSTANT, node._λ_constant
+        if type(node) is _LambdaAbstraction:
+            children = itertools.chain((node._λ_origin,), node._λ_abstract_args,
+                                       node._λ_abstract_kwargs.values())
+            return (_OPERATION, self._operation(node._λ_operation),
+                    tuple(self._positions[id(child)] for child in children),
+                    tuple(node._λ_abstract_kwargs))
+        if type(node) in _OPERATORS_KINDS:
+            return (_OPERATORS_KINDS[type(node)],
+                    tuple(self._positions[id(operand)] for operand in node._λ_operands))
+        if type(node).__reduce__ is _LambdaAbstractionBase.__reduce__:
+            raise TypeError("Cannot serialize the abstractions of type `%s`"
+                            % type(node).__name__)
+        # another kind of abstraction, that knows how to pickle itself
+        return _OBJECT, node
+
+
+def _named(module_index, name):
+    try:
+        return getattr(_MODULES[module_index], name)
+    except (AttributeError, IndexError):
+        raise ValueError("Unknown function `%s` of module #%d" % (name, module_index)) from None
+
+
+def _decode_operation(encoded, nodes):
+    kind = encoded[0]
+    if kind == _APPLY:
+        return _apply
+    if kind == _NODE:
+        return nodes[encoded[1]]
+    if kind == _NAMED:
+        return _named(*encoded[1:])
+    if kind == _REVERSED:
+        return _reverse(_named(*encoded[1:]))
+    return encoded[1]
+
+
+def _new(cls, children, **attributes):
+    """ Create a node without calling its constructor """
+    node = object.__new__(cls)
+    attributes.update(_λ_var_indices=_union(_NO_VARIABLES, children))
+    for name, value in attributes.items():
+        _set_attribute(node, name, value)
+    return node
+
+
+def _decode(record, nodes):
+    # pylint: disable=protected-access
+    kind = record[0]
+    if kind == _VARIABLE:
+        return _VARIABLES[record[1]]
+    if kind == _CONSTANT:
+        return _new(_ConstantAbstraction, (), _λ_constant=record[1])
+    if kind == _NAMED_CONSTANT:
+        return _new(_ConstantAbstraction, (), _λ_constant=_named(*record[1:]))
+    if kind == _OPERATION:
+        _, operation, positions, names = record
+        children = tuple(nodes[position] for position in positions)
+        nb_args = len(children) - len(names)
+        return _new(_LambdaAbstraction, children,
+                    _λ_origin=children[0],
+                    _λ_operation=_decode_operation(operation, nodes),
+                    _λ_abstract_args=children[1:nb_args],
+                    _λ_abstract_kwargs=dict(zip(names, children[nb_args:])) or _NO_KWARGS)
+    if kind in _KINDS_OPERATORS:
+        operands = tuple(nodes[position] for position in record[1])
+        return _new(_KINDS_OPERATORS[kind], operands, _λ_operands=operands)
+    if kind == _OBJECT:
+        return record[1]
+    raise ValueError("Unknown kind of record: %r" % (kind,))
+
+
+def dumps(expression):
+    """ Return the expression serialized as bytes, that `loads` turns back into
+    an equivalent expression.
+    """
+    if not _is_λ(expression):
+        raise TypeError("Expected an abstraction, got a `%s` (%s)"
+                        % (type(expression).__name__, expression))
+    nodes, positions = _postorder(expression)
+    encoder = _Encoder(positions)
+    records = tuple(encoder.record(node) for node in nodes)
+    return _MAGIC + bytes((_VERSION,)) + pickle.dumps(records, pickle.HIGHEST_PROTOCOL)
+
+
+def loads(data):
+    """ Return the expression serialized by `dumps` as `data` """
+    header_size = len(_MAGIC) + 1
+    if len(data) < header_size or data[:len(_MAGIC)] != _MAGIC:
+        raise ValueError("The data is not a serialized λ-abstraction")
+    version = data[len(_MAGIC)]
+    if version > _VERSION:
+        raise ValueError("Unsupported version %d of the serialization format (at most %d)"
+                         % (version, _VERSION))
+    records = pickle.loads(data[header_size:])
+    if not records:
+        raise ValueError("The data holds no λ-abstraction")
+    nodes = []
+    for record in records:
+        nodes.append(_decode(record, nodes))
+    return nodes[-1]
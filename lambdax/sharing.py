@@ -0,0 +1,253 @@
+""" Share the common sub-expressions of λ-abstractions.
+
+The sub-expressions that are structurally equal (same operations applied on the same
+variables and constants) are merged, so the tree of an expression becomes a DAG where
+each distinct sub-expression is computed at most once per β-reduction. E.g. in
+`(x1 * x2 + 1) ** 2 / (x1 * x2 + 1)`, `x1 * x2 + 1` is computed only once.
+
+The calls to impure functions (see `lambdax.rewriting.impure`, e.g. `next`) are never
+merged, since each of them may give a different result.
+
+The lazy operators `and_`, `or_` and `if_` are still lazy: a shared sub-expression
+is computed the first time it's needed, and reused afterwards.
+
+Several expressions applied on the same arguments can be merged the same way,
+with `evaluate_many` on one set of arguments or `map_many` on many items: their common
+sub-expressions (e.g. the prefix `x['payload'].items` of many of them) are computed
+once for all of them.
+"""
+
+from lambdax.lambda_calculus import (
+    _check_variables, _set_attribute, _unpack, _LambdaAbstractionBase,
+    _ConstantAbstraction, _IdentityAbstraction, _LambdaAbstraction,
+    and_ as _and, or_ as _or, if_ as _if, is_λ as _is_λ
+)
+from lambdax.rewriting import _is_pure_node
+from lambdax.tree import children as _children, transform as _transform, walk as _walk
+
+# constants of these types are compared by value, any other one by identity
+_VALUE_TYPES = (int, float, complex, str, bytes, bool, type(None), tuple, frozenset)
+
+
+def _constant_key(value):
+    if isinstance(value, _VALUE_TYPES):
+        try:
+            # the representation distinguishes 0. from -0. and 1 from True (with the type)
+            return 'constant', type(value), value, repr(value)
+        except TypeError:  # unhashable tuple
+            pass
+    return 'constant', id(value)
+
+
+def _structural_key(node):
+    """ Key identifying `node` by its structure, assuming its children are unique
+    representatives of their own structure. The impure nodes are only equal to themselves.
+    """
+    # pylint: disable=protected-access
+    if isinstance(node, _IdentityAbstraction):
+        return 'variable', next(iter(node._λ_var_indices))
+    if isinstance(node, _ConstantAbstraction):
+        return _constant_key(node._λ_constant)
+    if not _is_pure_node(node):
+        return 'node', id(node)
+    children_ids = tuple(id(child) for child in _children(node))
+    if isinstance(node, _LambdaAbstraction):
+        return ('operation', id(node._λ_operation), tuple(node._λ_abstract_kwargs),
+                children_ids)
+    if isinstance(node, (_and, _or, _if)):
+        return type(node), children_ids
+    return 'node', id(node)
+
+
+class _Structures:
+    """ Merge the structurally equal sub-expressions of one or several expressions """
+
+    def __init__(self):
+        self._representatives = {}
+
+    def _representative(self, node):
+        key = _structural_key(node)
+        try:
+            hash(key)
+        except TypeError:
+            # e.g. constant tuple holding unhashable values
+            key = 'node', id(node)
+        return self._representatives.setdefault(key, node)
+
+    def merge(self, expression):
+        """ Return the expression as a DAG sharing its sub-expressions with the other
+        expressions merged so far.
+        """
+        return _transform(expression, self._representative)
+
+
+def _shared_nodes(roots):
+    """ Return the ids of the nodes having several parents (or used several times
+    by the same parent) in the DAG given by its roots.
+    """
+    seen, shared = set(), set()
+    for root in roots:
+        if id(root) in seen:
+            shared.add(id(root))
+        seen.add(id(root))
+    for node in _walk_all(roots):
+        for child in _children(node):
+            if id(child) in seen:
+                shared.add(id(child))
+            seen.add(id(child))
+    return shared
+
+
+def _walk_all(roots):
+    visited = set()
+    for root in roots:
+        for node in _walk(root):
+            if id(node) not in visited:
+                visited.add(id(node))
+                yield node
+
+
+def _evaluator(node, evaluate_children, memoized):
+    """ Build the function evaluating `node` from the inputs and the table of values
+    already computed during the current β-reduction.
+    """
+    # pylint: disable=protected-access
+    if isinstance(node, _IdentityAbstraction):
+        index = next(iter(node._λ_var_indices))
+        return lambda inputs, values: inputs[index]
+    if isinstance(node, _ConstantAbstraction):
+        constant = node._λ_constant
+        return lambda inputs, values: constant
+
+    if isinstance(node, _and):
+        left, right = evaluate_children
+        evaluate = lambda inputs, values: left(inputs, values) and right(inputs, values)
+    elif isinstance(node, _or):
+        left, right = evaluate_children
+        evaluate = lambda inputs, values: left(inputs, values) or right(inputs, values)
+    elif isinstance(node, _if):
+        cond, then, else_ = evaluate_children
+        evaluate = lambda inputs, values: (
+            then if cond(inputs, values) else else_)(inputs, values)
+    elif isinstance(node, _LambdaAbstraction):
+        evaluate = _operation_evaluator(node, evaluate_children)
+    else:
+        evaluate = lambda inputs, values: node._β(*inputs)
+
+    if not memoized:
+        return evaluate
+    key = id(node)
+
+    def evaluate_once(inputs, values):
+        try:
+            return values[key]
+        except KeyError:
+            value = values[key] = evaluate(inputs, values)
+            return value
+
+    return evaluate_once
+
+
+def _operation_evaluator(node, evaluate_children):
+    # pylint: disable=protected-access
+    operation = node._λ_operation
+    nb_args = len(node._λ_abstract_args)
+    origin, args = evaluate_children[0], evaluate_children[1:nb_args + 1]
+    kwargs = tuple(zip(node._λ_abstract_kwargs, evaluate_children[nb_args + 1:]))
+    if kwargs:
+        return lambda inputs, values: operation(
+            origin(inputs, values),
+            *[a(inputs, values) for a in args],
+            **{k: v(inputs, values) for k, v in kwargs}
+        )
+    if len(args) == 1:
+        arg, = args
+        return lambda inputs, values: operation(origin(inputs, values), arg(inputs, values))
+    if not args:
+        return lambda inputs, values: operation(origin(inputs, values))
+    return lambda inputs, values: operation(
+        origin(inputs, values), *[a(inputs, values) for a in args])
+
+
+def _evaluators(roots, memoized=None):
+    """ Build the functions evaluating each of the roots of a DAG from the inputs and
+    the table of values computed during the current β-reduction, where the values of
+    the nodes whose ids are `memoized` (by default the shared ones) are kept.
+    """
+    if memoized is None:
+        memoized = _shared_nodes(roots)
+    evaluators = {}
+    for node in _walk_all(roots):
+        evaluate_children = tuple(evaluators[id(child)] for child in _children(node))
+        evaluators[id(node)] = _evaluator(node, evaluate_children, id(node) in memoized)
+    return tuple(evaluators[id(root)] for root in roots)
+
+
+class _SharedAbstraction(_LambdaAbstractionBase):
+    def __init__(self, expression):
+        merged = _Structures().merge(expression)
+        _set_attribute(self, '_λ_expression', merged)
+        _set_attribute(self, '_λ_evaluate', _evaluators((merged,))[0])
+        super().__init__(expression._λ_var_indices)  # pylint: disable=protected-access
+
+    def _β(self, *input_data):
+        return self._λ_evaluate(input_data, {})
+
+    def __reduce__(self):
+        return share, (self._λ_expression,)
+
+
+def share(expression):
+    """ Return an equivalent expression where the structurally equal sub-expressions
+    are computed only once per β-reduction.
+    """
+    if not _is_λ(expression):
+        raise TypeError("Expected an abstraction, got a `%s` (%s)"
+                        % (type(expression).__name__, expression))
+    return _SharedAbstraction(expression)
+
+
+def _merged(expressions):
+    """ Return the functions evaluating each of the expressions merged into one DAG,
+    and the number of variables they hold all together.
+    """
+    # pylint: disable=protected-access
+    expressions = tuple(expressions)
+    variable_indices = set()
+    for expression in expressions:
+        if not _is_λ(expression):
+            raise TypeError("Expected an abstraction, got a `%s` (%s)"
+                            % (type(expression).__name__, expression))
+        variable_indices.update(expression._λ_var_indices)
+    # each expression may only use some of the variables, e.g. x2
+    _check_variables(variable_indices)
+    structures = _Structures()
+    evaluators = _evaluators(tuple(structures.merge(expression) for expression in expressions))
+    return evaluators, len(variable_indices)
+
+
+def evaluate_many(expressions, *args):
+    """ Return the tuple of the β-reductions of all the expressions with the same arguments,
+    one per variable held by any of them (or packed), computing their common
+    sub-expressions once. Use `map_many` to apply them on many items.
+    """
+    evaluators, nb_vars = _merged(expressions)
+    if len(args) != nb_vars:
+        args = _unpack(args, nb_vars)
+    values = {}
+    return tuple(evaluate(args, values) for evaluate in evaluators)
+
+
+def _evaluate_all(evaluators, nb_vars, item):
+    args = (item,) if nb_vars <= 1 else _unpack((item,), nb_vars)
+    values = {}
+    return tuple(evaluate(args, values) for evaluate in evaluators)
+
+
+def map_many(expressions, iterable):
+    """ Like `map_` with all the expressions at once: yield for each item the tuple of the
+    β-reductions of the expressions, computing their common sub-expressions once per item.
+    The expressions are merged once for all the items.
+    """
+    evaluators, nb_vars = _merged(expressions)
+    return (_evaluate_all(evaluators, nb_vars, item) for item in iterable)
@@ -0,0 +1,244 @@
+""" Specialize λ-abstractions for the types of their arguments.
+
+`specialize(expression)` returns an equivalent abstraction that records the types
+of the arguments of its β-reductions. Once a tuple of types (a signature) has been seen
+`threshold` times, a specialized evaluator is built for it: the expression compiled
+(see `lambdax.compiler`), after the rewrites that are exact for the types inferred
+for each node, e.g. `x * 1 -> x` or `x ** 2 -> x * x` where `x` is known to be an `int`.
+The β-reductions whose signature has no specialized evaluator (yet) use the generic one.
+
+The types of the nodes are inferred from the types of the variables and the constants,
+through the operators whose result type doesn't depend on the values for the built-in
+numbers (e.g. `int + float` is always a `float`, whereas `int ** int` is not always
+an `int`). The type guard is a lookup of the tuple of the argument types.
+
+The specialized evaluators are kept in a bounded LRU cache, like with `memoize`,
+which can be used by several threads at once.
+"""
+
+from collections import OrderedDict as _OrderedDict, namedtuple as _namedtuple
+import functools
+import operator
+import threading
+
+from lambdax.compiler import _Compiler
+from lambdax.lambda_calculus import (
+    _apply, _reversed_operations, _set_attribute, _LambdaAbstractionBase,
+    _ConstantAbstraction, _IdentityAbstraction, _LambdaAbstraction,
+    and_ as _and, or_ as _or, if_ as _if, is_λ as _is_λ
+)
+from lambdax.rewriting import (
+    _add_all, _eliminate_double_negation, _eliminate_identities, _multiply_all, _reduce_square
+)
+from lambdax.tree import children as _children, transform as _transform
+
+_SpecializationInfo = _namedtuple('SpecializationInfo', (
+    'hits', 'misses', 'specializations', 'evictions', 'maxsize', 'currsize'))
+
+# a value of each built-in number type, to compute the types of the results
+_SAMPLES = {bool: True, int: 3, float: 1.5, complex: 1.5 + 2j}
+
+# operations whose result type only depends on the types of the operands, for numbers
+_TYPED_OPERATIONS = {
+    operator.add, operator.sub, operator.mul, operator.truediv, operator.floordiv,
+    operator.mod, operator.neg, operator.pos, operator.abs, abs,
+    operator.lt, operator.le, operator.eq, operator.ne, operator.ge, operator.gt,
+    operator.not_, operator.truth, _add_all, _multiply_all,
+}
+
+# rewrite rules giving exactly the same results when all the values are integers
+_INTEGER_RULES = (_eliminate_identities, _eliminate_double_negation, _reduce_square)
+
+# signatures seen fewer than `threshold` times that are remembered, per cache entry
+_SEEN_PER_ENTRY = 4
+
+
+@functools.lru_cache(maxsize=None)
+def _result_type(operation, operand_types):
+    try:
+        return type(operation(*(_SAMPLES[t] for t in operand_types)))
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
+def _contains(table, key):
+    try:
+        return key in table
+    except TypeError:  # unhashable
+        return False
+
+
+def _operation_type(node, types):
+    """ Type of the result of an operation node, given the types of its children """
+    # pylint: disable=protected-access
+    if node._λ_abstract_kwargs:
+        return None
+    operation, operands = node._λ_operation, types
+    if operation is _apply:
+        callee = node._λ_origin
+        if not isinstance(callee, _ConstantAbstraction):
+            return None
+        operation, operands = callee._λ_constant, types[1:]
+    elif _contains(_reversed_operations, operation):
+        operation, operands = _reversed_operations[operation], types[::-1]
+    if operation is operator.pow and operands == (int, int):
+        exponent = node._λ_abstract_args[0]
+        if (isinstance(exponent, _ConstantAbstraction) and
+                type(exponent._λ_constant) is int and exponent._λ_constant >= 0):
+            return int
+        return None
+    if not _contains(_TYPED_OPERATIONS, operation) or not all(t in _SAMPLES for t in operands):
+        return None
+    return _result_type(operation, operands)
+
+
+def _node_type(node, types, argument_types):
+    """ Type of the values of `node` for these types of the arguments (by index of variable),
+    or None if unknown, given the types of its children
+    """
+    # pylint: disable=protected-access
+    if isinstance(node, _IdentityAbstraction):
+        return argument_types[next(iter(node._λ_var_indices))]
+    if isinstance(node, _ConstantAbstraction):
+        return type(node._λ_constant)
+    if isinstance(node, (_and, _or, _if)):
+        branches = set(types[1:] if isinstance(node, _if) else types)
+        return branches.pop() if len(branches) == 1 else None
+    if isinstance(node, _LambdaAbstraction) and not _is_λ(node._λ_operation):
+        return _operation_type(node, types)
+    return None
+
+
+def _integer_rewrite(node, types, argument_types):
+    """ Return `node` rewritten by the first integer rule whose result is an integer too
+    (e.g. not `b` for `b * 1` where `b` is a `bool`), or `node` itself
+    """
+    for rule in _INTEGER_RULES:
+        new_node = rule(node)
+        if new_node is None or new_node is node:
+            continue
+        if id(new_node) in types:
+            new_type = types[id(new_node)]
+        else:
+            new_type = _node_type(new_node, tuple(types.get(id(child))
+                                                  for child in _children(new_node)),
+                                  argument_types)
+        if new_type is int:
+            return new_node
+    return node
+
+
+def _specialized_expression(expression, argument_types):
+    """ Return `expression` rewritten with the rules that are exact for the inferred types """
+    types = {}
+
+    def specialize_node(node):
+        children_types = tuple(types[id(child)] for child in _children(node))
+        node_type = _node_type(node, children_types, argument_types)
+        if node_type is int and children_types and all(t is int for t in children_types):
+            node = _integer_rewrite(node, types, argument_types)
+        types[id(node)] = node_type
+        return node
+
+    return _transform(expression, specialize_node)
+
+
+class _Stats:
+    __slots__ = ('hits', 'misses', 'specializations', 'evictions')
+
+    def __init__(self):
+        self.hits = self.misses = self.specializations = self.evictions = 0
+
+
+class _SpecializedAbstraction(_LambdaAbstractionBase):
+    def __init__(self, expression, maxsize, threshold):
+        # pylint: disable=protected-access
+        _set_attribute(self, '_λ_expression', expression)
+        # as a sub-expression, its variables are any of the variables of its parent
+        indices = tuple(sorted(expression._λ_var_indices))
+        _set_attribute(self, '_λ_indices', indices)
+        _set_attribute(self, '_λ_parameters',
+                       tuple('x%d' % (i + 1) for i in range(indices[-1] + 1 if indices else 0)))
+        _set_attribute(self, '_λ_maxsize', maxsize)
+        _set_attribute(self, '_λ_threshold', threshold)
+        # signature -> specialized evaluator
+        _set_attribute(self, '_λ_evaluators', _OrderedDict())
+        # signature -> number of generic β-reductions
+        _set_attribute(self, '_λ_seen', _OrderedDict())
+        _set_attribute(self, '_λ_stats', _Stats())
+        _set_attribute(self, '_λ_lock', threading.Lock())
+        super().__init__(expression._λ_var_indices)
+
+    def _β(self, *input_data):
+        signature = tuple(type(input_data[i]) for i in self._λ_indices)
+        with self._λ_lock:
+            evaluator = self._λ_evaluators.get(signature)
+            if evaluator is not None:
+                self._λ_stats.hits += 1
+                self._λ_evaluators.move_to_end(signature)
+            else:
+                self._λ_stats.misses += 1
+                if self._λ_observe(signature):
+                    evaluator = self._λ_specialize(signature)
+        # the evaluators are called without the lock, they have no state
+        if evaluator is not None:
+            return evaluator(*input_data[:len(self._λ_parameters)])
+        return self._λ_expression._β(*input_data)  # pylint: disable=protected-access
+
+    def _λ_observe(self, signature):
+        """ Count a generic β-reduction, and tell if the signature must be specialized """
+        seen = self._λ_seen
+        count = seen.pop(signature, 0) + 1
+        if count >= self._λ_threshold:
+            return True
+        seen[signature] = count
+        if len(seen) > _SEEN_PER_ENTRY * self._λ_maxsize:
+            seen.popitem(last=False)
+        return False
+
+    def _λ_specialize(self, signature):
+        argument_types = dict(zip(self._λ_indices, signature))
+        evaluator = _Compiler(self._λ_parameters).compile(
+            _specialized_expression(self._λ_expression, argument_types))
+        self._λ_stats.specializations += 1
+        evaluators = self._λ_evaluators
+        evaluators[signature] = evaluator
+        if len(evaluators) > self._λ_maxsize:
+            evaluators.popitem(last=False)
+            self._λ_stats.evictions += 1
+        return evaluator
+
+    def __reduce__(self):
+        # the specialized evaluators are not pickled
+        return specialize, (self._λ_expression, self._λ_maxsize, self._λ_threshold)
+
+
+def specialize(expression, maxsize=8, threshold=2):
+    """ Return an abstraction equivalent to `expression`, that builds an evaluator
+    specialized for the types of the arguments once they've been seen `threshold` times,
+    keeping the ones of the last `maxsize` signatures used.
+    """
+    if not _is_λ(expression):
+        raise TypeError("Expected an abstraction, got a `%s` (%s)"
+                        % (type(expression).__name__, expression))
+    if maxsize < 1:
+        raise ValueError("`maxsize` must be at least 1, got %d" % maxsize)
+    if threshold < 1:
+        raise ValueError("`threshold` must be at least 1, got %d" % threshold)
+    return _SpecializedAbstraction(expression, maxsize, threshold)
+
+
+def specialization_info(specialized):
+    """ Return the statistics of a specialized abstraction: the β-reductions whose
+    signature had a specialized evaluator (hits) or not (misses), and the evaluators
+    built and evicted from the cache.
+    """
+    # pylint: disable=protected-access
+    if not isinstance(specialized, _SpecializedAbstraction):
+        raise TypeError("Expected a specialized abstraction, got a `%s` (%s)"
+                        % (type(specialized).__name__, specialized))
+    with specialized._λ_lock:
+        stats = specialized._λ_stats
+        return _SpecializationInfo(stats.hits, stats.misses, stats.specializations,
+                                   stats.evictions, specialized._λ_maxsize,
+                                   len(specialized._λ_evaluators))
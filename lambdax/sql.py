@@ -0,0 +1,347 @@
+""" Translate λ-abstractions used as filters into SQL `WHERE` clauses, for SQLite.
+
+`to_where(expression, columns)` returns the clause and its parameters (for the `?`
+placeholders of `sqlite3`), so that the rows are filtered by the database, which can use
+its indexes, rather than by the expression in Python once fetched:
+
+    clause, params = to_where(and_(x1 > 10, x2 != 'red'), {'x1': 'price', 'x2': 'color'})
+    rows = connection.execute('SELECT * FROM items WHERE ' + clause, params)
+
+The variables are either mapped to columns by `columns`, or are whole rows whose items
+are the columns, e.g. `x['price'] > 10` (as with the rows of `sqlite3.Row`).
+The expression can be made of:
+- comparisons (`==`, `!=`, `<`, `<=`, `>`, `>=` or the functions of `lambdax.operators`),
+- the arithmetic operators `+`, `-`, `*`, `/` and `abs`,
+- `and_`, `or_`, `not_`, `truth` and `if_`, whose operands must be conditions (i.e. the
+  results of the other operators), since the truth values of SQL aren't the ones of Python,
+- `contains(collection, x)` on a constant collection (`x IN (...)`),
+- `is_(x, None)` and `is_not(x, None)` (`x IS NULL` and `x IS NOT NULL`),
+- constant numbers, strings and bytes, as parameters.
+The arithmetic of SQL is numeric only: the strings and bytes can't be operands of the
+arithmetic operators, nor be compared with their results (e.g. `x['name'] * 2 == 'abab'`).
+The other expressions can't be translated, and raise a `ValueError`; `split_where` rather
+pushes down the conditions of a conjunction that can be translated, and returns the
+others as a residual expression to filter the rows in Python.
+
+The values of the columns are assumed to be of the types of the constants they're
+compared with. Since comparisons with `NULL` are never true in SQL, the rows with `NULL`
+in a column the condition depends on are filtered out, even when negated.
+"""
+
+from functools import reduce as _reduce
+import operator
+
+from lambdax.lambda_calculus import (
+    _apply, _reversed_operations,
+    _ConstantAbstraction, _IdentityAbstraction, _LambdaAbstraction,
+    and_ as _and, or_ as _or, if_ as _if, is_λ as _is_λ
+)
+from lambdax.profiling import _render
+from lambdax.rewriting import _NARY_OPERATORS, _VARIABLES, _get, _variable_index
+from lambdax.tree import walk as _walk
+
+_COMPARISONS = {
+    operator.eq: '=',
+    operator.ne: '!=',
+    operator.lt: '<',
+    operator.le: '<=',
+    operator.gt: '>',
+    operator.ge: '>=',
+}
+
+_ARITHMETIC = {
+    operator.add: '+',
+    operator.sub: '-',
+    operator.mul: '*',
+}
+
+# types of the values that can be given as parameters, with their exact type
+# (e.g. not the subclasses of `int` whose comparisons may be overridden)
+_PARAMETER_TYPES = (bool, int, float, str, bytes)
+
+_COLLECTION_TYPES = (list, tuple, set, frozenset)
+
+# clause of the conditions that always hold
+_TRUE = '1'
+
+# kinds of the values whose type is known, that can't be mixed in SQL as in Python
+_NUMBER = 'number'
+_TEXT = 'text'
+
+
+class _Untranslatable:
+    """ Reason why a node can't be translated """
+    __slots__ = ('reason',)
+
+    def __init__(self, reason):
+        self.reason = reason
+
+
+_MIXED_KINDS = _Untranslatable("numbers can't be compared with strings or bytes in SQL, e.g."
+                               " the results of its arithmetic, which is numeric only")
+
+
+class _Sql:
+    """ Translation of a node, telling if it's a condition (whose truth value is the same
+    in SQL and in Python), and the kind of its values if known (`_NUMBER` or `_TEXT`)
+    """
+    __slots__ = ('source', 'params', 'condition', 'kind')
+
+    def __init__(self, source, params, condition, kind=None):
+        self.source = source
+        self.params = params
+        self.condition = condition
+        self.kind = kind
+
+
+def _quote(identifier):
+    return '"%s"' % identifier.replace('"', '""')
+
+
+def _variable_columns(columns):
+    """ Map the indices of the variables to the quoted names of their columns """
+    variable_columns = {}
+    for name, column in (columns or {}).items():
+        index = 0 if name in ('x', 'X') else _variable_index(name)
+        if index is None:
+            raise TypeError("`%s` is not the name of a variable" % name)
+        if not isinstance(column, str):
+            raise TypeError("Expected the name of a column for %s, got a `%s` (%s)"
+                            % (name, type(column).__name__, column))
+        variable_columns[index] = _quote(column)
+    return variable_columns
+
+
+def _operation(node):
+    """ Return the function applied by `node` with the nodes of its operands in order,
+    e.g. `(lt, (c, x))` for both `c < x` and `lt(c, x)`, or None
+    """
+    # pylint: disable=protected-access
+    if node._λ_abstract_kwargs:
+        return None
+    operation, args = node._λ_operation, node._λ_abstract_args
+    if operation is _apply:
+        callee = node._λ_origin
+        if not isinstance(callee, _ConstantAbstraction):
+            return None
+        return callee._λ_constant, args
+    original = _get(_reversed_operations, operation)
+    if original is not None and len(args) == 1:
+        return original, (args[0], node._λ_origin)
+    if _is_λ(operation):
+        return None
+    return operation, (node._λ_origin,) + args
+
+
+def _is_none(node):
+    # pylint: disable=protected-access
+    return isinstance(node, _ConstantAbstraction) and node._λ_constant is None
+
+
+class _Translator:
+    def __init__(self, columns):
+        self._columns = columns
+        self._translations = {}  # id(node) -> _Sql or _Untranslatable
+
+    def translate(self, root):
+        """ Return the translation of `root`, as a `_Sql` or an `_Untranslatable` """
+        for node in _walk(root):
+            if id(node) not in self._translations:
+                self._translations[id(node)] = self._node(node)
+        return self._translations[id(root)]
+
+    def _constant(self, value):
+        if type(value) not in _PARAMETER_TYPES:
+            return _Untranslatable("the constant %r can't be a parameter" % (value,))
+        return _Sql('?', (value,), type(value) is bool,
+                    _TEXT if isinstance(value, (str, bytes)) else _NUMBER)
+
+    def _node(self, node):
+        # pylint: disable=protected-access
+        operation = None
+        if isinstance(node, _ConstantAbstraction):
+            return self._constant(node._λ_constant)
+        if isinstance(node, _IdentityAbstraction):
+            index = next(iter(node._λ_var_indices))
+            if index not in self._columns:
+                return _Untranslatable("x%d is not mapped to a column" % (index + 1))
+            return _Sql(self._columns[index], (), False)
+        if isinstance(node, _LambdaAbstraction):
+            operation = _operation(node)
+            if operation is not None:
+                special = self._special(*operation)
+                if special is not None:
+                    return special
+
+        if isinstance(node, (_and, _or, _if)):
+            function, operands = None, node._λ_operands
+        elif operation is not None:
+            function, operands = operation
+        else:
+            return _Untranslatable("%s can't be translated" % _render(node))
+        # the callee of a call is not an operand
+        operands = [self._translations[id(operand)] for operand in operands]
+        for operand in operands:
+            if isinstance(operand, _Untranslatable):
+                return operand
+        if function is None:
+            return self._logical(node, operands)
+        return self._operator(node, function, operands)
+
+    def _special(self, function, operands):
+        """ Translate the operations whose operands aren't translated as usual """
+        # pylint: disable=protected-access
+        if function is operator.getitem and len(operands) == 2:
+            row, key = operands
+            if (isinstance(row, _IdentityAbstraction) and isinstance(key, _ConstantAbstraction)
+                    and isinstance(key._λ_constant, str)):
+                index = next(iter(row._λ_var_indices))
+                if index in self._columns:
+                    return _Untranslatable("x%d is mapped to a column, and has items too"
+                                           % (index + 1))
+                return _Sql(_quote(key._λ_constant), (), False)
+            return _Untranslatable("only the rows can have items, with a constant name")
+        if function is operator.contains and len(operands) == 2:
+            collection, item = operands
+            if not (isinstance(collection, _ConstantAbstraction) and
+                    type(collection._λ_constant) in _COLLECTION_TYPES):
+                return _Untranslatable("only constant collections can contain the values")
+            item = self._translations[id(item)]
+            if isinstance(item, _Untranslatable):
+                return item
+            values = [self._constant(value) for value in collection._λ_constant]
+            for value in values:
+                if isinstance(value, _Untranslatable):
+                    return value
+                if {item.kind, value.kind} == {_NUMBER, _TEXT}:
+                    return _MIXED_KINDS
+            return _Sql('(%s IN (%s))' % (item.source, ', '.join('?' for _ in values)),
+                        item.params + tuple(value.params[0] for value in values), True)
+        if (function is operator.is_ or function is operator.is_not) and len(operands) == 2:
+            if not _is_none(operands[1]):
+                return _Untranslatable("only the identity to None can be checked")
+            value = self._translations[id(operands[0])]
+            if isinstance(value, _Untranslatable):
+                return value
+            return _Sql('(%s IS %sNULL)' % (value.source,
+                                            'NOT ' if function is operator.is_not else ''),
+                        value.params, True)
+        if _get(_COMPARISONS, function) and any(_is_none(operand) for operand in operands):
+            return _Untranslatable("None can only be compared with `is_` and `is_not`")
+        return None
+
+    @staticmethod
+    def _logical(node, children):
+        for child in children:
+            if not child.condition:
+                return _Untranslatable("the operands of %s must be conditions, e.g. `x != 0`"
+                                       % type(node).__name__)
+        params = tuple(param for child in children for param in child.params)
+        if isinstance(node, _if):
+            return _Sql('(CASE WHEN %s THEN %s ELSE %s END)'
+                        % tuple(child.source for child in children), params, True)
+        return _Sql('(%s %s %s)' % (children[0].source, 'AND' if isinstance(node, _and) else 'OR',
+                                    children[1].source), params, True)
+
+    @staticmethod
+    def _operator(node, function, operands):
+        params = tuple(param for operand in operands for param in operand.params)
+        sources = [operand.source for operand in operands]
+        kinds = {operand.kind for operand in operands}
+        if len(operands) == 2 and _get(_COMPARISONS, function):
+            if kinds == {_NUMBER, _TEXT}:
+                return _MIXED_KINDS
+            return _Sql('(%s %s %s)' % (sources[0], _COMPARISONS[function], sources[1]),
+                        params, True)
+        if _TEXT in kinds and function is not operator.not_ and function is not operator.truth:
+            return _Untranslatable("the arithmetic of SQL doesn't apply to strings and bytes")
+        if len(operands) == 1:
+            source = sources[0]
+            if function is operator.not_ or function is operator.truth:
+                if not operands[0].condition:
+                    return _Untranslatable("the operand of %s must be a condition, e.g. `x != 0`"
+                                           % function.__name__)
+                return _Sql('(NOT %s)' % source if function is operator.not_ else source,
+                            params, True)
+            if function is operator.neg:
+                return _Sql('(-%s)' % source, params, False, _NUMBER)
+            if function is operator.pos:
+                return _Sql(source, params, False, _NUMBER)
+            if function is abs or function is operator.abs:
+                return _Sql('abs(%s)' % source, params, False, _NUMBER)
+        else:
+            # the sums and products of more than two operands are flattened by `simplify`
+            symbol = _get(_ARITHMETIC if len(operands) == 2 else _NARY_OPERATORS, function)
+            if symbol:
+                return _Sql('(%s)' % (' %s ' % symbol).join(sources), params, False, _NUMBER)
+            if function is operator.truediv and len(operands) == 2:
+                # the division of integers is an integer division in SQL
+                return _Sql('(CAST(%s AS REAL) / %s)' % tuple(sources), params, False, _NUMBER)
+        return _Untranslatable("%s can't be translated" % _render(node))
+
+
+def _check(expression):
+    if not _is_λ(expression):
+        raise TypeError("Expected an abstraction, got a `%s` (%s)"
+                        % (type(expression).__name__, expression))
+
+
+def to_where(expression, columns=None):
+    """ Return the SQL condition equivalent to `expression`, with the values of its
+    parameters, where `columns` maps the names of the variables (e.g. 'x1') to columns.
+    Raise a `ValueError` if it can't be translated.
+    """
+    _check(expression)
+    translation = _Translator(_variable_columns(columns)).translate(expression)
+    if isinstance(translation, _Untranslatable):
+        raise ValueError("Can't translate %s to SQL: %s" % (_render(expression),
+                                                            translation.reason))
+    if not translation.condition:
+        raise ValueError("Can't translate %s to SQL: it must be a condition, e.g. `x != 0`"
+                         % _render(expression))
+    return translation.source, translation.params
+
+
+def _conjuncts(expression):
+    """ The operands of the nested `and_` of `expression`, in order """
+    stack = [expression]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, _and):
+            stack.extend(reversed(node._λ_operands))  # pylint: disable=protected-access
+        else:
+            yield node
+
+
+def _first(value, *_):
+    return value
+
+
+def split_where(expression, columns=None):
+    """ Split `expression` into the conditions of its conjunction (`and_`) that can be
+    translated to SQL (see `to_where`) and the other ones. Return the SQL condition,
+    its parameters, and the residual expression the rows must still satisfy, or None.
+    The residual expression holds the same variables as `expression`.
+    """
+    # pylint: disable=protected-access
+    _check(expression)
+    translator = _Translator(_variable_columns(columns))
+    pushed, residual = [], []
+    for conjunct in _conjuncts(expression):
+        translation = translator.translate(conjunct)
+        if isinstance(translation, _Sql) and translation.condition:
+            pushed.append(translation)
+        else:
+            residual.append(conjunct)
+
+    source = ' AND '.join(translation.source for translation in pushed) or _TRUE
+    params = tuple(param for translation in pushed for param in translation.params)
+    if not residual:
+        return source, params, None
+    residual = _reduce(_and, residual)
+    missing = sorted(expression._λ_var_indices - residual._λ_var_indices)
+    if missing:
+        # the residual expression is reduced with the values of all the variables
+        residual = _LambdaAbstraction(_ConstantAbstraction(_first), _apply,
+                                      (residual,) + tuple(_VARIABLES[i] for i in missing), {})
+    return source, params, residual
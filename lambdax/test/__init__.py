@@ -1,8 +1,11 @@
 """ Package to hold all unit-tests related to `lambdax`.
-This module only contains a helper for the tests.
+This module only contains helpers for the tests.
 """
 
-from lambdax.lambda_calculus import is_λ
+from collections import Counter
+
+from lambdax.lambda_calculus import is_λ, λ
+from lambdax.rewriting import pure as declare_pure
 
 
 def assert_value(value, expected):
@@ -12,3 +15,19 @@ def assert_value(value, expected):
     """
     assert not is_λ(value)
     assert value == expected
+
+
+def counted(function, pure=False):
+    """ Return `function` wrapped in an abstraction, and the `Counter` of its calls
+    by the representation of their arguments. With `pure`, the wrapper is declared pure,
+    so that its calls can be folded.
+    """
+    calls = Counter()
+
+    def counted_function(*args):
+        calls[repr(args)] += 1
+        return function(*args)
+
+    if pure:
+        declare_pure(counted_function)
+    return λ(counted_function), calls
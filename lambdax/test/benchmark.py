@@ -1,27 +1,327 @@
-""" Trivial benchmark to roughly measure the performance gap between the usual pythonic lambdas
+""" Benchmark suite measuring the performance gap between the usual pythonic lambdas
 and the ones built with this package, to be fully aware of what we lose in the process.
 The goal of this package is not to provide an efficient replacement to lambdas though,
-but just a more concise way of writing them.
+but just a more concise way of writing them; when performance matters, compile them.
+
+Run all the cases (or the ones whose name contains one of the given patterns):
+    python -m lambdax.test.benchmark [-k PATTERN ...] [--repeat N] [--json FILE]
+Compare two results written with `--json`, failing if a case got slower:
+    python -m lambdax.test.benchmark compare BASE.json NEW.json [--threshold 0.1]
+
+Each case is run `warmup` times, then timed `repeat` times, each time being the mean
+of a number of consecutive calls calibrated to last about `--duration` seconds.
+The report gives the median time per call, with a 95% confidence interval given
+by the order statistics of the repeats.
 """
 
-from time import time
+import argparse
+import builtins
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+
+from lambdax import λ, x, x1, x2, x3, x4, x5, x6, x7, x8, x9, and_, or_, if_, compile_
+from lambdax import __version__
+from lambdax.builtins_as_lambdas import abs_λ, dict_λ
+from lambdax import builtins_overridden
+from lambdax.builtins_overridden import abs as λabs
+
+_CASES = {}
+
+_VARIABLES = (x1, x2, x3, x4, x5, x6, x7, x8, x9)
+
+
+def _case(name):
+    """ Register the function returning the callable to time as the case `name` """
+    def register(setup):
+        _CASES[name] = setup
+        return setup
+
+    return register
+
+
+def _chain(depth):
+    expression = x
+    for _ in range(depth - 1):
+        expression = expression + 1
+    return expression
+
+
+# reference
+
+@_case('reference/lambda')
+def _reference_lambda():
+    reference = lambda y: abs(-y ** 3 + 7)  # noqa: E731
+    return lambda: reference(3)
+
+
+@_case('reference/compiled')
+def _reference_compiled():
+    compiled = compile_(abs_λ(-x ** 3 + 7))
+    return lambda: compiled(3)
+
+
+# construction of expressions
+
+@_case('construction/simple')
+def _construction_simple():
+    return lambda: abs_λ(-x ** 3 + 7)
+
+
+@_case('construction/depth-100')
+def _construction_deep():
+    return lambda: _chain(100)
+
+
+# β-reduction at several depths and arities
+
+@_case('reduction/simple')
+def _reduction_simple():
+    expression = abs_λ(-x ** 3 + 7)
+    return lambda: expression(3)
+
+
+def _reduction_depth(depth):
+    expression = _chain(depth)
+    return lambda: expression(0)
+
+
+for _depth in (1, 10, 100):
+    _case('reduction/depth-%d' % _depth)(lambda depth=_depth: _reduction_depth(depth))
+
+
+def _reduction_arity(arity):
+    expression = _VARIABLES[0]
+    for variable in _VARIABLES[1:arity]:
+        expression = expression + variable
+    args = tuple(range(arity))
+    return lambda: expression(*args)
+
+
+for _arity in (1, 3, 9):
+    _case('reduction/arity-%d' % _arity)(lambda arity=_arity: _reduction_arity(arity))
+
+
+@_case('reduction/packed-arguments')
+def _reduction_packed():
+    expression = x1 * x2 + x3
+    packed = (1, 2, 3)
+    return lambda: expression(packed)
+
+
+# lazy operators
+
+@_case('lazy/and')
+def _lazy_and():
+    expression = and_(x > 0, x + 1)
+    return lambda: expression(3)
+
+
+@_case('lazy/or')
+def _lazy_or():
+    expression = or_(x > 0, x + 1)
+    return lambda: expression(-3)
+
+
+@_case('lazy/if')
+def _lazy_if():
+    expression = if_(x > 0, x + 1, x - 1)
+    return lambda: expression(3)
+
+
+# calls
+
+@_case('call/method')
+def _call_method():
+    expression = x.join(λ(['a', 'b', 'c']))
+    return lambda: expression(', ')
+
+
+@_case('call/kwargs')
+def _call_kwargs():
+    expression = dict_λ(r=x.real, i=x.imag)
+    return lambda: expression(1 + 2j)
+
+
+@_case('call/lambda-wrapped')
+def _call_wrapped():
+    expression = λ(math.sqrt)(x) + 1
+    return lambda: expression(4.)
+
+
+# built-in functions overridden to accept abstractions, compared with the real ones
+# when called on usual values
+
+_BUILTIN_CALLS = {
+    'len': ('len', ('abc',), {}),
+    'isinstance': ('isinstance', (1, int), {}),
+    'max': ('max', (1, 2, 3), {}),
+    'max-4-arguments': ('max', (1, 2, 3, 4), {}),
+    'sorted-kwargs': ('sorted', ((3, 1, 2),), {'key': None}),
+}
+
+
+def _builtin_call(module, name, args, kwargs):
+    function = getattr(module, name)
+    return lambda: function(*args, **kwargs)
+
+
+for _name, (_function, _args, _kwargs) in _BUILTIN_CALLS.items():
+    _case('builtins/%s' % _name)(
+        lambda call=(_function, _args, _kwargs): _builtin_call(builtins, *call))
+    _case('builtins-overridden/%s' % _name)(
+        lambda call=(_function, _args, _kwargs): _builtin_call(builtins_overridden, *call))
+
+
+@_case('builtins-overridden/abstraction')
+def _overridden_abstraction():
+    return lambda: λabs(x)
+
+
+def _confidence_interval(samples):
+    """ 95% confidence interval of the median, from the order statistics of the samples """
+    samples = sorted(samples)
+    size = len(samples)
+    half_width = 1.96 * math.sqrt(size) / 2
+    low = max(int(math.floor(size / 2 - half_width)), 0)
+    high = min(int(math.ceil(size / 2 + half_width)), size - 1)
+    return samples[low], samples[high]
+
+
+def _calibrate(function, duration):
+    """ Number of calls lasting about `duration` seconds """
+    number = 1
+    while True:
+        begin = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - begin
+        if elapsed >= duration / 10 or number >= 10 ** 8:
+            return max(1, int(number * duration / max(elapsed, 1e-9)))
+        number *= 10
+
+
+def _measure(setup, repeat, warmup, duration):
+    function = setup()
+    number = _calibrate(function, duration)
+    samples = []
+    for iteration in range(warmup + repeat):
+        begin = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = (time.perf_counter() - begin) / number
+        if iteration >= warmup:
+            samples.append(elapsed)
+    low, high = _confidence_interval(samples)
+    return {
+        'median': statistics.median(samples),
+        'mean': statistics.mean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.,
+        'ci_low': low,
+        'ci_high': high,
+        'number': number,
+        'samples': samples,
+    }
+
+
+def _format_time(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('µs', 1e-6)):
+        if seconds >= scale:
+            return '%.3f %s' % (seconds / scale, unit)
+    return '%.1f ns' % (seconds / 1e-9)
+
+
+def run(patterns=(), repeat=7, warmup=1, duration=0.05, output=None):
+    """ Run the benchmark cases, print their results and return them """
+    results = {}
+    reference = None
+    print('%-40s %12s %27s %8s' % ('case', 'median', '95% confidence interval', 'ratio'))
+    for name, setup in _CASES.items():
+        if patterns and not any(pattern in name for pattern in patterns):
+            continue
+        result = results[name] = _measure(setup, repeat, warmup, duration)
+        if name == 'reference/lambda':
+            reference = result['median']
+        ratio = 'x%.2f' % (result['median'] / reference) if reference else ''
+        print('%-40s %12s %12s - %12s %8s'
+              % (name, _format_time(result['median']), _format_time(result['ci_low']),
+                 _format_time(result['ci_high']), ratio))
+    report = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'lambdax': __version__,
+        'repeat': repeat,
+        'warmup': warmup,
+        'cases': results,
+    }
+    if output:
+        with open(output, 'w') as file:
+            json.dump(report, file, indent=2)
+    return report
+
+
+def compare(base, new, threshold=0.1):
+    """ Print the comparison of two reports, and return the names of the cases that
+    are slower by more than `threshold` (relative) in `new`, beyond the noise given by
+    their confidence intervals.
+    """
+    regressions = []
+    print('%-40s %12s %12s %8s' % ('case', 'base', 'new', 'change'))
+    for name, new_result in new['cases'].items():
+        base_result = base['cases'].get(name)
+        if base_result is None:
+            print('%-40s %12s %12s %8s' % (name, '-', _format_time(new_result['median']), 'new'))
+            continue
+        change = new_result['median'] / base_result['median'] - 1
+        regression = change > threshold and new_result['ci_low'] > base_result['ci_high']
+        if regression:
+            regressions.append(name)
+        print('%-40s %12s %12s %+7.1f%%%s'
+              % (name, _format_time(base_result['median']), _format_time(new_result['median']),
+                 100 * change, '  REGRESSION' if regression else ''))
+    return regressions
+
+
+def _load(filename):
+    with open(filename) as file:
+        return json.load(file)
+
 
-from lambdax import x
-from lambdax.builtins_overridden import abs as λabs, list as λlist
+def main(argv=None):
+    """ Entry point of the command line """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    subparsers = parser.add_subparsers(dest='command')
+    run_parser = subparsers.add_parser('run', help="run the benchmark (default)")
+    compare_parser = subparsers.add_parser('compare', help="compare two results")
 
-iterations = range(100000)
+    for arguments in (parser, run_parser):
+        arguments.add_argument('-k', dest='patterns', action='append', default=[],
+                               help="only run the cases whose name contains this pattern")
+        arguments.add_argument('--repeat', type=int, default=7)
+        arguments.add_argument('--warmup', type=int, default=1)
+        arguments.add_argument('--duration', type=float, default=0.05,
+                               help="approximate duration of each repeat, in seconds")
+        arguments.add_argument('--json', dest='output', help="write the results to this file")
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help="relative slowdown considered as a regression")
 
-begin_test = time()
-# here `λlist` behaves like built-in `list`, whereas `λabs` returns an abstraction
-test_result = λlist(map(λabs(-x ** 3 + 7), iterations))
-end_test = time()
+    args = parser.parse_args(argv)
+    if args.command == 'compare':
+        regressions = compare(_load(args.base), _load(args.new), args.threshold)
+        if regressions:
+            print("%d regression(s): %s" % (len(regressions), ', '.join(regressions)))
+            return 1
+        return 0
+    if args.repeat < 2:
+        parser.error("--repeat must be at least 2")
+    run(args.patterns, args.repeat, args.warmup, args.duration, args.output)
+    return 0
 
-begin_ref = time()
-ref_result = list(map(lambda y: abs(-y ** 3 + 7), iterations))
-end_ref = time()
 
-assert test_result == ref_result
-ref_duration = end_ref - begin_ref
-test_duration = end_test - begin_test
-print("Reference is %.3fs" % ref_duration)
-print("Test computed in: %.3fs (x%d)" % (test_duration, test_duration / ref_duration))
+if __name__ == '__main__':
+    sys.exit(main())
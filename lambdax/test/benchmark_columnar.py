@@ -0,0 +1,48 @@
+""" Trivial benchmark comparing `evaluate_columns` with the β-reduction of the expression
+row by row, to find from how many rows evaluating it node by node on the columns pays off
+(its cost per call being higher, it gets amortized on enough rows).
+"""
+
+from functools import partial
+from itertools import starmap
+from time import perf_counter
+
+from lambdax import x1, x2, x3, evaluate_columns
+
+SIZES = (1, 2, 5, 10, 20, 50, 100, 1000, 10000, 100000)
+
+EXPRESSIONS = {
+    'wide': x1 * 2 + x2 * 3 + x3 * 4 - x1 * x2,
+    'deep': ((((x1 + 1) * 2 - x2) / 3 + x3) % 7 - 1) * 2,
+}
+
+
+def _by_rows(expression, columns):
+    return list(starmap(expression, zip(*columns)))
+
+
+def _time(function, size):
+    """ Best time per row of `function` """
+    number = max(1, 20000 // size)
+    best = float('inf')
+    for _ in range(3):
+        begin = perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, perf_counter() - begin)
+    return best / number / size
+
+
+if __name__ == '__main__':
+    print("%-6s %8s %14s %14s %8s" % ('', 'rows', 'rows (µs)', 'columns (µs)', 'speedup'))
+    for name, expression in EXPRESSIONS.items():
+        crossover = None
+        for size in SIZES:
+            columns = [list(range(1, size + 1))] * 3
+            by_rows = _time(partial(_by_rows, expression, columns), size)
+            by_columns = _time(partial(evaluate_columns, expression, *columns), size)
+            if crossover is None and by_columns < by_rows:
+                crossover = size
+            print("%-6s %8d %14.3f %14.3f %7.2fx"
+                  % (name, size, by_rows * 1e6, by_columns * 1e6, by_rows / by_columns))
+        print("%-6s faster on columns from %s rows\n" % (name, crossover or 'no number of'))
@@ -0,0 +1,33 @@
+""" Trivial benchmark to check that building an expression has a constant cost per node,
+in time and in memory, however large the tree gets, e.g. for the expressions generated
+by `functools.reduce(operator.add, variables)`.
+"""
+
+import functools
+import operator
+from time import perf_counter
+import tracemalloc
+
+from lambdax import x1, x2
+
+SIZES = (100, 1000, 10000, 100000)
+
+
+def _build(size):
+    return functools.reduce(operator.add, [x1, x2] * (size // 2))
+
+
+if __name__ == '__main__':
+    print("%8s %16s %16s" % ('nodes', 'time per node', 'memory per node'))
+    for size in SIZES:
+        begin = perf_counter()
+        _build(size)
+        duration = perf_counter() - begin
+
+        tracemalloc.start()
+        expression = _build(size)
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del expression
+
+        print("%8d %13.3f µs %14.1f B" % (size, duration / size * 1e6, memory / size))
@@ -0,0 +1,53 @@
+""" Trivial benchmark to roughly measure the speedup of `parallel_map` over the usual `map`
+for an expression heavy enough to be worth sending to other processes. The speedup
+is bounded by the number of cores (4 workers here), and needs enough items to amortize
+the start of the workers.
+It also measures the speedup of `thread_map` for an expression calling a function
+releasing the GIL (hashing large buffers), or any expression on a free-threaded build.
+"""
+
+import hashlib
+from time import time
+
+from lambdax import λ, x, parallel_map, thread_map, map_
+from lambdax.builtins_overridden import abs as λabs, list as λlist
+
+WORKERS = 4
+
+if __name__ == '__main__':
+    iterations = range(100000)
+    expression = λabs(-x ** 3 + 7) + (x % 13) ** 2 // 3 - λabs(x * 5 - 12) ** 2 % 1000
+
+    begin_sequential = time()
+    sequential_result = λlist(map_(expression, iterations))
+    end_sequential = time()
+
+    begin_parallel = time()
+    parallel_result = λlist(parallel_map(expression, iterations, workers=WORKERS,
+                                         chunksize=4096))
+    end_parallel = time()
+
+    assert sequential_result == parallel_result
+    sequential_duration = end_sequential - begin_sequential
+    parallel_duration = end_parallel - begin_parallel
+    print("Sequential map computed in: %.3fs" % sequential_duration)
+    print("Parallel map (%d workers) computed in: %.3fs (speedup x%.2f)"
+          % (WORKERS, parallel_duration, sequential_duration / parallel_duration))
+
+    buffers = [bytes([i % 256]) * 1000000 for i in range(200)]
+    expression = λ(hashlib.sha256)(x).hexdigest()
+
+    begin_sequential = time()
+    sequential_result = λlist(map_(expression, buffers))
+    end_sequential = time()
+
+    begin_threads = time()
+    threads_result = λlist(thread_map(expression, buffers, workers=WORKERS, chunksize=4))
+    end_threads = time()
+
+    assert sequential_result == threads_result
+    sequential_duration = end_sequential - begin_sequential
+    threads_duration = end_threads - begin_threads
+    print("Sequential map of sha256 computed in: %.3fs" % sequential_duration)
+    print("Thread map (%d workers) of sha256 computed in: %.3fs (speedup x%.2f)"
+          % (WORKERS, threads_duration, sequential_duration / threads_duration))
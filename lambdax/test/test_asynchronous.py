@@ -0,0 +1,164 @@
+""" Tests related to the β-reduction of λ-abstractions calling coroutine functions. """
+
+import asyncio
+
+from pytest import raises
+
+from lambdax import λ, x, x1, x2, and_, or_, if_, comp, chaining, acall, astream
+from lambdax.test import assert_value
+
+
+def _service(log, name, result=lambda v: v):
+    async def call(value):
+        log.append('start ' + name)
+        await asyncio.sleep(0.01)
+        log.append('end ' + name)
+        return result(value)
+
+    return λ(call)
+
+
+def _run(expression, *args):
+    return asyncio.run(acall(expression, *args))
+
+
+def _collect(stream):
+    async def collect():
+        return [value async for value in stream]
+
+    return asyncio.run(collect())
+
+
+class _InFlight:
+    """ Count the calls being awaited at the same time """
+
+    def __init__(self, delay=lambda v: 0.001):
+        self.current = self.maximum = 0
+        self._delay = delay
+
+    async def __call__(self, value):
+        self.current += 1
+        self.maximum = max(self.maximum, self.current)
+        await asyncio.sleep(self._delay(value))
+        self.current -= 1
+        return value
+
+
+def test_synchronous_expression():
+    assert_value(_run(x1 * 2 + x2, 3, 4), 10)
+    assert_value(_run(x1 - x2, (5, 2)), 3)
+    assert_value(_run(λ(len)(x) + 1, 'abc'), 4)
+
+
+def test_concurrent_operands():
+    log = []
+    fetch_a, fetch_b = _service(log, 'a', lambda v: v + 1), _service(log, 'b', lambda v: v * 2)
+    assert_value(_run(fetch_a(x) + fetch_b(x) * 10, 3), 64)
+    assert_value(log[:2], ['start a', 'start b'])
+
+    # the arguments of a call too, the call being awaited afterwards
+    log.clear()
+    fetch_c = _service(log, 'c', lambda v: v * 10)
+    assert_value(_run(fetch_c(fetch_a(x1) - fetch_b(x2)), 1, 2), -20)
+    assert_value(log[:2], ['start a', 'start b'])
+    assert_value(log[-2:], ['start c', 'end c'])
+
+
+def test_laziness():
+    log = []
+    fetch_a, fetch_b = _service(log, 'a'), _service(log, 'b')
+    assert_value(_run(if_(x > 0, fetch_a(x), fetch_b(x)), 1), 1)
+    assert_value(_run(and_(fetch_a(x), fetch_b(x + 1)), 0), 0)
+    assert_value(_run(or_(fetch_b(x), fetch_a(x + 1)), 5), 5)
+    assert_value(log, ['start a', 'end a'] * 2 + ['start b', 'end b'])
+    assert_value(_run(and_(fetch_a(x), fetch_b(x + 1)), 3), 4)
+
+
+def test_awaitable_methods_and_composition():
+    class Client:
+        async def get(self, key):
+            await asyncio.sleep(0)
+            return key.upper()
+
+    assert_value(_run(x1.get(x2) + '!', Client(), 'key'), 'KEY!')
+    fetch = _service([], 'a', lambda v: v * 3)
+    assert_value(_run(comp(fetch(x) + 1, fetch(x) - 1), 2), 16)
+
+
+def test_stream():
+    assert_value(_collect(astream(x * 2, range(5))), [0, 2, 4, 6, 8])
+    assert_value(_collect(astream(x1 - x2, [(3, 1), (5, 5)], concurrency=2)), [2, 0])
+
+    async def source():
+        for value in range(5):
+            await asyncio.sleep(0)
+            yield value
+
+    fetch = _service([], 'a', lambda v: v + 1)
+    assert_value(_collect(astream(fetch(x) * 10, source(), concurrency=3)),
+                 [10, 20, 30, 40, 50])
+
+
+def test_stream_bounded_concurrency():
+    in_flight = _InFlight()
+    result = _collect(astream(λ(in_flight)(x), range(20), concurrency=4))
+    assert_value(result, list(range(20)))
+    assert_value(in_flight.maximum, 4)
+
+    # backpressure: the source is not read far ahead of the results
+    read = []
+
+    async def source():
+        for value in range(100):
+            read.append(value)
+            yield value
+
+    async def first_results():
+        stream = astream(λ(_InFlight())(x), source(), concurrency=2)
+        values = [await stream.__anext__() for _ in range(3)]
+        await stream.aclose()
+        return values
+
+    assert_value(asyncio.run(first_results()), [0, 1, 2])
+    assert len(read) < 10
+
+
+def test_stream_order():
+    in_flight = _InFlight(lambda v: 0.005 * (10 - v))
+    expression = λ(in_flight)(x)
+    assert_value(_collect(astream(expression, range(10), concurrency=10)), list(range(10)))
+    unordered = _collect(astream(expression, range(10), concurrency=10, ordered=False))
+    assert_value(unordered, list(range(9, -1, -1)))
+
+
+def test_stream_pipeline():
+    log = []
+    first, second = _service(log, 'first'), _service(log, 'second')
+    expression = chaining(first(x) + 1, second(x) * 2)
+    assert_value(_collect(astream(expression, [1, 2])), [4, 6])
+    # the second item is in the first stage while the first item is in the second stage
+    assert log.index('start first') < log.index('start second') < log.index('end second')
+    assert log.index('start first', 1) < log.index('end second')
+
+
+def test_stream_errors():
+    with raises(ZeroDivisionError):
+        _collect(astream(1 / x, [2, 1, 0, 4], concurrency=2))
+
+    def source():
+        yield 1
+        raise KeyError('source')
+
+    with raises(KeyError):
+        _collect(astream(x, source()))
+
+
+def test_wrong_input():
+    with raises(TypeError):
+        _run(42)
+    with raises(TypeError):
+        _run(x1 + x2, 1)
+    with raises(TypeError):
+        astream(42, [])
+    with raises(ValueError):
+        astream(x, [], concurrency=0)
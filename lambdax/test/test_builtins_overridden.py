@@ -0,0 +1,38 @@
+""" Tests related to the dispatch of the overridden built-in functions. """
+
+import builtins
+
+from lambdax import λ, x, x1, x2, is_λ
+import lambdax.builtins_overridden as overridden
+from lambdax.test import assert_value
+
+
+def test_usual_values():
+    assert_value(overridden.dict(), {})
+    assert_value(overridden.len('abc'), 3)
+    assert_value(overridden.divmod(7, 2), (3, 1))
+    assert_value(overridden.max(3, 9, 4), 9)
+    assert_value(overridden.max(3, 9, 4, 12), 12)
+    assert_value(overridden.sorted([3, 1, 2], key=lambda v: -v), [3, 2, 1])
+    assert_value(overridden.int('11', base=2), 3)
+    assert overridden.isinstance(overridden, type(builtins))
+    assert overridden.len is not builtins.len
+    assert_value(overridden.len.__name__, 'len')
+
+
+def test_abstraction_in_any_position():
+    cases = [
+        (overridden.len(x), ('abc',), 3),
+        (overridden.divmod(x, 2), (7,), (3, 1)),
+        (overridden.divmod(7, x), (2,), (3, 1)),
+        (overridden.max(x, 9, 4), (3,), 9),
+        (overridden.max(3, x1, 4), (9,), 9),
+        (overridden.max(3, 9, x), (12,), 12),
+        (overridden.max(3, 9, 4, x), (12,), 12),
+        (overridden.sorted(x, key=λ(lambda v: -v)), ([3, 1, 2],), [3, 2, 1]),
+        (overridden.sorted([3, 1, 2], reverse=x), (True,), [3, 2, 1]),
+        (overridden.int(x1, base=x2), ('11', 2), 3),
+    ]
+    for expression, args, expected in cases:
+        assert is_λ(expression)
+        assert_value(expression(*args), expected)
@@ -0,0 +1,174 @@
+""" Tests related to the memoization of λ-abstractions. """
+
+from collections import Counter
+import gc
+
+from pytest import raises
+
+from lambdax import (λ, x, x1, x2, x3, x4, is_λ, if_, comp, chaining, memoize, cache_info,
+                     cache_clear, incremental)
+from lambdax.builtins_as_lambdas import next_λ
+from lambdax.test import assert_value, counted
+
+
+class _Weak:
+    """ Unhashable but weakly referenceable """
+    __hash__ = None
+
+
+def test_hits_and_misses():
+    f, calls = counted(lambda v: v * 2)
+    memoized = memoize(f(x1) + x2)
+    assert is_λ(memoized)
+
+    for a, b in ((1, 2), (1, 2), (3, 2), (1, 5)):
+        assert_value(memoized(a, b), a * 2 + b)
+    assert_value(calls, Counter({'(1,)': 2, '(3,)': 1}))
+    info = cache_info(memoized)
+    assert_value((info.hits, info.misses, info.evictions, info.currsize), (1, 3, 0, 3))
+
+
+def test_lru_eviction():
+    f, calls = counted(lambda v: -v)
+    memoized = memoize(f(x), maxsize=2)
+    for value in (1, 2, 1, 3, 1, 2):
+        assert_value(memoized(value), -value)
+    # 2 is evicted by 3, as 1 was used more recently
+    assert_value(calls, Counter({'(1,)': 1, '(2,)': 2, '(3,)': 1}))
+    assert_value(cache_info(memoized), (2, 4, 2, 0, 2, 2))
+
+    cache_clear(memoized)
+    assert_value(cache_info(memoized), (0, 0, 0, 0, 2, 0))
+    assert_value(memoize(x, maxsize=None)(4), 4)
+
+
+def test_typed():
+    memoized = memoize(x * 2)
+    assert_value(memoized(1), 2)
+    assert_value(repr(memoized(1.)), '2')
+
+    memoized = memoize(x * 2, typed=True)
+    assert_value(memoized(1), 2)
+    assert_value(repr(memoized(1.)), '2.0')
+    assert_value(cache_info(memoized).misses, 2)
+
+
+def test_unhashable_arguments():
+    memoized = memoize(λ(len)(x))
+    assert_value(memoized([1, 2]), 2)
+    assert_value(memoized([1, 2]), 2)
+    assert_value(cache_info(memoized)[:4], (0, 0, 0, 2))
+
+    f, calls = counted(lambda v: id(v))
+    memoized = memoize(f(x), unhashable='id')
+    weak, other = _Weak(), _Weak()
+    assert_value(memoized(weak), id(weak))
+    assert_value(memoized(weak), id(weak))
+    assert_value(memoized(other), id(other))
+    assert_value(len(calls), 2)
+    assert_value(cache_info(memoized).currsize, 2)
+    # the result is discarded with the argument
+    del weak
+    gc.collect()
+    assert_value(cache_info(memoized).currsize, 1)
+    # not weakly referenceable
+    assert_value(memoized([]) > 0, True)
+    assert_value(cache_info(memoized).bypasses, 1)
+
+
+def test_composition():
+    memoized = memoize(x1 * x2)
+    assert_value(comp(memoize(x * 2), x + 1)(3), 8)
+    assert_value(chaining(x + 1, memoize(x * 10))(2), 30)
+    assert_value((memoized + x3)(2, 3, 4), 10)
+
+
+def test_wrong_input():
+    with raises(TypeError):
+        memoize(42)
+    with raises(ValueError):
+        memoize(x, unhashable='hash')
+    with raises(ValueError):
+        memoize(x, maxsize=-1)
+    with raises(TypeError):
+        cache_info(x)
+    with raises(TypeError):
+        memoize(x1 + x2)(1)
+
+
+def test_incremental():
+    f, calls = counted(lambda *v: sum(v))
+    evaluator = incremental(f(x1, x2) * f(x2, x3) + f(x4) - f(x1, x2))
+    expression = lambda a, b, c, d: (a + b) * (b + c) + d - (a + b)  # noqa: E731
+    assert_value(evaluator.update(1, 2, 3, 4), expression(1, 2, 3, 4))
+    assert_value(calls, Counter({'(1, 2)': 1, '(2, 3)': 1, '(4,)': 1}))
+
+    calls.clear()
+    assert_value(evaluator.update(x4=10), expression(1, 2, 3, 10))
+    assert_value(calls, Counter({'(10,)': 1}))
+    calls.clear()
+    assert_value(evaluator.update(x1=5, x3=0), expression(5, 2, 0, 10))
+    assert_value(calls, Counter({'(5, 2)': 1, '(2, 0)': 1}))
+    calls.clear()
+    assert_value(evaluator.update(), expression(5, 2, 0, 10))
+    assert_value(evaluator.value, expression(5, 2, 0, 10))
+    assert_value(evaluator.update(5, 2), expression(5, 2, 0, 10))
+    assert_value(calls, Counter())
+
+
+def test_incremental_laziness():
+    f, calls = counted(lambda v: v * 2)
+    evaluator = incremental(if_(x1 > 0, f(x2), -x2))
+    assert_value(evaluator.update(-1, 3), -3)
+    assert_value(calls, Counter())
+    assert_value(evaluator.update(x1=1), 6)
+    assert_value(evaluator.update(x1=2), 6)
+    assert_value(calls, Counter({'(3,)': 1}))
+    assert_value(incremental(x).update(3), 3)
+
+    # the impure calls aren't merged
+    evaluator = incremental(next_λ(x1) * 10 + next_λ(x1))
+    assert_value(evaluator.update(iter([1, 2])), 12)
+    evaluator = incremental(x1.pop() * 10 + x1.pop())
+    assert_value(evaluator.update([1, 2]), 21)
+
+
+def test_incremental_invalidate():
+    f, calls = counted(sum)
+    evaluator = incremental(f(x1) * x2)
+    items = [1, 2]
+    assert_value(evaluator.update(items, 10), 30)
+    items.append(3)
+    # the same object: its value is considered unchanged
+    assert_value(evaluator.update(items), 30)
+    evaluator.invalidate('x1')
+    assert_value(evaluator.update(x2=2), 12)
+    assert_value(sum(calls.values()), 2)
+    evaluator.invalidate()
+    assert_value(evaluator.value, 12)
+    assert_value(sum(calls.values()), 3)
+    with raises(TypeError):
+        evaluator.invalidate('x3')
+    with raises(TypeError):
+        evaluator.invalidate('y')
+
+
+def test_incremental_errors():
+    with raises(TypeError):
+        incremental(42)
+    with raises(TypeError):
+        incremental(x2 + 1)
+    evaluator = incremental(10 // x1 + x2)
+    with raises(TypeError):
+        evaluator.update(1)
+    with raises(TypeError):
+        evaluator.value  # pylint: disable=pointless-statement
+    with raises(TypeError):
+        evaluator.update(1, 2, x1=1)
+    with raises(TypeError):
+        evaluator.update(x3=1)
+    with raises(TypeError):
+        evaluator.update(y=1)
+    with raises(ZeroDivisionError):
+        evaluator.update(0, 2)
+    assert_value(evaluator.update(x1=5), 4)
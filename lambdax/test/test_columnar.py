@@ -0,0 +1,92 @@
+""" Tests related to the evaluation of λ-abstractions on whole columns. """
+
+import array
+
+from pytest import raises
+
+from lambdax import λ, x, x1, x2, x3, and_, or_, if_, comp, memoize, evaluate_columns
+from lambdax.builtins_as_lambdas import dict_λ, round_λ
+from lambdax.test import assert_value
+
+
+def _by_rows(expression, *columns):
+    if len(columns) == 1:
+        return list(map(expression, columns[0]))
+    return list(map(expression, zip(*columns)))
+
+
+def test_same_as_rows():
+    col1 = [1, -2, 3.5, 0, 7]
+    col2 = array.array('d', [0.5, 2., -1., 4., 1.])
+    for expression in (x1 * 2 + x2, -x1 ** 2 % 3 + x2, round_λ(x1 / x2, 2), (x1 > x2) + 1,
+                       λ(divmod)(x1, x2), x2 - 3 * x1, x1.real + x2, comp(x * 10, x1 + x2)):
+        assert_value(evaluate_columns(expression, col1, col2), _by_rows(expression, col1, col2))
+
+
+def test_column_types():
+    expression = x * 3 - 1
+    expected = [2, 5, 8]
+    assert_value(evaluate_columns(expression, [1, 2, 3]), expected)
+    assert_value(evaluate_columns(expression, array.array('i', [1, 2, 3])), expected)
+    assert_value(evaluate_columns(expression, memoryview(bytes([1, 2, 3]))), expected)
+    assert_value(evaluate_columns(expression, range(1, 4)), expected)
+    assert_value(evaluate_columns(x, [1, 2, 3]), [1, 2, 3])
+    assert_value(evaluate_columns(expression, []), [])
+
+
+def test_typecode():
+    results = evaluate_columns(x1 * x2, [1., 2.], [3., 4.], typecode='d')
+    assert isinstance(results, array.array)
+    assert_value(results.tolist(), [3., 8.])
+    with raises(TypeError):
+        evaluate_columns(x + .5, [1], typecode='i')
+
+
+def test_lazy_operators():
+    column = [0, 2, -1, 0, 4]
+    expression = if_(x != 0, 1 / x, and_(x, 1 / x))
+    assert_value(evaluate_columns(expression, column), _by_rows(expression, column))
+    for expression in (and_(x, 8 // x), or_(x == 0, 8 // x), or_(x, 1) + and_(x > 0, x * 2),
+                       if_(x > 0, if_(x > 3, x, -x), or_(x, 'zero'))):
+        assert_value(evaluate_columns(expression, column), _by_rows(expression, column))
+
+    calls = []
+    expression = if_(x1 > 0, λ(calls.append)(x2), x2)
+    evaluate_columns(expression, [1, -1, 2], ['a', 'b', 'c'])
+    assert_value(calls, ['a', 'c'])
+
+
+def test_shared_nodes():
+    shared = x1 * x2
+    expression = shared + shared * x3
+    columns = [1, 2, 3], [4, 5, 6], [7, 8, 9]
+    assert_value(evaluate_columns(expression, *columns), _by_rows(expression, *columns))
+
+
+def test_named_arguments():
+    expression = dict_λ(x2, r=x1.real, i=x1.imag)
+    col1, col2 = [1 + 2j, 3j], [{'a': 1}, {}]
+    assert_value(evaluate_columns(expression, col1, col2), _by_rows(expression, col1, col2))
+
+
+def test_other_abstractions():
+    expression = memoize(x1 + x2) * 2
+    columns = [1, 2, 3], [4, 5, 6]
+    assert_value(evaluate_columns(expression, *columns), _by_rows(expression, *columns))
+    for expression in (comp(abs, x1 - x2), comp(memoize(x + 1), x1 * x2)):
+        assert_value(evaluate_columns(expression, *columns), _by_rows(expression, *columns))
+
+
+def test_errors():
+    with raises(ZeroDivisionError):
+        evaluate_columns(1 / x, [1, 0])
+    with raises(TypeError):
+        evaluate_columns(x1 + x2, [1, 2])
+    with raises(TypeError):
+        evaluate_columns(x + 1, [1, 2], [3, 4])
+    with raises(ValueError):
+        evaluate_columns(x1 + x2, [1, 2], [3])
+    with raises(TypeError):
+        evaluate_columns(lambda y: y, [1])
+    with raises(TypeError):
+        evaluate_columns(x + 1, 3)
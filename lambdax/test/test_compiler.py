@@ -0,0 +1,132 @@
+""" Tests related to the compilation of λ-abstractions into native functions. """
+
+from functools import reduce
+import operator
+
+from pytest import raises
+
+from lambdax import λ, x, x1, x2, x3, comp, chaining, and_, or_, if_, compile_, contains, not_
+from lambdax.builtins_as_lambdas import dict_λ, len_λ
+from lambdax.builtins_overridden import abs as λabs
+from lambdax.test import assert_value
+
+
+def test_compiled_is_not_abstraction():
+    compiled = compile_(x + 1)
+    assert callable(compiled)
+    assert_value(compiled(41), 42)
+
+
+def test_same_result_as_reduction():
+    expressions = [
+        λabs(-x ** 3 + 7),
+        (x * 2 + 3) % 8 // 2,
+        ~x << 2 | 5 & x ^ 3,
+        x / 4 - +x,
+        (x > 3) == (x <= 10),
+        2 ** x - 3 * x,
+        not_(x != 4),
+        x.real + x.imag,
+        x.bit_length(),
+        λ(getattr)(x, 'numerator'),
+        len_λ(λ(str)(x)[1:]),
+        contains([1, 2, 3], x),
+    ]
+    for expression in expressions:
+        compiled = compile_(expression)
+        for value in range(-5, 15):
+            assert_value(compiled(value), expression(value))
+
+
+def test_many_variables():
+    expression = x1 ** 3 + x2 ** 2 + x3
+    compiled = compile_(expression)
+    assert_value(compiled(1, 2, 3), expression(1, 2, 3))
+    with raises(TypeError):
+        compiled((1, 2, 3))
+
+
+def test_calls():
+    def function(a, exp=1):
+        return a ** exp - 1
+
+    compiled = compile_((λ(function)(x, exp=x) - 5) * 2)
+    assert_value(compiled(3), ((3 ** 3 - 1) - 5) * 2)
+
+    compiled = compile_(dict_λ(r=x.real, i=x.imag, **{'not an identifier': x, 'if': 1}))
+    assert_value(compiled(2 + 3j), {'r': 2, 'i': 3, 'not an identifier': 2 + 3j, 'if': 1})
+
+    compiled = compile_(x1.join(x2))
+    assert_value(compiled('_', ['O', 'o']), 'O_o')
+
+    compiled = compile_(λ(int)())
+    assert_value(compiled(), 0)
+
+
+def test_laziness():
+    to_fill = []
+    lazy_or = compile_(or_(x, λ(to_fill.append)('or')))
+    lazy_and = compile_(and_(x, λ(to_fill.append)('and')))
+    lazy_if = compile_(if_(x, λ(to_fill.append)('then'), λ(to_fill.append)('else')))
+
+    assert_value(lazy_or(4), 4)
+    assert_value(lazy_and(0), 0)
+    assert_value(to_fill, [])
+
+    assert lazy_or(0) is None
+    assert lazy_and(1) is None
+    assert lazy_if(1) is None
+    assert lazy_if([]) is None
+    assert_value(to_fill, ['or', 'and', 'then', 'else'])
+
+
+def test_composition():
+    compiled = compile_(comp(x * 2, x + 1))
+    assert_value(compiled(3), 8)
+
+    compiled = compile_(chaining(x1 * 3 + x2 * 7, x * 2))
+    assert_value(compiled(2, 4), 68)
+
+    # the result of `f` is unpacked for `g`, like with a usual reduction
+    compiled = compile_(comp(x1 + x2, x * 2))
+    assert_value(compiled((21,)), 42)
+
+
+def test_deep_expressions():
+    chain = reduce(operator.add, [x1, x2] * 2000)
+    assert_value(compile_(chain)(1, 2), 6000)
+
+    # a deep expression that can't be evaluated beforehand
+    lazy_chain = if_(x1, reduce(operator.add, [x1, x2] * 2000), None)
+    compiled = compile_(lazy_chain)
+    assert compiled(0, 1) is None
+    assert_value(compiled(1, 2), 6000)
+
+    # deep sub-expressions that are not the first operands, each compiled once
+    deep, expected = x1, 1
+    for i in range(3000):
+        deep, expected = (x2 - deep, 2 - expected) if i % 3 else (deep + x2, expected + 2)
+    assert_value(compile_(deep)(1, 2), expected)
+
+
+def test_unhashable_constants():
+    constant = [1, 2]
+    compiled = compile_(x + constant)
+    assert_value(compiled([0]), [0, 1, 2])
+    constant.append(3)
+    assert_value(compiled([0]), [0, 1, 2, 3])
+
+
+def test_wrong_expressions():
+    with raises(TypeError):
+        compile_(lambda y: y)
+    with raises(TypeError) as exc:
+        compile_(x2 + x3)
+    assert "Missing x1" in str(exc.value)
+
+
+def test_meaningful_traceback():
+    compiled = compile_(x + 1 / x)
+    with raises(ZeroDivisionError) as exc:
+        compiled(0)
+    assert "return" in str(exc.traceback[-1])
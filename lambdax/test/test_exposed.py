@@ -16,14 +16,16 @@ def _get_exposed(tested_module):
 
 
 def test_no_builtin_exposed():
-    for obj in chain(vars(lambdax).values(), vars(lambdax.builtins_overridden).values()):
+    exposed = (getattr(lambdax, name) for name in lambdax.__all__)
+    for obj in chain(exposed, vars(lambdax.builtins_overridden).values()):
         assert not isbuiltin(obj)
 
 
 def test_base_exposed():
     variables = {'x'} | {'x%d' % i for i in range(1, 10)}
     variables |= {v.upper() for v in variables}
-    special_functions = {'λ', 'is_λ', 'comp', 'circle', 'chaining', 'and_', 'or_', 'if_'}
+    special_functions = {'λ', 'is_λ', 'comp', 'circle', 'chaining', 'and_', 'or_', 'if_',
+                         'map_', 'starmap'}
 
     to_expose = variables | special_functions
     exposed = _get_exposed(lambdax.lambda_calculus)
@@ -44,7 +46,7 @@ def test_overridden_builtins_exposed():
                      if name[0].upper() != name[0]}
 
     irrelevant_builtins = {
-        'input', 'help', 'open',
+        'input', 'help', 'open', 'breakpoint',
         'copyright', 'license', 'credits',
         'compile', 'eval', 'exec', 'execfile', 'runfile',
         'classmethod', 'staticmethod', 'property',
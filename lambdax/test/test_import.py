@@ -0,0 +1,71 @@
+""" Check that importing `lambdax` stays cheap: its submodules are only imported
+when their members are accessed.
+"""
+import os
+import subprocess
+import sys
+
+from pytest import raises
+
+import lambdax
+import setup
+
+
+def _imported_modules(statement):
+    """ Modules imported by `statement` in a new interpreter, according to `-X importtime`,
+    with their cumulative import time in microseconds and whether they were imported
+    by another module.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            cwd=os.path.dirname(os.path.dirname(lambdax.__file__)),
+                            stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line.split('|')
+            if cumulative.strip().isdigit():
+                modules[name.strip()] = int(cumulative), name.startswith('  ')
+    return modules
+
+
+def test_import_is_lazy():
+    modules = _imported_modules('import lambdax')
+    assert 'lambdax' in modules
+    assert not [name for name in modules if name.startswith('lambdax.')]
+    assert 'setup' not in modules
+
+
+def test_import_only_needed_submodules():
+    modules = _imported_modules('from lambdax import x, λ')
+    assert 'lambdax.lambda_calculus' in modules
+    assert 'lambdax.operators' not in modules
+    assert 'lambdax.builtins_as_lambdas' not in modules
+
+    modules = _imported_modules('from lambdax import pipeline')
+    assert 'lambdax.fusion' in modules
+    assert 'lambdax.builtins_as_lambdas' not in modules
+
+
+def test_import_time():
+    lazy, _ = _imported_modules('import lambdax')['lambdax']
+    submodules = sum(cumulative for name, (cumulative, nested)
+                     in _imported_modules('from lambdax import *').items()
+                     if name.startswith('lambdax.') and not nested)
+    assert lazy < submodules
+
+
+def test_lazy_members():
+    namespace = {}
+    exec('from lambdax import *', namespace)  # pylint: disable=exec-used
+    assert namespace['x'] is lambdax.x
+    assert namespace['len_λ'] is lambdax.builtins_as_lambdas.len_λ
+    assert namespace['add'] is lambdax.operators.add
+    assert namespace['pipeline'] is lambdax.fusion.pipeline
+    assert 'lambda_calculus' not in namespace
+    assert set(lambdax.__all__) <= set(dir(lambdax))
+
+    with raises(AttributeError):
+        getattr(lambdax, 'unknown')
+    with raises(AttributeError):
+        getattr(lambdax, 'attrgetter')  # a class of `operator`, not exposed
+    assert lambdax.__version__ == setup.VERSION
@@ -1,14 +1,19 @@
 """ For now, all tests related to `lambdax`. It'll be split later. """
 
 from collections import OrderedDict
-from functools import partial
+from functools import partial, reduce
+import operator
 import random
 
 from pytest import raises
 
 import lambdax
-from lambdax import λ, X, x1, x2, x3, x4, x5, is_λ, comp, chaining, and_, or_, if_
+from lambdax import (
+    λ, X, x, x1, x2, x3, x4, x5, is_λ, comp, chaining, and_, or_, if_, map_, starmap
+)
+from lambdax.compiler import compile_
 from lambdax.test import assert_value
+from lambdax.tree import walk
 
 
 def test_still_functional_builtins():
@@ -17,8 +22,8 @@ def test_still_functional_builtins():
 
 
 def test_provided_magic_variables():
-    magic_variables = [(name, value)
-                       for name, value in vars(lambdax).items()
+    magic_variables = [(name, getattr(lambdax, name))
+                       for name in dir(lambdax)
                        if name[0].lower() == 'x' and (len(name) == 1 or name[-1].isdigit())]
     assert len(magic_variables) == 20
     assert all(value._λ_index + 1 == int(name[1:] or 1)  # pylint: disable=protected-access
@@ -507,30 +512,27 @@ def test_reduction_too_many_args():
     assert is_λ(other(1, 2, 3, foo=42))
 
 
-def test_reduction_fast_path():
-    # assert that two calls to reduce an abstraction don't do twice the same checks
+def test_reduction_stateless():
+    # a reduction doesn't change how the following calls are interpreted
     my_lambda = x1 + x2
     other_lambda = my_lambda + 42
     assert is_λ(my_lambda)
     assert is_λ(other_lambda)
 
-    my_lambda(1, b=2)
-    my_lambda(c=4)
-    my_lambda(1, 2)  # this is a reduction, following calls will not call the same prototype
-    with raises(TypeError):
-        my_lambda(1, b=2)
-    with raises(TypeError):
-        my_lambda(c=4)
+    for _ in range(2):
+        assert is_λ(my_lambda(1, b=2))
+        assert is_λ(my_lambda(c=4))
+        assert is_λ(my_lambda(x1, 2))
+        assert_value(my_lambda(1, 2), 3)
 
     part = partial(my_lambda, 42)
     assert_value(part(3), 45)
-    with raises(TypeError):
-        part(4, a=1)
-    with raises(TypeError):
-        part(a=1)
+    assert is_λ(part(4, a=1))
+    assert is_λ(part(a=1))
 
     assert_value(my_lambda(40, 10), 50)
     assert_value(part(5), 47)
+    assert_value(other_lambda(1, 2), 45)
 
 
 def test_identity_not_optimized():
@@ -609,3 +611,69 @@ def test_degenerate_expand():
         plus3([3])
 
     assert is_λ(λ(42)([]))
+
+
+def test_map():
+    mapped = map_(x * 2 + 1, range(4))
+    assert not is_λ(mapped)
+    assert_value(list(mapped), [1, 3, 5, 7])
+    assert_value(list(map_(x1 << x2, ((i, 2) for i in range(5)))), [0, 4, 8, 12, 16])
+    assert_value(list(map_(x1 + x2, [OrderedDict([("abc", 1), ("def", 2)])])), ["abcdef"])
+
+    # the items are reduced lazily
+    consumed = []
+    mapped = map_(λ(consumed.append)(x), range(3))
+    assert_value(consumed, [])
+    next(mapped)
+    assert_value(consumed, [0])
+
+    # the arity is checked at once, and for each pack of arguments
+    with raises(TypeError):
+        map_(x2 + x3, [(1, 2)])
+    with raises(TypeError):
+        map_(λ(int)(), [])
+    with raises(TypeError):
+        map_(42, [])
+    with raises(TypeError):
+        list(map_(x1 + x2, [(1, 2), (1, 2, 3)]))
+    with raises(TypeError):
+        list(map_(x1 + x2, [1]))
+
+
+def test_starmap():
+    assert_value(list(starmap(x1 * x2, [(1, 2), (3, 4)])), [2, 12])
+    assert_value(list(starmap(-x, [(1,), [2]])), [-1, -2])
+    with raises(TypeError):
+        list(starmap(x1 * x2, [(1, 2, 3)]))
+    with raises(TypeError):
+        list(starmap(-x, [3]))
+
+
+def test_packed_arguments_without_assert():
+    # the packed arguments are checked even when assertions are disabled
+    with raises(TypeError):
+        (x1 + x2)((1, 2, 3))
+    with raises(TypeError):
+        (x1 + x2)(3)
+
+
+def test_compact_nodes():
+    # pylint: disable=protected-access
+    expression = (x1 + 1) * x2 - and_(x2, abs(x1))
+    for node in walk(expression):
+        assert not type(node).__dictoffset__
+        with raises(AttributeError):
+            node.attribute = 42
+        with raises(AttributeError):
+            node._λ_origin = x2
+    # the sets of variables are shared by the nodes holding the same variables
+    assert expression._λ_var_indices is (x2 * x1)._λ_var_indices
+    assert (x1 + 1)._λ_var_indices is x1._λ_var_indices
+    assert λ(1)._λ_var_indices is λ('a')._λ_var_indices
+    assert (x1 + 1)._λ_abstract_kwargs is (x2 - 3)._λ_abstract_kwargs
+
+
+def test_large_construction():
+    expression = reduce(operator.add, [x1, x2] * 5000)
+    assert_value(compile_(expression)(1, 2), 15000)
+    assert_value(compile_(reduce(operator.add, [x1, λ(2)] * 5000))(1), 15000)
@@ -0,0 +1,136 @@
+""" Tests related to the β-reduction of λ-abstractions in several processes or threads. """
+
+import hashlib
+import itertools
+import math
+import threading
+
+from pytest import raises
+
+from lambdax import (λ, x, x1, x2, and_, if_, parallel_map, thread_map, map_, memoize,
+                     cache_info, specialize, specialization_info, share)
+from lambdax.test import assert_value
+
+
+def _fails(value):
+    if value == 42:
+        raise ArithmeticError(value)
+    return value
+
+
+def test_ordered():
+    expression = -x ** 3 + λ(math.sqrt)(x)
+    items = range(1000)
+    assert_value(list(parallel_map(expression, items, workers=2, chunksize=64)),
+                 list(map_(expression, items)))
+    assert_value(list(parallel_map(expression, [], workers=2)), [])
+
+
+def test_unordered():
+    result = parallel_map(x * 2, range(500), workers=3, chunksize=7, ordered=False)
+    assert_value(sorted(result), list(range(0, 1000, 2)))
+
+
+def test_packed_arguments():
+    items = [(a, a + 1) for a in range(100)]
+    assert_value(list(parallel_map(x1 * x2, items, workers=2, chunksize=8)),
+                 [a * (a + 1) for a in range(100)])
+
+
+def test_streamed_input():
+    results = parallel_map(x + 1, itertools.count(), workers=2, chunksize=10)
+    assert_value(list(itertools.islice(results, 25)), list(range(1, 26)))
+    results.close()
+
+
+def test_errors():
+    with raises(ArithmeticError):
+        list(parallel_map(λ(_fails)(x), range(100), workers=2, chunksize=10))
+    with raises(TypeError):
+        parallel_map(42, range(3))
+    with raises(TypeError):
+        list(parallel_map(x1 + x2, [(1, 2, 3)], workers=1))
+    with raises(ValueError):
+        parallel_map(x, range(3), workers=0)
+    with raises(ValueError):
+        parallel_map(x, range(3), chunksize=0)
+
+
+def test_thread_map():
+    expression = λ(hashlib.sha256)(x).hexdigest() + '!'
+    items = [b'%d' % i for i in range(300)]
+    assert_value(list(thread_map(expression, items, workers=4, chunksize=16)),
+                 list(map_(expression, items)))
+    result = thread_map(x1 * x2, [(a, a + 1) for a in range(100)], workers=3, ordered=False)
+    assert_value(sorted(result), [a * (a + 1) for a in range(100)])
+    results = thread_map(x + 1, itertools.count(), workers=2, chunksize=10)
+    assert_value(list(itertools.islice(results, 25)), list(range(1, 26)))
+    results.close()
+
+
+def test_thread_map_errors():
+    with raises(ArithmeticError):
+        list(thread_map(λ(_fails)(x), range(100), workers=2, chunksize=10))
+    with raises(TypeError):
+        thread_map(42, range(3))
+    with raises(ValueError):
+        thread_map(x, range(3), workers=0)
+    with raises(ValueError):
+        thread_map(x, range(3), chunksize=0)
+
+
+def _run_threads(function, nb_threads=8):
+    """ Run `function(index)` in several threads starting at once, and return the results """
+    barrier = threading.Barrier(nb_threads)
+    results = [None] * nb_threads
+
+    def run(index):
+        barrier.wait()
+        try:
+            results[index] = function(index)
+        except BaseException as error:  # pylint: disable=broad-except
+            results[index] = error
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(nb_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_threads_stress():
+    def reference(a, b):
+        return ((a * 3 - b) % 7 if a > b else -a) + (a and b * 2)
+
+    expression = if_(x1 > x2, (x1 * 3 - x2) % 7, -x1) + and_(x1, x2 * 2)
+    items = [(a % 23, (a * 7) % 19) for a in range(400)]
+    expected = [reference(a, b) for a, b in items]
+    memoized = memoize(expression, maxsize=16)
+    specialized = specialize(expression, maxsize=1)
+    variants = (expression, memoized, specialized, share(expression))
+
+    def reduce_all(index):
+        # each thread starts on another variant, with ints or floats
+        results = []
+        for variant in variants[index % 4:] + variants[:index % 4]:
+            convert = float if index % 2 else int
+            results.append([variant(convert(a), convert(b)) for a, b in items])
+            # the calls with abstractions are still declarations
+            assert not isinstance(variant(x1, 2), (int, float))
+        return results
+
+    for results in _run_threads(reduce_all):
+        assert_value(results, [expected] * len(variants))
+    info = cache_info(memoized)
+    assert_value(info.hits + info.misses, 8 * len(items))
+    assert info.currsize <= 16
+    info = specialization_info(specialized)
+    assert_value(info.hits + info.misses, 8 * len(items))
+    assert_value(info.currsize, 1)
+
+    # the first reductions of a new expression happen at once too
+    for _ in range(20):
+        fresh = x1 * x2 + 1
+        assert_value(_run_threads(lambda i, fresh=fresh: fresh(i, 2)),
+                     [2 * i + 1 for i in range(8)])
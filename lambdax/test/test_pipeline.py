@@ -0,0 +1,56 @@
+""" Tests related to the fused pipelines of λ-abstractions. """
+
+import itertools
+
+from pytest import raises
+
+from lambdax import x, x1, x2, and_, if_, chaining, pipeline
+from lambdax.test import assert_value
+
+
+def test_stages():
+    rows = range(20)
+    result = pipeline(rows).map(x * 3).filter(x % 2 == 0).map(x + 1).filter(x > 10)
+    assert_value(result.to_list(), [13, 19, 25, 31, 37, 43, 49, 55])
+    # the pipeline can be iterated again if the rows can
+    assert_value(list(result), result.to_list())
+    assert_value(pipeline(rows).to_list(), list(rows))
+
+
+def test_several_variables():
+    rows = [(1, 2), (3, 4), (5, 6)]
+    result = pipeline(rows).filter(x1 + 1 < x2 * x1).map(x2 * 10 + x1).map(x - 1)
+    assert_value(result.to_list(), [42, 64])
+
+
+def test_lazy_operators_and_composition():
+    result = (pipeline([0, 1, 2, 3])
+              .map(and_(x, 12 // x))
+              .map(if_(x > 5, x - 5, -x))
+              .map(chaining(x * 2, x + 1)))
+    assert_value(result.to_list(), [1, 15, 3, -7])
+
+
+def test_terminal_operations():
+    read = []
+
+    def rows():
+        for value in itertools.count():
+            read.append(value)
+            yield value
+
+    assert_value(pipeline(rows()).map(x ** 2).filter(x > 50).first(), 64)
+    assert_value(len(read), 9)
+    assert_value(pipeline([]).first('none'), 'none')
+    assert_value(pipeline(range(10)).filter(x % 3).count(), 6)
+    stream = iter(pipeline(rows()).map(x - 1))
+    assert_value(list(itertools.islice(stream, 3)), [-1, 0, 1])
+
+
+def test_errors():
+    with raises(ZeroDivisionError):
+        pipeline([1, 0]).map(1 / x).to_list()
+    with raises(TypeError):
+        pipeline([1]).map(42)
+    with raises(TypeError):
+        pipeline([1]).filter(x2 + 1)
@@ -0,0 +1,123 @@
+""" Tests related to the profiling of λ-abstractions node by node. """
+
+import io
+import math
+import sys
+
+from pytest import raises
+
+from lambdax import (λ, x, x1, x2, and_, if_, comp, profile, profile_stats, print_profile,
+                     explain)
+from lambdax.test import assert_value
+
+
+def _slow(value, exp=1):
+    return sum(range(1000)) * 0 + value ** exp
+
+
+def test_equivalent_expression():
+    expression = if_(x1 > 0, λ(_slow)(x1, exp=x2), -x1.real) + λ(math.sqrt)(abs(x1))
+    profiled = profile(expression)
+    for args in ((4, 2), (-4, 3), (9, 1)):
+        assert_value(profiled(*args), expression(*args))
+    # the original expression is untouched
+    assert type(expression._λ_origin).__name__ == 'if_'  # pylint: disable=protected-access
+
+
+def test_stats():
+    profiled = profile(if_(x > 0, λ(_slow)(x, exp=x) + 1, x.real))
+    for value in (1, 2, -1):
+        profiled(value)
+    stats = {node.source: node for node in profile_stats(profiled)}
+    assert_value(list(stats), [
+        'if_((x1 > 0), (λ(_slow)(x1, exp=x1) + 1), x1.real)',
+        '(x1 > 0)', 'x1', '0',
+        '(λ(_slow)(x1, exp=x1) + 1)', 'λ(_slow)(x1, exp=x1)', 'λ(_slow)', '1',
+        'x1.real', "'real'",
+    ])
+    assert_value([stats[s].depth for s in ('(x1 > 0)', 'λ(_slow)(x1, exp=x1)')], [1, 2])
+    assert_value(stats['(x1 > 0)'].calls, 3)
+    assert_value(stats['x1'].calls, 3 + 2 * 2 + 1)
+    assert_value(stats['λ(_slow)(x1, exp=x1)'].calls, 2)
+    assert_value(stats['x1.real'].calls, 1)
+    for node in stats.values():
+        assert 0 <= node.own <= node.cumulative
+    root = stats['if_((x1 > 0), (λ(_slow)(x1, exp=x1) + 1), x1.real)']
+    slowest = profile_stats(profiled, sort='own')[0]
+    assert_value(slowest.source, 'λ(_slow)(x1, exp=x1)')
+    assert slowest.cumulative <= root.cumulative
+
+
+def test_errors():
+    profiled = profile(and_(x1, 1 / x2) + 1)
+    for args in ((1, 1), (0, 0), (1, 0)):
+        try:
+            profiled(*args)
+        except ZeroDivisionError:
+            pass
+    errors = {node.source: node.errors for node in profile_stats(profiled, sort='errors')}
+    assert_value(errors['(and_(x1, (1 / x2)) + 1)'], 1)
+    assert_value(errors['(1 / x2)'], 1)
+    assert_value(errors['x2'], 0)
+
+
+def test_report():
+    profiled = profile(comp(x * 2, x1[x2] - 3) ** 2)
+    assert_value(profiled([1, 5], 1), 16)
+    report = io.StringIO()
+    print_profile(profiled, file=report)
+    lines = report.getvalue().splitlines()
+    assert_value(len(lines), 1 + 8)
+    assert lines[1].endswith('  (comp((x1 * 2), (x1[x2] - 3)) ** 2)')
+    assert lines[3].endswith('      (x1[x2] - 3)')
+
+    report = io.StringIO()
+    print_profile(profiled, sort='cumulative', limit=2, file=report)
+    assert_value(len(report.getvalue().splitlines()), 3)
+
+
+def test_wrong_input():
+    with raises(TypeError):
+        profile(42)
+    with raises(TypeError):
+        profile_stats(x + 1)
+    with raises(ValueError):
+        profile_stats(profile(x + 1), sort='name')
+
+
+def test_explain():
+    shared = x1 * x2 + 1
+    plan = explain(λ(math.sqrt)(shared) + (x1 * x2 + 1) * λ(math.pi * 2) + λ(abs)(-3) + shared)
+    assert_value(plan.nodes, 25)
+    assert_value(plan.distinct_nodes, 18)
+    assert_value(plan.depth, 7)
+    assert not plan.too_deep
+    assert_value(plan.calls, 2)
+    assert_value(plan.constant_subtrees, ('λ(abs)(-3)',))
+    assert_value(plan.duplicates, (('((x1 * x2) + 1)', 3), ('(x1 * x2)', 3)))
+    variables = dict(plan.variables)
+    assert_value(variables['((x1 * x2) + 1)'], ('x1', 'x2'))
+    assert_value(variables['x2'], ('x2',))
+    assert_value(variables['λ(abs)(-3)'], ())
+    assert plan.cost > 0
+
+
+def test_explain_deep_expression():
+    expression = x
+    for _ in range(sys.getrecursionlimit()):
+        expression = expression + 1
+    plan = explain(expression, width=10)
+    assert_value(plan.depth, sys.getrecursionlimit() + 1)
+    assert plan.too_deep
+    assert_value(plan.duplicates, ())
+    assert all(len(source) <= 10 for source, _ in plan.variables)
+    assert not explain(x + 1).too_deep
+    assert explain(expression).cost > 100 * explain(x + 1).cost
+
+    plan = explain(if_(x > 0, x, -x))
+    assert_value((plan.nodes, plan.depth, plan.calls, plan.constant_subtrees), (7, 3, 0, ()))
+
+
+def test_explain_wrong_input():
+    with raises(TypeError):
+        explain(42)
@@ -0,0 +1,291 @@
+""" Tests related to the rewriting of λ-abstractions. """
+
+import math
+import operator
+import time
+from unittest.mock import patch
+
+from pytest import raises
+
+from lambdax import (λ, x, x1, x2, x3, x4, is_λ, and_, or_, if_, not_, fold, impure, pure,
+                     compile_, simplify, rewrite_rule, bind, dumps, loads, profile, profile_stats)
+from lambdax.builtins_as_lambdas import next_λ, print_λ, sorted_λ
+from lambdax.lambda_calculus import _ConstantAbstraction, _LambdaAbstraction
+from lambdax import rewriting as rewrite
+from lambdax.test import assert_value, counted
+from lambdax.tree import walk
+
+
+def _constants(expression):
+    return [node._λ_constant for node in walk(expression)  # pylint: disable=protected-access
+            if isinstance(node, _ConstantAbstraction)]
+
+
+def test_fold_constant_subexpressions():
+    sqrt, calls = counted(math.sqrt, pure=True)
+    expression = sqrt(λ(16)) * x + λ(pow)(2, 3)
+    folded = fold(expression)
+    assert is_λ(folded)
+    assert_value(sum(calls.values()), 1)
+    assert 4 in _constants(folded) and 8 in _constants(folded)
+
+    assert_value(folded(2), 16)
+    assert_value(folded(3), 20)
+    assert_value(sum(calls.values()), 1)
+
+    # the original expression is unchanged
+    assert_value(expression(2), 16)
+    assert_value(sum(calls.values()), 2)
+
+
+def test_fold_keeps_variables():
+    expression = (x1 + 3 * 2) * x2
+    folded = fold(expression)
+    assert_value(folded(1, 2), 14)
+    assert_value(fold(x)(3), 3)
+
+
+def test_fold_not_the_whole_expression():
+    # a constant is not reduced by a call, so the expression must stay a call
+    called = fold(λ(pow)(3, 2))
+    assert is_λ(called)
+    assert_value(called(), 9)
+
+
+def test_fold_impure():
+    with patch('sys.stdout') as out:
+        folded = fold(and_(print_λ('hello'), x))
+        assert not out.write.called
+        folded(1)
+        folded(2)
+    assert out.write.call_count == 4  # "hello" and "\n" twice
+
+    iterator = iter(range(10))
+    folded = fold(next_λ(λ(iterator)) + x)
+    assert_value([folded(0), folded(0)], [0, 1])
+
+    @impure
+    def side_effect(value):
+        calls.append(value)
+        return value
+
+    calls = []
+    folded = fold(λ(side_effect)(1) + x)
+    assert_value(calls, [])
+    assert_value(folded(1), 2)
+    assert_value(calls, [1])
+
+
+def test_fold_mutable_values():
+    # sharing a list between all reductions would be wrong here
+    folded = fold(if_(x, sorted_λ([3, 1]), None))
+    assert_value(folded(True), [1, 3])
+    assert folded(True) is not folded(True)
+
+    # the same for methods of mutable constants
+    constant = []
+    folded = fold(and_(λ(constant).append(1), x))
+    folded(0)
+    folded(0)
+    assert_value(constant, [1, 1])
+
+
+class _Accumulator:
+    """ Hashable, but mutable """
+
+    def __init__(self):
+        self.total = 0
+
+    def add(self, value):
+        self.total += value
+        return self.total
+
+
+def test_fold_only_pure_and_immutable():
+    # a new accumulator at each reduction
+    folded = fold(λ(_Accumulator)().add(x))
+    assert_value([folded(1), folded(1)], [1, 1])
+    # the functions that aren't known to be pure are called at each reduction
+    folded = fold(λ(time.time)() * 0 + x)
+    assert time.time in _constants(folded)
+    # the tuples of immutable values are folded
+    assert (3, 1) in _constants(fold(λ(divmod)(7, 2) + x))
+    # not when they hold mutable values
+    assert tuple in _constants(fold(λ(tuple)(['a', ['b']]) + x))
+
+    twice = pure(lambda value: value * 2)
+    assert 6 in _constants(fold(λ(twice)(3) + x))
+
+
+def test_fold_errors_at_reduction():
+    folded = fold(λ(math.sqrt)(-1) + x)
+    with raises(ValueError):
+        folded(1)
+
+
+def test_compile_folded():
+    sqrt, calls = counted(math.sqrt, pure=True)
+    compiled = compile_(sqrt(λ(16)) * x, fold=True)
+    assert_value(sum(calls.values()), 1)
+    assert_value(compiled(2), 8)
+    assert_value(sum(calls.values()), 1)
+
+
+def test_fold_wrong_input():
+    with raises(TypeError):
+        fold(42)
+
+
+def _nb_nodes(expression):
+    return sum(1 for _ in walk(expression))
+
+
+def test_simplify_numeric_identities():
+    expression = ((x1 * 1 + 0) - 0) * (1 * x2) ** 1 + (0 + +x1)
+    assert_value(_nb_nodes(simplify(expression)), _nb_nodes(expression))
+
+    simplified = simplify(expression, numeric=True)
+    assert_value(_nb_nodes(simplified), 4)  # x1 * x2 + x1
+    for args in ((2, 3), (1.5, -2), (0, 7)):
+        assert_value(simplified(*args), expression(*args))
+
+    # the constants of another type are kept, e.g. not to turn integers into floats
+    assert_value(_nb_nodes(simplify(x * 1.0, numeric=True)), 3)
+
+    # without the numeric assumption, the semantics could change, e.g. an error disappear
+    with raises(TypeError):
+        simplify(x + 0)('a')
+    assert_value(simplify(x + 0, numeric=True)('a'), 'a')
+
+
+def test_simplify_double_negation():
+    simplified = simplify(not_(not_(x)))
+    assert_value(_nb_nodes(simplified), 3)  # truth(x)
+    assert_value([simplified(v) for v in (0, 3, [], 'a')], [False, True, False, True])
+
+    assert_value(_nb_nodes(simplify(-(-x))), 3)
+    assert simplify(-(-x), numeric=True) is x
+    assert_value(simplify(-(-x + 1), numeric=True)(2), 1)
+
+
+def test_simplify_square():
+    # `x ** 2 -> x * x` would give `inf` instead of an `OverflowError` for floats
+    simplified = simplify(x ** 2 + (x + 1) ** 2, numeric=True)
+    assert_value(simplified(3), 25)
+    with raises(OverflowError):
+        simplified(1e200)
+    rewritten = simplify(x ** 2, [rewrite._reduce_square])  # pylint: disable=protected-access
+    assert_value(rewritten(1e200), float('inf'))
+    assert_value(rewritten(3), 9)
+
+
+def test_simplify_flatten():
+    expression = x1 + x2 + x3 + 1
+    simplified = simplify(expression)
+    assert_value(_nb_nodes(simplified), 5)
+    assert_value(simplified(1, 2, 3), 7)
+    # still computed from left to right, so valid for any type
+    assert_value(simplify(x1 + x2 + x3)('a', 'b', 'c'), 'abc')
+    assert_value(simplify(2 * x * x2 * 3)([1], 2), [1] * 12)
+    # a product of sums isn't flattened
+    assert_value(_nb_nodes(simplify((x1 + x2) * (x1 + x2))), 5)
+
+    compiled = compile_(simplified)
+    assert_value(compiled(1, 2, 3), 7)
+    assert_value(loads(dumps(simplified))(1, 2, 3), 7)
+    profiled = profile(simplified)
+    profiled(1, 2, 3)
+    assert_value(profile_stats(profiled)[0].source, '(x1 + x2 + x3 + 1)')
+
+
+def test_simplify_constant_conditions():
+    assert simplify(if_(λ(True), x + 1, x - 1))(1) == 2
+    assert_value(_nb_nodes(simplify(if_(λ([]), x + 1, x - 1))), 3)
+    assert_value(simplify(and_(λ(0), x) + x)(5), 5)
+    assert_value(simplify(or_(λ('a'), x) * x)(2), 'aa')
+    assert_value(simplify(and_(λ(1), x) + x)(5), 10)
+    assert_value(_nb_nodes(simplify(if_(x, λ(True), x))), 3)  # not a constant condition
+
+    # the only occurrence of a variable isn't pruned
+    simplified = simplify(if_(λ(True), x1, x2))
+    assert_value(simplified(1, 2), 1)
+    assert_value(simplify(if_(λ(True), x1, x2) + x2)(1, 2), 3)
+    # the expression stays reduced by a call
+    assert_value(simplify(if_(λ(True), λ(1), λ(2)))(), 1)
+
+
+def test_simplify_rules():
+    def double_to_sum(node):
+        # pylint: disable=protected-access
+        if (isinstance(node, _LambdaAbstraction) and node._λ_operation is operator.mul and
+                len(node._λ_abstract_args) == 1 and
+                isinstance(node._λ_abstract_args[0], _ConstantAbstraction) and
+                node._λ_abstract_args[0]._λ_constant == 2):
+            return node._λ_origin + node._λ_origin
+        return None
+
+    simplified = simplify(x * 2 * 1, rules=[double_to_sum])
+    assert_value(simplified(3), 6)
+    assert_value(_nb_nodes(simplified), 4)  # (x + x) * 1: only the given rules apply
+
+    rule = rewrite_rule(numeric=True)(double_to_sum)
+    try:
+        assert_value(_nb_nodes(simplify(x * 2)), 3)
+        assert_value(_nb_nodes(simplify(x * 2, numeric=True)), 2)  # x + x
+    finally:
+        rewrite._rules.remove((rule, True))
+
+
+def test_simplify_wrong_input():
+    with raises(TypeError):
+        simplify(42)
+
+
+def test_bind():
+    weight, calls = counted(math.sqrt, pure=True)
+    score = weight(x2 * x3) * x1 + x4 * x2
+    bound = bind(score, x2=2, x3=8)
+    assert_value(sum(calls.values()), 1)
+    assert_value([bound(1, 10), bound(2, 10)], [24, 28])
+    assert_value(sum(calls.values()), 1)
+    assert_value(bound(1, 10), score(1, 2, 8, 10))
+
+    # positionally from x1, like `functools.partial`
+    assert_value(bind(x1 - x2 * x3, 10)(2, 3), 4)
+    assert_value(bind(x1 - x2 * x3, 10, x3=2)(3), 4)
+
+    # a mutable result, even hashable, is computed at each reduction
+    bound = bind(λ(_Accumulator)().add(x1) + x2, x1=1)
+    assert_value([bound(0), bound(0)], [1, 1])
+
+
+def test_bind_without_renumbering():
+    bound = bind(x1 * 10 + x2, x1=3, renumber=False)
+    with raises(TypeError):
+        bound(1)  # x1 is missing
+    assert_value((bound + x1)(1, 4), 35)
+
+
+def test_bind_everything():
+    bound = bind(λ(pow)(x1, x2), 2, 10)
+    assert is_λ(bound)
+    assert_value(bound(), 1024)
+    assert_value(bind(x, 3)(), 3)
+    assert_value(bind(x + x2, x2=3)(1), 4)
+
+    # mutable values aren't shared by all the reductions
+    bound = bind(sorted_λ(x1) + x2, [3, 1])
+    assert bound([]) is not bound([])
+
+
+def test_bind_wrong_input():
+    with raises(TypeError):
+        bind(x1 + x2, y=3)
+    with raises(TypeError):
+        bind(x1 + x2, x3=3)
+    with raises(TypeError):
+        bind(x1 + x2, 1, x1=3)
+    with raises(TypeError):
+        bind(x1 + x2, x2=x1)
+    with raises(TypeError):
+        bind(42, 3)
@@ -0,0 +1,97 @@
+""" Tests related to the serialization of λ-abstractions. """
+
+import math
+import pickle
+from unittest.mock import patch
+
+from pytest import raises
+
+from lambdax import (λ, x, x1, x2, x3, is_λ, and_, or_, if_, comp, not_,
+                     dumps, loads, share, memoize)
+from lambdax.builtins_as_lambdas import abs_λ, round_λ
+import lambdax.lambda_calculus
+from lambdax.test import assert_value
+
+
+def _square(value):
+    return value * value
+
+
+def _round_trip(expression, *args):
+    loaded = loads(dumps(expression))
+    assert is_λ(loaded)
+    assert_value(loaded(*args), expression(*args))
+    loaded = pickle.loads(pickle.dumps(expression))
+    assert_value(loaded(*args), expression(*args))
+    return loaded
+
+
+def test_round_trip():
+    _round_trip(x * 2 + 1, 3)
+    _round_trip(3 - x1 / x2 ** 2 % 7, 4, 5)
+    _round_trip(-abs_λ(x) + ~x, -7)
+    _round_trip(not_(x) | (2 << x), 1)
+    _round_trip(x['a'] + x['b'][1:], {'a': 'foo', 'b': 'bar'})
+    _round_trip(x.real + x.conjugate().imag, 1 + 2j)
+    _round_trip(round_λ(x1, ndigits=x2), math.pi, 3)
+    _round_trip(λ(math.sqrt)(x) + λ(_square)(x), 4.)
+    _round_trip(and_(x1, x2) + or_(x1, x3) + if_(x1, x2, x3), 0, 5, 7)
+    _round_trip(comp(x * 2, x1 + x2), 3, 4)
+    _round_trip(x + [1, (2, {3})], [0])
+
+
+def test_variables_are_the_usual_ones():
+    assert loads(dumps(x)) is x
+    loaded = loads(dumps(x1 + x2))
+    assert loaded._λ_origin is x1  # pylint: disable=protected-access
+    assert_value(loaded(2, 3), 5)
+
+
+def test_shared_nodes_stored_once():
+    common = λ(_square)(x1 * x2 + 1)
+    expression = common + common * common
+    data = dumps(expression)
+    assert len(data) < len(dumps(λ(_square)(x1 * x2 + 1) + λ(_square)(x1 * x2 + 1) *
+                                 λ(_square)(x1 * x2 + 1)))
+    loaded = loads(data)
+    # pylint: disable=protected-access
+    assert loaded._λ_origin is loaded._λ_abstract_args[0]._λ_origin
+    assert_value(loaded(2, 3), 49 + 49 * 49)
+
+
+def test_no_construction_on_load():
+    data = dumps(and_(x * 2 + λ(math.sqrt)(x), 3))
+
+    def fail(*_):
+        raise AssertionError("A constructor was called")
+
+    with patch.object(lambdax.lambda_calculus._LambdaAbstraction, '__init__', fail), \
+            patch.object(lambdax.lambda_calculus._ConstantAbstraction, '__init__', fail), \
+            patch.object(lambdax.lambda_calculus._Op, '__init__', fail):
+        loaded = loads(data)
+    assert_value(loaded(4), 3)
+
+
+def test_deep_expression():
+    expression = x
+    for _ in range(5000):
+        expression = expression + 1
+    data = dumps(expression)
+    assert_value(dumps(loads(data)), data)
+
+
+def test_other_abstractions():
+    _round_trip(share(x * 2 + x * 2) + 1, 3)
+    memoized = pickle.loads(pickle.dumps(memoize(x * 3, maxsize=2)))
+    assert_value(memoized(2), 6)
+
+
+def test_wrong_input():
+    with raises(TypeError):
+        dumps(42)
+    with raises(ValueError):
+        loads(b'not an expression')
+    with raises(ValueError):
+        loads(dumps(x)[:3] + bytes((99,)) + dumps(x)[4:])
+    with raises((pickle.PicklingError, AttributeError)):
+        dumps(λ(lambda v: v)(x))
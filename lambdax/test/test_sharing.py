@@ -0,0 +1,120 @@
+""" Tests related to the sharing of common sub-expressions. """
+
+from collections import Counter
+
+from pytest import raises
+
+from lambdax import x, x1, x2, x3, is_λ, and_, if_, comp, share, evaluate_many, map_many
+from lambdax.builtins_as_lambdas import next_λ
+from lambdax.test import assert_value, counted
+
+
+def test_each_subexpression_once():
+    f, calls = counted(lambda v: v)
+    expression = f(x1 * x2 + 1) ** 2 / f(x1 * x2 + 1)
+    shared = share(expression)
+    assert is_λ(shared)
+
+    for a, b in ((2, 3), (4, 5), (4, 5)):
+        calls.clear()
+        assert_value(shared(a, b), expression(a, b))
+        # one call with `shared`, two with `expression`
+        assert_value(calls, Counter({repr((a * b + 1,)): 3}))
+
+
+def test_distinct_subexpressions():
+    f, calls = counted(lambda *v: sum(v))
+    shared = share(f(x1) + f(x2) + f(x1, x2) * f(x2) - f(x1 + 0))
+    assert_value(shared(3, 4), 3 + 4 + 7 * 4 - 3)
+    assert_value(calls, Counter({'(3,)': 2, '(4,)': 1, '(3, 4)': 1}))
+
+
+def test_constants_by_value_or_identity():
+    f, calls = counted(lambda v: v)
+    # 1 and 1.0 are equal, but not interchangeable
+    shared = share(f(x + 1) + f(x + 1.0) + f(x + 1))
+    assert_value(shared(1), 2 + 2. + 2)
+    assert_value(calls, Counter({'(2,)': 1, '(2.0,)': 1}))
+    assert isinstance(shared(1), float)
+
+    lists = ([1], [1])
+    calls.clear()
+    shared = share(f(x + lists[0]) + f(x + lists[1]) + f(x + lists[0]))
+    assert_value(shared([0]), [0, 1] * 3)
+    assert_value(calls, Counter({'([0, 1],)': 2}))
+
+
+def test_impure_calls_not_merged():
+    expression = next_λ(x) * 10 + next_λ(x)
+    assert_value(share(expression)(iter([1, 2])), expression(iter([1, 2])))
+    # nor the calls of methods, which may mutate their object
+    assert_value(share(x.pop() * 10 + x.pop())([1, 2]), 21)
+    assert_value(evaluate_many([next_λ(x), next_λ(x)], iter([1, 2])), (1, 2))
+    assert_value(list(map_many([next_λ(x), next_λ(x) * 10], [iter('ab'), iter('cd')])),
+                 [('a', 'bbbbbbbbbb'), ('c', 'dddddddddd')])
+    assert_value(evaluate_many([x.pop(), x.pop()], [1, 2]), (2, 1))
+    assert_value(list(map_many([x.pop(), x.pop() * 10], [[1, 2], [3, 4]])), [(2, 10), (4, 30)])
+
+
+def test_laziness_preserved():
+    f, calls = counted(lambda v: v * 2)
+    shared = share(if_(x > 0, f(x) + f(x), and_(x, f(x))))
+    assert_value(shared(3), 12)
+    assert_value(calls, Counter({'(3,)': 1}))
+    calls.clear()
+    assert_value(shared(0), 0)
+    assert_value(calls, Counter())
+
+
+def test_composition():
+    shared = share(comp(x + 1, x * 2 + x * 2))
+    assert_value(shared(3), 13)
+    assert_value(share(x)(4), 4)
+    assert_value((shared * 2)(3), 26)
+
+
+def test_share_wrong_input():
+    with raises(TypeError):
+        share(42)
+
+
+def test_evaluate_many():
+    f, calls = counted(lambda v: v + 1)
+    expressions = [f(x1) * 2, f(x1) + x2, x2, f(x1) * 2 - f(x2)]
+    assert_value(evaluate_many(expressions, 3, 5), (8, 9, 5, 2))
+    assert_value(calls, Counter({'(3,)': 1, '(5,)': 1}))
+    assert_value(evaluate_many(expressions, (3, 5)), (8, 9, 5, 2))
+    assert_value(evaluate_many([x.real, x.imag, abs(x)], 3 + 4j), (3., 4., 5.))
+    assert_value(evaluate_many([]), ())
+
+
+def test_evaluate_many_lazily():
+    f, calls = counted(lambda v: v * 2)
+    expressions = [if_(x > 0, f(x), 0), and_(x > 1, f(x) + 1)]
+    assert_value(evaluate_many(expressions, 0), (0, False))
+    assert_value(calls, Counter())
+    assert_value(evaluate_many(expressions, 3), (6, 7))
+    assert_value(calls, Counter({'(3,)': 1}))
+
+
+def test_map_many():
+    f, calls = counted(lambda v: v['payload'])
+    expressions = [f(x)['a'], f(x)['b'] * 2, f(x)['a'] + x['id']]
+    rows = [{'id': i, 'payload': {'a': i * 10, 'b': -i}} for i in range(5)]
+    results = list(map_many(expressions, rows))
+    # once per row
+    assert_value(sum(calls.values()), len(rows))
+    assert_value(results, [tuple(e(row) for e in expressions) for row in rows])
+
+    assert_value(list(map_many([x1 + x2, x1], [(1, 2), (3, 4)])), [(3, 1), (7, 3)])
+    with raises(TypeError):
+        list(map_many([x1 + x2, x1], [(1, 2, 3)]))
+
+
+def test_evaluate_many_wrong_input():
+    with raises(TypeError):
+        evaluate_many([x1, 42], 1)
+    with raises(TypeError):
+        evaluate_many([x1, x3], 1, 2, 3)
+    with raises(TypeError):
+        evaluate_many([x1, x2], 1)
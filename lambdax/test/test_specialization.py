@@ -0,0 +1,116 @@
+""" Tests related to the specialization of λ-abstractions for the types of their arguments. """
+
+import pickle
+
+from pytest import raises
+
+from lambdax import λ, x, x1, x2, is_λ, if_, simplify, specialize, specialization_info
+from lambdax.builtins_overridden import abs as λabs
+from lambdax.lambda_calculus import _LambdaAbstraction
+from lambdax.specialization import _specialized_expression
+from lambdax.test import assert_value
+from lambdax.tree import walk
+
+
+def test_specialized_results():
+    expression = λabs(x1 * 1 + 0) ** 2 - x2 * x2.real + if_(x1 > 0, x1, -x1)
+    specialized = specialize(expression)
+    assert is_λ(specialized)
+    for args in ((3, 4), (3, 4), (-2.5, 1), (-2.5, 1), (7, 0.5), (2, 1 + 1j)):
+        assert_value(specialized(*args), expression(*args))
+
+    # the specialized abstraction is still an abstraction
+    assert_value((specialized + x1)(3, 4), expression(3, 4) + 3)
+
+
+def test_specialization_stats():
+    specialized = specialize(x1 + x2, maxsize=2, threshold=2)
+    specialized(1, 2)
+    assert_value(specialization_info(specialized), (0, 1, 0, 0, 2, 0))
+    specialized(1, 2)  # specialized at the second call of the signature
+    specialized(1, 2)
+    assert_value(specialization_info(specialized), (1, 2, 1, 0, 2, 1))
+
+    for args in ((1., 2.), (1., 2.), ('a', 'b'), ('a', 'b')):
+        specialized(*args)
+    # (int, int) was the least recently used
+    assert_value(specialization_info(specialized), (1, 6, 3, 1, 2, 2))
+    assert_value(specialized('a', 'b'), 'ab')
+    assert_value(specialization_info(specialized).hits, 2)
+
+
+def test_guard_falls_back_to_generic():
+    calls = []
+    specialized = specialize(x * 2, threshold=1)
+    assert_value(specialized(3), 6)
+    assert_value(specialization_info(specialized).specializations, 1)
+
+    class Number(int):
+        def __mul__(self, other):
+            calls.append(other)
+            return 42
+
+    # a subclass has another signature
+    assert_value(specialized(Number(3)), 42)
+    assert_value(calls, [2])
+    assert_value(specialization_info(specialized).currsize, 2)
+
+
+def test_integer_rewrites():
+    expression = (x1 * 1 + 0) ** 2 + -(-x2)
+    nodes = len(list(walk(expression)))
+    integers = _specialized_expression(expression, (int, int))
+    assert_value(len(list(walk(integers))), 4)  # x1 * x1 + x2
+    assert_value(integers(3, 4), expression(3, 4))
+
+    # `x ** 2` can overflow for floats, whereas `x * x` gives `inf`: only `-(-x2)` is rewritten
+    floats = _specialized_expression(expression, (float, int))
+    assert_value(len(list(walk(floats))), nodes - 2)
+    assert_value(floats(1.5, 4), expression(1.5, 4))
+    # `True * 1` is `1`, not `True`
+    booleans = _specialized_expression(expression, (bool, int))
+    assert_value(str(booleans(True, 4)), str(expression(True, 4)))
+
+    # the type of the result of an arbitrary function is unknown
+    called = λ(str)(x) * 1
+    assert isinstance(_specialized_expression(called, (int,)), _LambdaAbstraction)
+    assert_value(specialize(called, threshold=1)(3), '3')
+
+    # the type of the flattened sums and products is inferred too
+    flattened = simplify(x1 + x2 + x1 * x2 * 3)
+    integers = _specialized_expression(flattened * 1, (int, int))
+    assert_value(len(list(walk(integers))), len(list(walk(flattened))))
+    assert_value(integers(3, 4), (flattened * 1)(3, 4))
+
+
+def test_integer_rewrites_keep_types():
+    # `b * 1 + 0` is an `int` for a `bool` b, but only its `+ 0` can be eliminated
+    for expression, args in (((x1 > x2) * 1 + 0, (3, 2)), (x * 1 + 0, (True,)),
+                             (-(-(x1 < x2)) + 0, (1, 2))):
+        assert_value(str(specialize(expression, threshold=1)(*args)), str(expression(*args)))
+
+
+def test_specialized_subexpression():
+    expression = x1 * specialize(x2 + 1, threshold=1) - specialize(x1 * 1 + 0, threshold=2)
+    reference = x1 * (x2 + 1) - (x1 * 1 + 0)
+    for args in ((3, 4), (3, 4), (3, 4), (2., 5), (True, 4), (True, 4)):
+        assert_value(str(expression(*args)), str(reference(*args)))
+
+
+def test_pickle_specialized():
+    specialized = specialize(x + 1, maxsize=3, threshold=1)
+    specialized(1)
+    loaded = pickle.loads(pickle.dumps(specialized))
+    assert_value(loaded(2), 3)
+    assert_value(specialization_info(loaded), (0, 1, 1, 0, 3, 1))
+
+
+def test_specialize_wrong_input():
+    with raises(TypeError):
+        specialize(42)
+    with raises(ValueError):
+        specialize(x, maxsize=0)
+    with raises(ValueError):
+        specialize(x, threshold=0)
+    with raises(TypeError):
+        specialization_info(x)
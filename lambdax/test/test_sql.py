@@ -0,0 +1,139 @@
+""" Tests related to the translation of λ-abstractions into SQL conditions. """
+
+import sqlite3
+
+from pytest import fixture, raises
+
+from lambdax import (λ, x, x1, x2, x3, and_, or_, if_, not_, truth, contains, is_, is_not, lt,
+                     simplify)
+from lambdax.builtins_as_lambdas import abs_λ, len_λ
+from lambdax.sql import to_where, split_where
+from lambdax.test import assert_value
+
+_ROWS = [
+    (1, 10, 'red', 2.5),
+    (2, 0, 'blue', -1.),
+    (3, 7, 'green', 0.),
+    (4, -3, 'red', 12.25),
+    (5, 12, 'yellow', 3.),
+    (6, 5, None, 7.5),
+]
+
+
+@fixture(name='connection')
+def _connection():
+    connection = sqlite3.connect(':memory:')
+    connection.row_factory = sqlite3.Row
+    connection.execute('CREATE TABLE items (id, qty, color, "unit price")')
+    connection.executemany('INSERT INTO items VALUES (?, ?, ?, ?)', _ROWS)
+    yield connection
+    connection.close()
+
+
+def _ids(connection, clause, params):
+    return [row['id'] for row in connection.execute(
+        'SELECT * FROM items WHERE %s ORDER BY id' % clause, params)]
+
+
+def _filtered_ids(connection, predicate):
+    rows = connection.execute('SELECT * FROM items ORDER BY id')
+    return [row['id'] for row in rows if predicate(row)]
+
+
+def test_row_items(connection):
+    rows = [row for row in connection.execute('SELECT * FROM items') if row['color']]
+    assert len(rows) == 5
+    for predicate in (
+            x['qty'] > 5, 5 < x['qty'], x['qty'] * 2 - x['id'] >= 10, lt(x['unit price'], 3),
+            x['qty'] / 2 == 3.5, -x['qty'] <= -7, abs_λ(x['qty']) == 3, +x['id'] != 2,
+            and_(x['color'] == 'red', x['qty'] > 0), or_(x['id'] == 2, x['unit price'] > 5),
+            not_(x['qty'] > 5), truth(x['qty'] == 0), x['color'] != 'red',
+            contains(('red', 'blue'), x['color']), contains({1, 3}, x['id']),
+            contains([], x['id']), if_(x['id'] > 3, x['qty'] > 0, x['qty'] > 7),
+            and_(True, x['id'] != 1), (x['id'] > 2) + (x['qty'] > 6) == 1):
+        clause, params = to_where(predicate)
+        expected = [row['id'] for row in rows if predicate(row)]
+        ids = [row_id for row_id in _ids(connection, clause, params) if row_id != 6]
+        assert_value(ids, expected)
+
+
+def test_null(connection):
+    clause, params = to_where(is_(x['color'], None))
+    assert_value(_ids(connection, clause, params), [6])
+    clause, params = to_where(is_not(x['color'], None))
+    assert_value(_ids(connection, clause, params), [1, 2, 3, 4, 5])
+    with raises(ValueError):
+        to_where(x['color'] == None)  # noqa: E711
+    with raises(ValueError):
+        to_where(is_(x['color'], 'red'))
+
+
+def test_columns(connection):
+    clause, params = to_where(and_(x1 > 2, x2 != 'red'), {'x1': 'id', 'x2': 'color'})
+    assert_value(clause, '(("id" > ?) AND ("color" != ?))')
+    assert_value(params, (2, 'red'))
+    assert_value(_ids(connection, clause, params), [3, 5])
+
+    clause, params = to_where(x * 2 > 10, {'x': 'unit price'})
+    assert_value(clause, '(("unit price" * ?) > ?)')
+    assert_value(_ids(connection, clause, params), [4, 6])
+
+    # the flattened sums and products
+    clause, params = to_where(simplify(x1 + x2 + x1 * 2 * x2) > 30, {'x1': 'id', 'x2': 'qty'})
+    assert_value(clause, '(("id" + "qty" + ("id" * ? * "qty")) > ?)')
+    assert_value(_ids(connection, clause, params), [1, 3, 5, 6])
+
+
+def test_untranslatable():
+    for predicate in (x['qty'] + 1, x['qty'] % 2 == 0, x['qty'] // 2 == 0, x['qty'] ** 2 > 4,
+                      len_λ(x['color']) > 3, and_(x['qty'], x['id'] > 1), not_(x['qty']),
+                      x['qty'] > [1], contains(x['color'], 'e'), x[1] > 2, x.qty > 2,
+                      λ(lambda v: v > 1)(x['qty']), x1 > 1):
+        with raises(ValueError):
+            to_where(predicate)
+    with raises(ValueError):
+        to_where(x['id'] > 1, {'x': 'id'})
+    with raises(TypeError):
+        to_where(x1 > 1, {'y': 'id'})
+    with raises(TypeError):
+        to_where(lambda row: row['id'] > 1)
+
+
+def test_strings_arithmetic(connection):
+    # the arithmetic of SQL is numeric: '"color" || ?' would be the concatenation
+    assert_value(_ids(connection, '(("color" + ?) = ?)', ('x', 'redx')), [])
+    for predicate in (x['color'] + 'x' == 'redx', x['color'] * 2 == 'redred',
+                      'red' + x['color'] == 'redred', contains(('redred',), x['color'] * 2)):
+        with raises(ValueError):
+            to_where(predicate)
+        clause, params, residual = split_where(and_(is_not(x['color'], None), predicate))
+        rows = connection.execute('SELECT * FROM items WHERE %s' % clause, params)
+        assert_value([row['id'] for row in rows if residual(row)], [1, 4])
+    for predicate in (x['qty'] + x['id'] == 'red', x['qty'] * 1 != b'red', -x['qty'] < 'a'):
+        with raises(ValueError):
+            to_where(predicate)
+
+
+def test_split(connection):
+    predicate = and_(and_(is_not(x['color'], None), len_λ(x['color']) > 3),
+                     and_(x['qty'] % 2 == 0, x['qty'] < 10))
+    clause, params, residual = split_where(predicate)
+    assert_value(clause, '("color" IS NOT NULL) AND ("qty" < ?)')
+    assert_value(params, (10,))
+    rows = connection.execute('SELECT * FROM items WHERE %s' % clause, params)
+    assert_value([row['id'] for row in rows if residual(row)], [2])
+
+    clause, params, residual = split_where(x['qty'] > 1)
+    assert_value((clause, params, residual), ('("qty" > ?)', (1,), None))
+
+    clause, params, residual = split_where(len_λ(x['color']) > 3)
+    assert_value((clause, params), ('1', ()))
+    assert_value(_filtered_ids(connection, and_(is_not(x['color'], None), residual)), [2, 3, 5])
+
+
+def test_split_residual_variables():
+    predicate = and_(x1 > 1, and_(λ(str.startswith)(x3, 'a'), x2 < 3))
+    clause, params, residual = split_where(predicate, {'x1': 'a', 'x2': 'b'})
+    assert_value((clause, params), ('("a" > ?) AND ("b" < ?)', (1, 3)))
+    assert_value(residual(0, 0, 'abc'), True)
+    assert_value(residual(0, 0, 'cba'), False)
@@ -0,0 +1,107 @@
+""" Tests related to the evaluation of λ-abstractions on NumPy arrays. """
+
+import math
+
+from pytest import importorskip, raises
+
+from lambdax import λ, x, x1, x2, and_, or_, if_, comp, not_, eq, lt, simplify
+from lambdax.builtins_as_lambdas import abs_λ, round_λ
+from lambdax.test import assert_value
+
+np = importorskip('numpy')
+vectorize = importorskip('lambdax.vectorized').vectorize
+
+
+def _python(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _assert_same(expression, *arrays):
+    result = vectorize(expression)(*arrays)
+    assert isinstance(result, np.ndarray)
+    expected = map(expression, zip(*arrays) if len(arrays) > 1 else arrays[0])
+    assert_value(result.tolist(), [_python(value) for value in expected])
+    return result
+
+
+def test_arithmetic():
+    values = np.arange(-5, 6)
+    for expression in (x * 2 + 1, (x - 3) ** 2 // 4 % 3, -x, +x, ~x, abs(x), 3 - x, 2 ** abs_λ(x),
+                       x << 2 | 1 & x ^ 3, x / 4):
+        result = _assert_same(expression, values)
+        assert result.dtype != object
+    # the flattened sums and products
+    for expression in (simplify(x * 2 + x + 1), simplify(3 * x * x * x)):
+        result = _assert_same(expression, values)
+        assert result.dtype != object
+
+
+def test_comparisons():
+    values = np.arange(-5, 6)
+    for expression in (x < 2, x >= 0, x == 3, x != 3, eq(x, 2), lt(3, x), not_(x)):
+        result = _assert_same(expression, values)
+        assert result.dtype == bool
+
+
+def test_comparisons_in_arithmetic():
+    # the booleans are integers in the arithmetic of Python
+    values, others = list(range(-3, 3)), [0, -2, 1, 0, 3, 1]
+    for expression in ((x1 < x2) + (x1 < x2), -(x1 < x2), (x1 < x2) - (x2 > 0),
+                       (x1 < x2) * (x2 >= 0), ~(x1 < x2), abs(x1 < x2), abs_λ(x1 == x2),
+                       (x1 < x2) ** (x1 > x2), (x1 < x2) << 2, simplify(x1 + (x1 < x2) + True)):
+        result = _assert_same(expression, values, others)
+        assert result.dtype != object
+
+
+def test_several_variables():
+    result = _assert_same(x1 ** x2 + x2, np.arange(5), np.arange(5, 10))
+    assert result.dtype != object
+    # arrays are broadcast
+    assert_value(vectorize(x1 * x2)(np.arange(3), 2).tolist(), [0, 2, 4])
+
+
+def test_functions():
+    values = np.linspace(.5, 4, 8)
+    _assert_same(λ(math.sqrt)(x) + λ(math.exp)(x), values)
+    _assert_same(round_λ(x * 3, 1), values)
+    result = _assert_same(λ(lambda v: v * 2)(x), values)
+    assert result.dtype == float
+
+    # element-wise calls with named parameters
+    _assert_same(λ(int)('101', base=x), np.array([2, 8, 10]))
+
+
+def test_attributes_and_methods():
+    values = np.array([1 + 2j, 3 - 4j])
+    _assert_same(x.real - x.imag, values)
+    _assert_same(x.conjugate(), values)
+    _assert_same(x.upper() + '!', np.array(['ab', 'c']))
+
+    records = np.array([(1, 2.), (3, 4.)], dtype=[('a', int), ('b', float)])
+    assert_value(vectorize(x['a'] + x['b'])(records).tolist(), [3., 7.])
+
+
+def test_laziness():
+    values = np.arange(-3, 4)
+    # the lazy operands are not evaluated where they are not needed: no division by zero
+    _assert_same(and_(x, 1 / λ(int)(x)), values)
+    _assert_same(or_(x, 'zero'), values)
+    _assert_same(if_(x > 0, λ(math.log)(x), -x), values)
+    _assert_same(if_(x > 10, x, 0), values)
+
+
+def test_constants_as_elements():
+    values = np.empty(2, dtype=object)
+    values[:] = [[0], []]
+    assert_value(vectorize(λ(len)(x + [1, 2]))(values).tolist(), [3, 2])
+
+
+def test_composition():
+    _assert_same(comp(x * 2, x + 1), np.arange(4))
+
+
+def test_vectorize_wrong_input():
+    with raises(TypeError):
+        vectorize(42)
+    with raises(TypeError):
+        vectorize(x1 + x2)(np.arange(3))
@@ -0,0 +1,75 @@
+""" Inspect and rebuild the tree of a λ-abstraction.
+
+The sub-expressions of a node are called its children, given in the order in which
+they are evaluated by a β-reduction:
+- the origin, the positional then the named arguments of an operation,
+- the operands of `and_`, `or_` and `if_`,
+- nothing for a variable or a constant.
+
+Everything here is iterative rather than recursive: generated expressions
+can be much deeper than the recursion limit.
+"""
+
+from lambdax.lambda_calculus import (
+    _LambdaAbstraction, _Op, is_λ as _is_λ
+)
+
+
+def children(node):
+    """ Return the tuple of the direct sub-expressions of `node` """
+    # pylint: disable=protected-access
+    if isinstance(node, _LambdaAbstraction):
+        return ((node._λ_origin,) + tuple(node._λ_abstract_args) +
+                tuple(node._λ_abstract_kwargs.values()))
+    if isinstance(node, _Op):
+        return tuple(node._λ_operands)
+    return ()
+
+
+def rebuild(node, new_children):
+    """ Return a node like `node` but with other children, or `node` itself
+    if the children are the same.
+    """
+    # pylint: disable=protected-access
+    new_children = tuple(new_children)
+    if all(a is b for a, b in zip(children(node), new_children)):
+        return node
+    if isinstance(node, _LambdaAbstraction):
+        nb_args = len(node._λ_abstract_args)
+        return _LambdaAbstraction(
+            new_children[0], node._λ_operation, new_children[1:nb_args + 1],
+            dict(zip(node._λ_abstract_kwargs, new_children[nb_args + 1:]))
+        )
+    return type(node)(*new_children)
+
+
+def walk(root):
+    """ Iterate once over each distinct node of the expression `root`,
+    every node coming after its children.
+    """
+    if not _is_λ(root):
+        raise TypeError("Expected an abstraction, got a `%s` (%s)"
+                        % (type(root).__name__, root))
+    seen = set()
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in seen:
+            continue
+        if expanded:
+            seen.add(id(node))
+            yield node
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children(node)))
+
+
+def transform(root, function):
+    """ Rebuild the expression `root` from the bottom up, replacing each distinct node
+    by `function(node)`, where `node` has already got its transformed children.
+    """
+    transformed = {}
+    for node in walk(root):
+        new_node = rebuild(node, (transformed[id(child)] for child in children(node)))
+        transformed[id(node)] = function(new_node)
+    return transformed[id(root)]
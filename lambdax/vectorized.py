@@ -0,0 +1,291 @@
+""" Evaluate λ-abstractions at once on whole NumPy arrays, instead of once per element.
+
+`vectorize(expression)` returns a function taking one array (or anything convertible
+to an array) per variable of the expression, and evaluating each node of the
+expression once on the whole arrays:
+- the operators (as dunder-methods or functions of `lambdax.operators`) become ufuncs,
+- a few λ-wrapped functions of `math` and `builtins` are replaced with their ufunc,
+- any other function is applied element by element with `numpy.frompyfunc`,
+- `and_`, `or_` and `if_` compute their lazy operands only on the elements that need them,
+  like they would do element by element.
+
+The results are the ones of NumPy, e.g. `nan` with a warning rather than a `ValueError`
+for the square root of a negative number.
+This module requires NumPy, which is not a dependency of the package.
+"""
+
+import builtins
+import functools
+import math
+import operator
+
+import numpy as np
+
+from lambdax.lambda_calculus import (
+    _apply, _check_variables, _reversed_operations,
+    _ConstantAbstraction, _IdentityAbstraction, _LambdaAbstraction,
+    and_ as _and, or_ as _or, if_ as _if, is_λ as _is_λ
+)
+from lambdax.rewriting import _add_all, _multiply_all
+
+
+def _as_number(operand):
+    """ The booleans as integers, as in the arithmetic of Python (e.g. `True + True == 2`) """
+    if isinstance(operand, np.ndarray) and operand.dtype == bool:
+        return operand.astype(int)
+    if isinstance(operand, (bool, np.bool_)):
+        return int(operand)
+    return operand
+
+
+def _arithmetic(ufunc):
+    """ Apply the arithmetic `ufunc` with the booleans as integers """
+    def arithmetic(*operands):
+        return ufunc(*(_as_number(operand) for operand in operands))
+
+    arithmetic.nin = ufunc.nin
+    return arithmetic
+
+
+def _reduced(ufunc):
+    """ Apply the binary `ufunc` from left to right on any number of operands,
+    with the booleans as integers
+    """
+    def reduced(first, *others):
+        return functools.reduce(ufunc, map(_as_number, others), _as_number(first))
+
+    reduced.nin = None  # any number of operands
+    return reduced
+
+
+_OPERATORS = {
+    operator.add: _arithmetic(np.add),
+    operator.sub: _arithmetic(np.subtract),
+    operator.mul: _arithmetic(np.multiply),
+    operator.matmul: np.matmul,
+    operator.truediv: np.true_divide,
+    operator.floordiv: _arithmetic(np.floor_divide),
+    operator.mod: _arithmetic(np.remainder),
+    operator.pow: _arithmetic(np.power),
+    operator.lshift: _arithmetic(np.left_shift),
+    operator.rshift: _arithmetic(np.right_shift),
+    operator.and_: np.bitwise_and,
+    operator.or_: np.bitwise_or,
+    operator.xor: np.bitwise_xor,
+    operator.lt: np.less,
+    operator.le: np.less_equal,
+    operator.eq: np.equal,
+    operator.ne: np.not_equal,
+    operator.ge: np.greater_equal,
+    operator.gt: np.greater,
+    operator.neg: _arithmetic(np.negative),
+    operator.pos: _arithmetic(np.positive),
+    operator.invert: _arithmetic(np.invert),
+    operator.inv: _arithmetic(np.invert),
+    operator.abs: _arithmetic(np.absolute),
+    operator.not_: np.logical_not,
+    operator.truth: lambda a: _truth(np.asarray(a)),
+    # the sums and products flattened by `simplify`
+    _add_all: _reduced(np.add),
+    _multiply_all: _reduced(np.multiply),
+}
+
+_FUNCTIONS = {
+    builtins.abs: _arithmetic(np.absolute),
+    builtins.pow: _arithmetic(np.power),
+    math.fabs: np.fabs,
+    math.sqrt: np.sqrt,
+    math.exp: np.exp,
+    math.expm1: np.expm1,
+    math.log10: np.log10,
+    math.log2: np.log2,
+    math.log1p: np.log1p,
+    math.sin: np.sin,
+    math.cos: np.cos,
+    math.tan: np.tan,
+    math.asin: np.arcsin,
+    math.acos: np.arccos,
+    math.atan: np.arctan,
+    math.atan2: np.arctan2,
+    math.sinh: np.sinh,
+    math.cosh: np.cosh,
+    math.tanh: np.tanh,
+    math.hypot: np.hypot,
+    math.isnan: np.isnan,
+    math.isinf: np.isinf,
+    math.isfinite: np.isfinite,
+}
+
+# attributes of an array that are the ones of its elements
+_ARRAY_ATTRIBUTES = {'real', 'imag'}
+
+# Python types of the results of `frompyfunc` that can be stored in a native array
+_NATIVE_TYPES = {bool: bool, int: np.int64, float: np.float64, complex: np.complex128}
+
+
+def _lookup(table, key):
+    try:
+        return table.get(key)
+    except TypeError:  # unhashable
+        return None
+
+
+def _accepts(ufunc, operands):
+    """ Tell if `ufunc` can be applied on `operands`: its extra positional
+    arguments would be taken as output arrays.
+    """
+    return ufunc is not None and getattr(ufunc, 'nin', 1) in (len(operands), None)
+
+
+def _element_wise(function, arrays, names=()):
+    """ Apply `function` element by element; the last arrays are passed as
+    the named arguments `names`.
+    """
+    nb_positional = len(arrays) - len(names)
+    if names:
+        def call(*values):
+            return function(*values[:nb_positional], **dict(zip(names, values[nb_positional:])))
+    else:
+        call = function
+    result = np.frompyfunc(call, len(arrays), 1)(*arrays)
+    if isinstance(result, np.ndarray) and result.size:
+        native = _NATIVE_TYPES.get(type(result.flat[0]))
+        if native is not None and all(type(value) is type(result.flat[0])
+                                      for value in result.flat):
+            return result.astype(native)
+    return result
+
+
+def _truth(values):
+    """ Truth value of each element """
+    if values.dtype.kind == 'b':
+        return values
+    if values.dtype.kind in 'iufc':
+        return values != 0
+    return np.frompyfunc(bool, 1, 1)(values).astype(bool)
+
+
+def _constant(value):
+    if isinstance(value, (list, tuple, dict, set, frozenset)):
+        # NumPy would consider it as an array, whereas it's one value for each element
+        array = np.empty((), dtype=object)
+        array[()] = value
+        return array
+    return value
+
+
+class _Evaluator:
+    def __init__(self, inputs, shape):
+        self._inputs = inputs
+        self._shape = shape
+
+    def array(self, value):
+        """ Return `value` as an array of the shape of the inputs """
+        if np.ndim(value) == 0:
+            return np.array(np.broadcast_to(value, self._shape))
+        return np.asarray(value)
+
+    def _lazy(self, mask, node):
+        """ Evaluate `node` only on the elements selected by `mask` """
+        if not mask.any():
+            return None
+        subset = _Evaluator([value[mask] for value in self._inputs],
+                            (int(np.count_nonzero(mask)),))
+        return subset.evaluate(node)
+
+    def _combine(self, mask, selected, unselected):
+        """ Take the values of `selected` where `mask` is true and the ones of `unselected`
+        elsewhere, both holding only the values of their own elements.
+        """
+        if not mask.size:
+            return np.empty(self._shape)
+        if not mask.any():
+            return unselected
+        if mask.all():
+            return selected
+        selected, unselected = np.asarray(selected), np.asarray(unselected)
+        kinds = {selected.dtype.kind, unselected.dtype.kind}
+        if len(kinds) == 1 or kinds <= set('biufc'):
+            dtype = np.result_type(selected, unselected)
+        else:
+            # NumPy would e.g. convert numbers to strings
+            dtype = object
+        result = np.empty(self._shape, dtype=dtype)
+        result[mask] = selected
+        result[~mask] = unselected
+        return result
+
+    def evaluate(self, node):
+        """ Evaluate `node` on the whole input arrays """
+        # pylint: disable=protected-access
+        if isinstance(node, _IdentityAbstraction):
+            return self._inputs[next(iter(node._λ_var_indices))]
+        if isinstance(node, _ConstantAbstraction):
+            return _constant(node._λ_constant)
+        if isinstance(node, (_and, _or)):
+            left, right = node._λ_operands
+            left_value = self.array(self.evaluate(left))
+            truth = _truth(left_value)
+            if isinstance(node, _or):
+                truth = ~truth
+            return self._combine(truth, self._lazy(truth, right), left_value[~truth])
+        if isinstance(node, _if):
+            cond, then, else_ = node._λ_operands
+            truth = _truth(self.array(self.evaluate(cond)))
+            return self._combine(truth, self._lazy(truth, then), self._lazy(~truth, else_))
+        if isinstance(node, _LambdaAbstraction):
+            return self._operation(node)
+        return _element_wise(node._β, self._inputs)
+
+    def _operation(self, node):
+        # pylint: disable=protected-access
+        origin = self.evaluate(node._λ_origin)
+        args = [self.evaluate(arg) for arg in node._λ_abstract_args]
+        names = tuple(node._λ_abstract_kwargs)
+        kwargs = [self.evaluate(arg) for arg in node._λ_abstract_kwargs.values()]
+        operation = node._λ_operation
+
+        if not kwargs:
+            if operation is _apply and isinstance(node._λ_origin, _ConstantAbstraction):
+                ufunc = _lookup(_FUNCTIONS, origin) or _lookup(_OPERATORS, origin)
+                if _accepts(ufunc, args):
+                    return ufunc(*args)
+            ufunc = _lookup(_OPERATORS, operation)
+            if _accepts(ufunc, [origin] + args):
+                return ufunc(origin, *args)
+            ufunc = _lookup(_OPERATORS, _lookup(_reversed_operations, operation))
+            if _accepts(ufunc, args + [origin]):
+                return ufunc(args[0], origin)
+            if (operation is getattr and args and isinstance(args[0], str) and
+                    args[0] in _ARRAY_ATTRIBUTES):
+                return getattr(np.asarray(origin), args[0])
+            if (operation is operator.getitem and isinstance(args[0], str) and
+                    isinstance(origin, np.ndarray) and origin.dtype.names):
+                return origin[args[0]]
+            if _is_λ(operation) and len(operation._λ_var_indices) == 1:
+                return _Evaluator([self.array(origin)], self._shape).evaluate(operation)
+
+        return _element_wise(operation, [origin] + args + kwargs, names)
+
+
+def vectorize(expression):
+    """ Return a function evaluating `expression` at once on arrays, one per variable,
+    equivalent to mapping the expression on each tuple of elements.
+    """
+    if not _is_λ(expression):
+        raise TypeError("Expected an abstraction, got a `%s` (%s)"
+                        % (type(expression).__name__, expression))
+    variable_indices = expression._λ_var_indices  # pylint: disable=protected-access
+    _check_variables(variable_indices)
+    nb_vars = len(variable_indices)
+
+    def vectorized(*arrays):
+        """ Evaluate the expression on the arrays, element by element """
+        if len(arrays) != nb_vars:
+            raise TypeError("The λ-abstraction holds %d variables, but %d arrays were given"
+                            % (nb_vars, len(arrays)))
+        arrays = np.broadcast_arrays(*(np.asarray(a) for a in arrays))
+        evaluator = _Evaluator(arrays, arrays[0].shape if arrays else ())
+        return evaluator.array(evaluator.evaluate(expression))
+
+    return vectorized
@@ -1,12 +1,18 @@
 #!/usr/bin/env python
 
+import os
+import re
+
 from setuptools import setup
 
 
 __pkg_name__ = 'lambdax'
 __author__ = "Hugues Lerebours"
 
-VERSION = '0.2.0'
+# the version is defined once in the package itself, read here without importing it
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lambdax', '__init__.py'),
+          encoding='utf-8') as f:
+    VERSION = re.search(r"^__version__ = '([^']+)'$", f.read(), re.MULTILINE).group(1)
 DESCRIPTION = "Write lambda expressions in a simpler way"
 
 with open('README.rst') as f:
@@ -17,9 +23,11 @@ CLASSIFIERS = [
     'License :: OSI Approved :: MIT License',
     'Programming Language :: Python',
     'Programming Language :: Python :: 3',
-    'Programming Language :: Python :: 3.4',
-    'Programming Language :: Python :: 3.5',
-    'Programming Language :: Python :: 3.6',
+    'Programming Language :: Python :: 3.7',
+    'Programming Language :: Python :: 3.8',
+    'Programming Language :: Python :: 3.9',
+    'Programming Language :: Python :: 3.10',
+    'Programming Language :: Python :: 3.11',
     'Programming Language :: Python :: Implementation :: CPython',
     'Topic :: Software Development :: Libraries :: Python Modules'
 ]
@@ -32,6 +40,7 @@ if __name__ == '__main__':
         description=DESCRIPTION,
         long_description=LONG_DESCRIPTION,
         classifiers=CLASSIFIERS,
+        python_requires='>=3.7',
         author=__author__,
         author_email="hugues@lereboursp.net",
         url="https://github.com/hlerebours/lambda-calculus",
@@ -39,5 +48,6 @@ if __name__ == '__main__':
         packages=['lambdax', 'lambdax.test'],
         setup_requires=['pytest-runner>=2.11', 'pylama_pylint>=3.0', 'pylint==1.7.0'],
         tests_require=['pytest>=3.0', 'pytest-cov>=2.4', 'pylama>=7.3'],
+        extras_require={'numpy': ['numpy']},
         platforms=['any']
     )